@@ -13,6 +13,8 @@ import uuid
 SECRET_KEY = os.getenv("SECRET_KEY", "a_very_secret_key_that_you_should_change") # Add this to your .env
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+# Comma-separated emails allowed to use the /api/admin endpoints
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
 
 # --- Password Hashing ---
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -38,19 +40,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 # --- Dependency to Get Current User ---
-# This will be used to protect our endpoints
-from sqlalchemy.orm import Session
-from database.session import SessionLocal
+# This will be used to protect our endpoints.
+# The user lookup runs on the async engine, so authentication never blocks the event loop.
+# It uses its own short session rather than a request-scoped one: dependencies live until
+# the response is finished, and an SSE stream would otherwise hold a pooled connection open.
+from sqlalchemy import select
+from database.async_session import AsyncSessionLocal
 from database.models import User as DBUser
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> DBUser:
+async def _user_from_token(token: str) -> DBUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -63,48 +61,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(DBUser).filter(DBUser.id == user_id).first()
+
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(DBUser).where(DBUser.id == user_id))).scalar_one_or_none()
     if user is None:
         raise credentials_exception
-    return user 
+    return user
 
-async def get_current_user_from_query(token: str, db: Session = Depends(get_db)) -> DBUser:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> DBUser:
+    return await _user_from_token(token)
+
+async def get_current_user_from_query(token: str) -> DBUser:
     """
-    This is a clone of get_current_user but reads token from query param named 'token'
+    Like get_current_user but reads token from query param named 'token'
     Used for endpoints that can't easily use Authorization headers (like SSE streams)
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(DBUser).filter(DBUser.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user 
+    return await _user_from_token(token)
 
-async def get_current_user_ws(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> DBUser:
+async def get_current_user_ws(token: str = Depends(oauth2_scheme)) -> DBUser:
     # This is a fallback for when the token is passed as a query param
     # In a real production app, you might want a more secure method like short-lived tickets
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    return await get_current_user(token, db)
+    return await _user_from_token(token)
 
 # A new dependency that tries the header first, then a query parameter
-async def get_user_from_header_or_query(
-    request: Request, db: Session = Depends(get_db)
-) -> DBUser:
+async def get_user_from_header_or_query(request: Request) -> DBUser:
     token = request.headers.get("Authorization")
     if token and token.startswith("Bearer "):
         token = token.split(" ")[1]
@@ -116,4 +98,10 @@ async def get_user_from_header_or_query(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
         )
-    return await get_current_user(token, db) 
\ No newline at end of file
+    return await _user_from_token(token)
+
+async def get_current_admin(current_user: DBUser = Depends(get_current_user)) -> DBUser:
+    """Like get_current_user, but only for accounts listed in ADMIN_EMAILS."""
+    if (current_user.email or "").lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
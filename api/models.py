@@ -18,6 +18,10 @@ class ResearchRequest(BaseModel):
         default=True,
         description="If true, all generated artifacts will be uploaded to the internal RAG system for future querying."
     )
+    priority: Literal["interactive", "normal", "batch"] = Field(
+        default="normal",
+        description="Scheduling level. Interactive jobs are picked up first, batch jobs backfill; heavy tenants are pushed back by fair share."
+    )
 
 class RAGQueryRequest(BaseModel):
     """Request to query a RAG collection."""
@@ -164,6 +168,41 @@ class JobHistoryItem(BaseModel):
 
 class JobHistoryResponse(BaseModel):
     jobs: List[JobHistoryItem]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next (older) page; null on the last page.")
+
+
+# --- NEW: Models for the admin queue metrics endpoint ---
+
+class TenantQueueMetrics(BaseModel):
+    tenant: str
+    weight: float
+    pending: int
+    running: int
+    pending_by_priority: Dict[str, int] = Field(default_factory=dict)
+    oldest_pending_seconds: Optional[float] = None
+    started_in_window: int = 0
+    avg_wait_seconds: Optional[float] = None
+    p95_wait_seconds: Optional[float] = None
+    max_wait_seconds: Optional[float] = None
+
+class QueueMetricsResponse(BaseModel):
+    window_hours: int
+    broker_queue_depth: Optional[Dict[str, int]] = Field(None, description="Messages waiting per Celery queue; null if the broker is unreachable.")
+    tenants: List[TenantQueueMetrics]
+
+
+class PDFRenderMetricsResponse(BaseModel):
+    workers: int
+    max_queue: int
+    in_flight: int = Field(..., description="Renders admitted and not finished (running + queued).")
+    queued: int
+    completed: int
+    failed: int
+    rejected: int = Field(..., description="Renders refused with 429 because the service was saturated.")
+    render_seconds_p50: Optional[float] = None
+    render_seconds_p95: Optional[float] = None
+    queue_wait_seconds_p50: Optional[float] = None
+    queue_wait_seconds_p95: Optional[float] = None
 
 
 # --- NEW: Models for Smart Tag Generation ---
@@ -3,21 +3,24 @@ import uuid
 import os  # Add this import
 import logging
 from fastapi import FastAPI, HTTPException, Request, Depends, status
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 import asyncio
 import json
+import time
 import requests
 import httpx
-from sqlalchemy.orm import Session
-from sqlalchemy import text, desc
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, desc, or_, and_, select
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from io import BytesIO, StringIO
+from typing import Iterator, Optional, List
+from io import StringIO
 import tempfile
-import zipfile
 import csv
+import base64
+from datetime import datetime
 from weasyprint import HTML  # ++ NEW IMPORT for PDF generation
 
 # --- Logging Import ---
@@ -26,7 +29,8 @@ from api.sheets_logger import log_to_sheets
 
 # --- DB Imports ---
 from database.session import SessionLocal, init_db, engine
-from database.models import Job as DBJob, User as DBUser # Use aliases to avoid name conflicts
+from database.async_session import AsyncSessionLocal, async_engine, get_async_db
+from database.models import Job as DBJob, User as DBUser, JobLog # Use aliases to avoid name conflicts
 
 # --- Auth Imports ---
 from api import auth  # Our new auth module
@@ -37,17 +41,26 @@ from api.models import (
     ResearchRequest, JobSubmissionResponse, JobStatusResponse, ResearchResult, ExtractedData,
     RAGQueryRequest, RAGQueryResponse, RAGCollectionInfo, JobHistoryResponse,
     TopicRequest, GeneratedTagsResponse, OverviewData,  # <-- ADD OverviewData import
-    ExportRequest  # <-- NEW IMPORT for Export Center
+    ExportRequest, ExportAsset,  # <-- NEW IMPORT for Export Center
+    QueueMetricsResponse, PDFRenderMetricsResponse
 )
 from src.config import assert_all_env, assert_rag_env
 from src.rag_uploader import query_rag_collection
 from src.query_enhancer import generate_tags_from_topic # <-- NEW IMPORT
 
 # +++ Import the Celery task +++
-from src.tasks import run_research_pipeline_task
+from src.tasks import dispatch_research_job
+from src.single_flight import query_fingerprint, find_leader
+from src.fair_share import compute_priority, queue_metrics, broker_queue_depth, CELERY_QUEUES
+from src import constants
+from src.events import JobEventSubscription
+from src.result_store import BLOB_SECTIONS, load_section, load_sections, load_report_pdf
 
 # +++ Import PDF generation utilities +++
-from src.utils.pdf_generator import ProfessionalPDFGenerator
+from src.utils.pdf_cache import get_pdf_cache, pdf_cache_key, template_version
+from src.utils.pdf_generator import report_title_from_query
+from src.utils.zip_stream import stream_zip
+from src.utils.pdf_render_service import RenderQueueFull, get_pdf_render_service, shutdown_pdf_render_service
 
 
 
@@ -107,6 +120,20 @@ app.add_middleware(
 def on_startup():
     setup_logging()  # Set up logging first
     init_db()
+    # Start the PDF worker processes in the background, so the first download does not pay for it
+    asyncio.get_running_loop().run_in_executor(None, _prewarm_pdf_render_service)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Close pooled async connections (aiosqlite keeps a thread per connection)
+    await async_engine.dispose()
+    shutdown_pdf_render_service()
+
+def _prewarm_pdf_render_service():
+    try:
+        get_pdf_render_service().prewarm()
+    except Exception as e:
+        logging.warning(f"PDF render service: prewarm failed, workers will start on the first render. Error: {e}")
 
 # --- Dependency to get a DB session ---
 def get_db():
@@ -196,22 +223,40 @@ def _dict_to_extracted_model(raw_dict: dict) -> ExtractedData:
 
 
 # --- Helper function for CSV generation ---
-def _generate_csv_bytes(items: List[dict]) -> bytes:
-    """Converts a list of dictionaries to CSV formatted bytes."""
-    if not items:
-        return b""
-    
-    # Use StringIO to build the CSV in memory
-    output = StringIO()
+def _generate_csv_chunks(items: List[dict], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """
+    Converts a list of dictionaries to CSV, produced lazily as UTF-8 bytes a few hundred
+    rows at a time. Rows are checked up front, so a bad row fails here, not mid-stream.
+    """
     # Use the keys from the first item as headers
-    headers = items[0].keys()
-    writer = csv.DictWriter(output, fieldnames=headers)
-    
-    writer.writeheader()
-    writer.writerows(items)
-    
-    # Return the string as UTF-8 encoded bytes
-    return output.getvalue().encode('utf-8')
+    headers = list(items[0].keys()) if items else []
+    unknown = set().union(*(item.keys() for item in items)) - set(headers)
+    if unknown:
+        raise ValueError(f"dict contains fields not in fieldnames: {', '.join(sorted(map(repr, unknown)))}")
+
+    def chunks():
+        output = StringIO()
+        writer = csv.DictWriter(output, fieldnames=headers)
+        writer.writeheader()
+        for start in range(0, len(items), rows_per_chunk):
+            writer.writerows(items[start:start + rows_per_chunk])
+            yield output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate()
+    return chunks()
+
+
+def _generate_json_chunks(items: List[dict], chunk_chars: int = 64 * 1024) -> Iterator[bytes]:
+    """Converts a list of dictionaries to indented JSON, produced lazily as UTF-8 bytes of about chunk_chars."""
+    buffer, size = [], 0
+    for token in json.JSONEncoder(indent=2).iterencode(items):
+        buffer.append(token)
+        size += len(token)
+        if size >= chunk_chars:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
 
 
 # --- API Endpoints (Now DB-aware) ---
@@ -233,6 +278,12 @@ async def create_research_job(
     job_id = str(uuid.uuid4())
     base_url = str(request.base_url)
 
+    # Identical brief already running for this company? Follow it instead of duplicating Phases 1-5.
+    fingerprint = query_fingerprint(current_user.company_name, research_request.query)
+    leader = find_leader(db, fingerprint)
+    # Broker priority from the requested level and the tenant's current load (fair share).
+    queue_priority = compute_priority(db, current_user, research_request.priority)
+
     # Create the job record in the database
     new_job = DBJob(
         id=job_id,
@@ -240,7 +291,11 @@ async def create_research_job(
         original_query=research_request.query,
         upload_to_rag=research_request.upload_to_rag,
         rag_status="pending" if research_request.upload_to_rag else None,
-        user_id=current_user.id  # <-- LINK THE JOB TO THE USER
+        user_id=current_user.id,  # <-- LINK THE JOB TO THE USER
+        query_fingerprint=fingerprint,
+        leader_job_id=leader.id if leader else None,
+        priority=research_request.priority,
+        queue_priority=queue_priority
     )
     db.add(new_job)
     db.commit()
@@ -254,18 +309,23 @@ async def create_research_job(
         jobId=new_job.id,
         query=new_job.original_query,
         status="pending",
-        details={"rag_requested": new_job.upload_to_rag}
+        details={"rag_requested": new_job.upload_to_rag, "leader_job_id": new_job.leader_job_id}
     )
 
     # --- THIS IS THE KEY CHANGE ---
     # Instead of using BackgroundTasks, we send the job to the Celery queue.
     # The .delay() method is a shortcut to send a task message.
-    run_research_pipeline_task.delay(
+    # PIPELINE_MODE picks a single task or a canvas of per-stage tasks.
+    dispatch_research_job(
         job_id=job_id,
         query=research_request.query,
-        should_upload_to_rag=research_request.upload_to_rag
+        should_upload_to_rag=research_request.upload_to_rag,
+        priority=queue_priority
     )
-    logging.info(f"Dispatched job {job_id} to Celery worker.")
+    if leader:
+        logging.info(f"Dispatched job {job_id} to Celery worker as a follower of in-flight job {leader.id}.")
+    else:
+        logging.info(f"Dispatched job {job_id} to Celery worker.")
 
     return {
         "job_id": job_id,
@@ -275,9 +335,22 @@ async def create_research_job(
     }
 
 
+async def _recent_job_logs(db: AsyncSession, job: DBJob, limit: int = 10) -> List[str]:
+    """Latest log lines from the job_logs table, or the legacy Job.logs array for older jobs."""
+    rows = (await db.execute(
+        select(JobLog.message)
+        .where(JobLog.job_id == job.id)
+        .order_by(JobLog.id.desc())
+        .limit(limit)
+    )).all()
+    if rows:
+        return [row.message for row in reversed(rows)]
+    return job.logs[-limit:] if job.logs else []
+
+
 @app.get("/api/research/status/{job_id}", response_model=JobStatusResponse)
-async def get_research_status(job_id: str, db: Session = Depends(get_db), current_user: DBUser = Depends(auth.get_current_user)):
-    job = db.query(DBJob).filter(DBJob.id == job_id).first()
+async def get_research_status(job_id: str, db: AsyncSession = Depends(get_async_db), current_user: DBUser = Depends(auth.get_current_user)):
+    job = (await db.execute(select(DBJob).where(DBJob.id == job_id))).scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -300,6 +373,7 @@ async def get_research_status(job_id: str, db: Session = Depends(get_db), curren
              message += f". RAG status: {rag_status}"
     
     if job.status == 'failed':
+        await db.refresh(job, ["result"])  # deferred column: only loaded for failed jobs
         error_msg = job.result.get('error', 'Unknown error') if job.result else 'Unknown error'
         message = f"Job failed. Error: {error_msg}"
 
@@ -310,18 +384,19 @@ async def get_research_status(job_id: str, db: Session = Depends(get_db), curren
         "stage": job.job_stage,
         "progress": job.job_progress,
         # --- NEW: Return the logs array ---
-        "logs": job.logs[-10:] if job.logs else [] # Return last 10 logs
+        "logs": await _recent_job_logs(db, job) # Return last 10 logs
     }
 
 
 @app.get("/api/research/result/{job_id}", response_model=ResearchResult)
-async def get_research_result(job_id: str, current_user: DBUser = Depends(auth.get_current_user)):
+async def get_research_result(job_id: str, db: AsyncSession = Depends(get_async_db), current_user: DBUser = Depends(auth.get_current_user)):
     """
     🔥 FIXED: Result endpoint with proper RAG info
     """
-    db = SessionLocal()
     try:
-        job = db.query(DBJob).filter(DBJob.id == job_id).first()
+        job = (await db.execute(
+            select(DBJob).options(undefer(DBJob.result)).where(DBJob.id == job_id)
+        )).scalar_one_or_none()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
@@ -339,6 +414,12 @@ async def get_research_result(job_id: str, current_user: DBUser = Depends(auth.g
         if not job.result:
             raise HTTPException(status_code=500, detail="Job completed but no result found")
         
+        # Large sections live in the blob store; metadata/original_query are on the row.
+        sections = await asyncio.to_thread(
+            load_sections, job.result,
+            ("final_report_markdown", "overview_data", "strategic_insights", "extracted_data")
+        )
+
         # 🔥 CRITICAL: Build metadata with RAG info
         enhanced_metadata = job.result.get("metadata", {}).copy()
         
@@ -362,12 +443,12 @@ async def get_research_result(job_id: str, current_user: DBUser = Depends(auth.g
             job_id=job.id,
             status='completed',
             original_query=job.result.get("original_query"),
-            final_report_markdown=job.result.get("final_report_markdown"),
+            final_report_markdown=sections["final_report_markdown"],
             # +++ THIS IS THE FIX: Pass the overview_data to the response model +++
-            overview_data=job.result.get("overview_data"),
+            overview_data=sections["overview_data"],
             # +++ ADD THIS LINE +++
-            strategic_insights=job.result.get("strategic_insights"),
-            extracted_data=_dict_to_extracted_model(job.result.get("extracted_data", {})),
+            strategic_insights=sections["strategic_insights"],
+            extracted_data=_dict_to_extracted_model(sections["extracted_data"] or {}),
             metadata=enhanced_metadata
         )
         
@@ -378,32 +459,99 @@ async def get_research_result(job_id: str, current_user: DBUser = Depends(auth.g
     except Exception as e:
         logging.error(f"Error retrieving job result {job_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve job result: {str(e)}")
-    finally:
-        db.close()
+
+
+@app.get("/api/research/result/{job_id}/sections/{section}")
+async def get_research_result_section(
+    job_id: str,
+    section: str,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(auth.get_current_user)
+):
+    """
+    One section of a completed job's result (e.g. `intermediate_reports`), so clients
+    can fetch large parts on demand instead of through the full result.
+    """
+    if section not in BLOB_SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown result section. Available: {', '.join(BLOB_SECTIONS)}")
+    job = db.query(DBJob).filter(DBJob.id == job_id, DBJob.user_id == current_user.id).first()
+    if not job or job.status != 'completed' or not job.result:
+        raise HTTPException(status_code=404, detail="Completed job with results not found for the current user.")
+
+    data = await asyncio.to_thread(load_section, job.result, section)
+    return {"job_id": job_id, "section": section, "data": data}
+
+
+def _encode_history_cursor(created_at: datetime, job_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), job_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_history_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(job_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
 
 
 # +++ NEW: Endpoint to get user's job history +++
 @app.get("/api/research/history", response_model=JobHistoryResponse)
 async def get_user_research_history(
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = constants.HISTORY_PAGE_SIZE,
+    db: AsyncSession = Depends(get_async_db),
     current_user: DBUser = Depends(auth.get_current_user)
 ):
     """
-    Retrieves a list of all research jobs submitted by the current user.
+    Retrieves the current user's research jobs, newest first, one page at a time.
+    Pass the returned `next_cursor` as `cursor` to get the next page.
     """
-    # Query the database for jobs belonging to the current user,
-    # ordering by the creation date in descending order (newest first).
-    jobs = (
-        db.query(DBJob)
-        .filter(DBJob.user_id == current_user.id)
-        .order_by(desc(DBJob.created_at))
-        .all()
+    limit = max(1, min(limit, constants.HISTORY_MAX_PAGE_SIZE))
+
+    # Only the listed columns, and keyset pagination on (created_at, id) so
+    # every page is a short range scan of ix_jobs_user_id_created_at.
+    stmt = (
+        select(DBJob.id, DBJob.original_query, DBJob.status, DBJob.created_at)
+        .where(DBJob.user_id == current_user.id)
     )
-    
-    if not jobs:
-        return {"jobs": []}  # Return an empty list if no jobs are found
-        
-    return {"jobs": jobs}
+    if cursor:
+        created_at, job_id = _decode_history_cursor(cursor)
+        stmt = stmt.where(or_(
+            DBJob.created_at < created_at,
+            and_(DBJob.created_at == created_at, DBJob.id < job_id),
+        ))
+    rows = (await db.execute(stmt.order_by(desc(DBJob.created_at), desc(DBJob.id)).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_history_cursor(rows[-1].created_at, rows[-1].id)
+
+    return {"jobs": [row._asdict() for row in rows], "next_cursor": next_cursor}
+
+
+@app.get("/api/admin/queues", response_model=QueueMetricsResponse)
+async def get_queue_metrics(db: Session = Depends(get_db), current_admin: DBUser = Depends(auth.get_current_admin)):
+    """
+    Broker queue depth and per-tenant pending/running counts and wait times (admins only).
+    """
+    window_hours = constants.FAIR_SHARE_METRICS_WINDOW_HOURS
+    depth = await asyncio.to_thread(broker_queue_depth, list(CELERY_QUEUES))
+    return {
+        "window_hours": window_hours,
+        "broker_queue_depth": depth,
+        "tenants": queue_metrics(db, window_hours),
+    }
+
+
+@app.get("/api/admin/pdf-render", response_model=PDFRenderMetricsResponse)
+async def get_pdf_render_metrics(current_admin: DBUser = Depends(auth.get_current_admin)):
+    """
+    PDF render service load and timings for this API process (admins only).
+    """
+    return get_pdf_render_service().metrics()
 
 
 @app.post("/api/rag/query", response_model=RAGQueryResponse)
@@ -460,8 +608,8 @@ async def ask_rag_collection(query_request: RAGQueryRequest, db: Session = Depen
 
 
 @app.get("/api/research/{job_id}/rag", response_model=RAGCollectionInfo)
-async def get_job_rag_info(job_id: str, db: Session = Depends(get_db), current_user: DBUser = Depends(auth.get_current_user)):
-    job = db.query(DBJob).filter(DBJob.id == job_id).first()
+async def get_job_rag_info(job_id: str, db: AsyncSession = Depends(get_async_db), current_user: DBUser = Depends(auth.get_current_user)):
+    job = (await db.execute(select(DBJob).where(DBJob.id == job_id))).scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -481,53 +629,117 @@ async def get_job_rag_info(job_id: str, db: Session = Depends(get_db), current_u
     )
 
 
+SSE_HEARTBEAT_SECONDS = 15   # keep-alive comment while no event arrives
+SSE_DB_RECHECK_SECONDS = 60  # safety-net status read, in case a pub/sub event was lost
+
+
+async def _job_status_snapshot(job_id: str) -> Optional[dict]:
+    """Status, stage and progress only; the (large) result column is not loaded."""
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(DBJob.status, DBJob.job_stage, DBJob.job_progress).where(DBJob.id == job_id)
+        )).first()
+        if not row:
+            return None
+        return {'status': row.status, 'stage': row.job_stage, 'progress': row.job_progress}
+
+
+async def _job_final_events(job_id: str, job_status: str) -> List[str]:
+    """The closing SSE events for a finished job (result + close, or just close)."""
+    if job_status == 'failed':
+        logging.warning(f"SSE stream for job {job_id}: Detected 'failed' status. Closing connection.")
+        return ["event: close\ndata: Job failed\n\n"]
+
+    async with AsyncSessionLocal() as db:
+        result = (await db.execute(select(DBJob.result).where(DBJob.id == job_id))).scalar() or {}
+    sections = await asyncio.to_thread(load_sections, result, ("final_report_markdown", "extracted_data"))
+    logging.info(f"SSE stream for job {job_id}: Detected 'completed' status. Sending final result and closing.")
+    final_payload = {
+        "job_id": job_id,
+        "status": 'completed',
+        "original_query": result.get("original_query"),
+        "final_report_markdown": sections["final_report_markdown"],
+        "extracted_data": _dict_to_extracted_model(sections["extracted_data"] or {}).dict(),
+        "metadata": result.get("metadata", {})
+    }
+    return [f"event: result\ndata: {json.dumps(final_payload)}\n\n", "event: close\ndata: Job finished\n\n"]
+
+
+async def _poll_job_updates(job_id: str):
+    """Fallback when Redis is unavailable: re-read the job status every 2 seconds."""
+    while True:
+        state = await _job_status_snapshot(job_id)
+        if not state:
+            logging.warning(f"SSE stream for job {job_id} terminated: Job not found in DB.")
+            return
+
+        yield f"event: status\ndata: {json.dumps(state)}\n\n"
+        if state['status'] in ('completed', 'failed'):
+            for chunk in await _job_final_events(job_id, state['status']):
+                yield chunk
+            return
+
+        # Wait before the next check
+        await asyncio.sleep(2)
+
+
+async def _push_job_updates(job_id: str, subscription: JobEventSubscription):
+    """
+    Relays the worker's pub/sub events. The DB is read once on (re)connect and
+    then only as a slow safety net, in case an event was lost.
+    """
+    # Snapshot *after* subscribing, so nothing published in between is missed.
+    state = await _job_status_snapshot(job_id)
+    if not state:
+        logging.warning(f"SSE stream for job {job_id} terminated: Job not found in DB.")
+        return
+
+    yield f"event: status\ndata: {json.dumps(state)}\n\n"
+    last_db_check = time.monotonic()
+    subscription_events = subscription.events(timeout=SSE_HEARTBEAT_SECONDS)
+
+    while state['status'] not in ('completed', 'failed'):
+        event = await anext(subscription_events)
+        if event is None:
+            yield ": keepalive\n\n"
+        elif event.get("type") == "status":
+            state.update({k: event[k] for k in ('status', 'stage', 'progress') if event.get(k) is not None})
+            yield f"event: status\ndata: {json.dumps(state)}\n\n"
+        elif event.get("type") == "log":
+            yield f"event: log\ndata: {json.dumps({'message': event.get('message')})}\n\n"
+
+        if (event or {}).get("type") == "finished" or time.monotonic() - last_db_check >= SSE_DB_RECHECK_SECONDS:
+            state = await _job_status_snapshot(job_id)
+            last_db_check = time.monotonic()
+            if not state:
+                return
+            if state['status'] in ('completed', 'failed'):
+                yield f"event: status\ndata: {json.dumps(state)}\n\n"
+
+    for chunk in await _job_final_events(job_id, state['status']):
+        yield chunk
+
+
 async def job_update_generator(job_id: str):
     """
     Yields real-time updates for a given job as Server-Sent Events.
-    This version uses short-lived DB sessions to avoid stale data reads.
+    Updates are pushed from the worker over Redis pub/sub; if Redis cannot be
+    reached the stream falls back to polling the database.
     """
-    while True:
-        db = SessionLocal()  # <-- Session created on EACH loop iteration
-        try:
-            job = db.query(DBJob).filter(DBJob.id == job_id).first()
-            if not job:
-                logging.warning(f"SSE stream for job {job_id} terminated: Job not found in DB.")
-                break
-
-            # Send status updates
-            status_data = {
-                'status': job.status,
-                'stage': job.job_stage,
-                'progress': job.job_progress
-            }
-            yield f"event: status\ndata: {json.dumps(status_data)}\n\n"
-
-            # Check for completion
-            if job.status == 'completed' and job.result:
-                logging.info(f"SSE stream for job {job_id}: Detected 'completed' status. Sending final result and closing.")
-                final_payload = {
-                    "job_id": job.id,
-                    "status": 'completed',
-                    "original_query": job.result.get("original_query"),
-                    "final_report_markdown": job.result.get("final_report_markdown"),
-                    "extracted_data": _dict_to_extracted_model(job.result.get("extracted_data", {})).dict(),
-                    "metadata": job.result.get("metadata", {})
-                }
-                yield f"event: result\ndata: {json.dumps(final_payload)}\n\n"
-                yield f"event: close\ndata: Job finished\n\n"
-                break # Exit the loop
-
-            # Check for failure
-            if job.status == 'failed':
-                logging.warning(f"SSE stream for job {job_id}: Detected 'failed' status. Closing connection.")
-                yield f"event: close\ndata: Job failed\n\n"
-                break # Exit the loop
-
-        finally:
-            db.close()  # <-- Session closed on EACH loop iteration
+    subscription = JobEventSubscription(job_id)
+    try:
+        await subscription.open()
+    except Exception as e:
+        logging.warning(f"SSE stream for job {job_id}: Redis unavailable ({e}); falling back to DB polling.")
+        async for chunk in _poll_job_updates(job_id):
+            yield chunk
+        return
 
-        # Wait before the next check
-        await asyncio.sleep(2)
+    try:
+        async for chunk in _push_job_updates(job_id, subscription):
+            yield chunk
+    finally:
+        await subscription.close()
 
 # --- NEW: SSE Endpoint ---
 @app.get("/api/research/stream/{job_id}")
@@ -537,25 +749,89 @@ async def stream_research_status(
     current_user: DBUser = Depends(auth.get_user_from_header_or_query)
 ):
     # Verify the job belongs to the current user before streaming
-    db = SessionLocal()
-    try:
-        job = db.query(DBJob).filter(DBJob.id == job_id).first()
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        # Check if the job belongs to the current user
-        if job.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Access denied: Job belongs to another user")
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        owner_id = (await db.execute(select(DBJob.user_id).where(DBJob.id == job_id))).first()
+    if not owner_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Check if the job belongs to the current user
+    if owner_id.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied: Job belongs to another user")
     
     return StreamingResponse(job_update_generator(job_id), media_type="text/event-stream")
 
 
+async def _report_pdf(cache_key: str, report_md: str, report_title: str, user_name: str) -> bytes:
+    """
+    The report PDF for `cache_key` (see pdf_cache_key). Rendered in the PDF render service
+    only on a PDF cache miss; raises RenderQueueFull when the service is saturated.
+    """
+    pdf_cache = get_pdf_cache()
+    pdf_bytes = await asyncio.to_thread(pdf_cache.get, cache_key) if pdf_cache else None
+    if pdf_bytes is None:
+        pdf_bytes = await get_pdf_render_service().render(report_md, report_title, user_name)
+        if pdf_cache:
+            await asyncio.to_thread(pdf_cache.put, cache_key, pdf_bytes)
+    return pdf_bytes
+
+
+def _prerendered_pdf_ref(job_result: Optional[dict], report_title: str, user_name: str) -> Optional[dict]:
+    """The worker's pre-rendered PDF (PRERENDER_PDF), if it was rendered from the inputs a render now would use."""
+    ref = (job_result or {}).get("report_pdf")
+    if (ref and ref.get("title") == report_title and ref.get("user_name") == user_name
+            and ref.get("template_version") == template_version()):
+        return ref
+    return None
+
+
+async def _job_report_pdf(job: DBJob, report_title: str, user_name: str,
+                          if_none_match: Optional[str] = None) -> tuple[Optional[bytes], str]:
+    """
+    (pdf_bytes, etag) for a completed job's report. Served from the worker's pre-rendered
+    copy when it matches, else from the PDF cache, else rendered. pdf_bytes is None when
+    `if_none_match` already matches the ETag. Raises RenderQueueFull if a render is needed
+    and the render service is saturated.
+    """
+    ref = _prerendered_pdf_ref(job.result, report_title, user_name)
+    report_md = None
+    if ref:
+        cache_key = ref["cache_key"]  # no need to fetch the markdown to know the ETag
+    else:
+        report_md = await asyncio.to_thread(load_section, job.result, "final_report_markdown", "No content available.")
+        cache_key = pdf_cache_key(report_md, report_title, user_name)
+    # The PDF is a pure function of its inputs, so their hash is a strong ETag.
+    etag = f'"{cache_key}"'
+    if _etag_matches(if_none_match, etag):
+        return None, etag
+
+    pdf_bytes = await asyncio.to_thread(load_report_pdf, ref) if ref else None
+    if pdf_bytes is None:
+        if report_md is None:
+            report_md = await asyncio.to_thread(load_section, job.result, "final_report_markdown", "No content available.")
+        pdf_bytes = await _report_pdf(cache_key, report_md, report_title, user_name)
+    return pdf_bytes, etag
+
+
+def _pdf_render_busy() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="PDF rendering is busy, please retry shortly.",
+        headers={"Retry-After": str(constants.PDF_RENDER_RETRY_AFTER_S)},
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 # +++ NEW: PDF download endpoint +++
 @app.get("/api/research/{job_id}/download-pdf")
 async def download_research_pdf(
     job_id: str, 
+    request: Request,
     db: Session = Depends(get_db), 
     current_user: DBUser = Depends(auth.get_current_user)
 ):
@@ -563,31 +839,102 @@ async def download_research_pdf(
     if not job or job.status != 'completed':
         raise HTTPException(status_code=404, detail="Completed job not found")
 
-    report_md = job.result.get("final_report_markdown", "No content available.")
-    
-    # Extract a more meaningful title from the query instead of a hard truncation.
-    # We'll use the first non-empty line as the subtitle.
-    query_lines = job.original_query.strip().split('\n')
-    report_title = next((line.strip() for line in query_lines if line.strip()), "Market Research Summary")
-    
-    # Apply a more generous length limit to prevent excessively long subtitles.
-    # The CSS will handle wrapping the text gracefully.
-    report_title = report_title[:200]
+    report_title = report_title_from_query(job.original_query)
+    user_name = current_user.name or current_user.email
 
     try:
-        pdf_generator = ProfessionalPDFGenerator()
-        pdf_bytes = pdf_generator.generate_pdf_from_markdown(report_md, report_title, current_user.name or current_user.email)
+        pdf_bytes, etag = await _job_report_pdf(job, report_title, user_name, request.headers.get('if-none-match'))
+        cache_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if pdf_bytes is None:
+            return Response(status_code=304, headers=cache_headers)
 
         file_name = f"Supervity_Report_{job_id[:8]}.pdf"
-        headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
+        headers = {'Content-Disposition': f'attachment; filename="{file_name}"', **cache_headers}
         
-        return StreamingResponse(BytesIO(pdf_bytes), media_type="application/pdf", headers=headers)
+        return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
 
+    except RenderQueueFull:
+        raise _pdf_render_busy()
     except Exception as e:
         logging.error(f"PDF generation failed for job {job_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to generate PDF report.")
 
 
+async def _export_entries(job: DBJob, assets: List[ExportAsset], report_title: str, user_name: str):
+    """
+    Generates the export's files concurrently and yields (arcname, data) as each one is
+    ready: bytes for the reports, lazy chunk iterators for the data files (encoded while
+    they are written). A file holds one of EXPORT_MAX_PARALLEL_ASSETS slots from the start
+    of its generation until the consumer has written it, so at most that many files are in
+    memory even when generating is faster than compressing. A failed file becomes an ERROR_*.txt.
+    """
+    semaphore = asyncio.Semaphore(constants.EXPORT_MAX_PARALLEL_ASSETS)
+    structured_data_task = None  # extracted_data is fetched once and shared by every data file
+
+    def structured_data():
+        nonlocal structured_data_task
+        if structured_data_task is None:
+            structured_data_task = asyncio.ensure_future(
+                asyncio.to_thread(load_section, job.result, "extracted_data", {})
+            )
+        return structured_data_task
+
+    async def report_pdf():
+        pdf_bytes, _ = await _job_report_pdf(job, report_title, user_name)
+        return pdf_bytes
+
+    async def report_md():
+        md_content = await asyncio.to_thread(load_section, job.result, "final_report_markdown", "")
+        return md_content.encode('utf-8')
+
+    def data_file(data_type: str, file_format: str):
+        async def make():
+            items = (await structured_data()).get(data_type, [])
+            if not items:
+                return None  # Skip empty data types
+            # lazy: the rows are encoded while stream_zip writes the file
+            encode = _generate_csv_chunks if file_format == 'csv' else _generate_json_chunks
+            return await asyncio.to_thread(encode, items)
+        return make
+
+    specs = {}  # arcname -> (error file name, coroutine function)
+    for asset in assets:
+        if asset.type == 'report' and asset.format in ('pdf', 'md'):
+            specs[f"Executive_Report.{asset.format}"] = ("ERROR_report.txt", report_pdf if asset.format == 'pdf' else report_md)
+        elif asset.type == 'data' and asset.include and asset.format in ('csv', 'json'):
+            for data_type in asset.include:
+                specs[f"data/{data_type}.{asset.format}"] = (f"ERROR_data_{data_type}.txt", data_file(data_type, asset.format))
+
+    async def produce(arcname: str, error_name: str, make):
+        # the slot is released by the consumer below, once the file is written
+        await semaphore.acquire()
+        try:
+            data = await make()
+            if data is not None:
+                logging.info(f"Job {job.id}: Added {arcname} to export package.")
+            return arcname, data
+        except RenderQueueFull:
+            return error_name, b"PDF rendering is busy right now. Please export the report again shortly."
+        except Exception as e:
+            logging.error(f"Failed to generate export file '{arcname}' for job {job.id}: {e}", exc_info=True)
+            # Add an error file to the zip to inform the user
+            return error_name, f"Failed to generate this asset. Error: {e}".encode('utf-8')
+
+    tasks = [asyncio.create_task(produce(arcname, error_name, make)) for arcname, (error_name, make) in specs.items()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            arcname, data = await next_done
+            if data is not None:
+                yield arcname, data  # resumes after stream_zip has written it
+            del data
+            semaphore.release()
+    finally:
+        for task in tasks:  # the client went away mid-download
+            task.cancel()
+        if structured_data_task is not None:
+            structured_data_task.cancel()
+
+
 # +++ NEW: The Export Center Endpoint +++
 @app.post("/api/research/{job_id}/export")
 async def export_research_package(
@@ -597,61 +944,29 @@ async def export_research_package(
     current_user: DBUser = Depends(auth.get_current_user)
 ):
     """
-    Generates a downloadable .zip package containing selected research assets.
+    Streams a downloadable .zip package containing selected research assets.
+    The files are generated in parallel and written to the archive as they finish,
+    so the archive is never held in memory as a whole.
     """
     job = db.query(DBJob).filter(DBJob.id == job_id, DBJob.user_id == current_user.id).first()
     if not job or job.status != 'completed' or not job.result:
         raise HTTPException(status_code=404, detail="Completed job with results not found for the current user.")
 
-    # Create an in-memory ZIP file
-    in_memory_zip = BytesIO()
-    with zipfile.ZipFile(in_memory_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for asset in request.assets:
-            try:
-                if asset.type == 'report':
-                    if asset.format == 'pdf':
-                        pdf_generator = ProfessionalPDFGenerator()
-                        pdf_bytes = pdf_generator.generate_pdf_from_markdown(
-                            job.result.get("final_report_markdown", ""),
-                            job.original_query[:80],
-                            current_user.name or current_user.email
-                        )
-                        zipf.writestr("Executive_Report.pdf", pdf_bytes)
-                        logging.info(f"Job {job_id}: Added PDF report to export package.")
-                    elif asset.format == 'md':
-                        md_content = job.result.get("final_report_markdown", "")
-                        zipf.writestr("Executive_Report.md", md_content.encode('utf-8'))
-                        logging.info(f"Job {job_id}: Added Markdown report to export package.")
-
-                elif asset.type == 'data' and asset.include:
-                    structured_data = job.result.get("extracted_data", {})
-                    for data_type in asset.include:
-                        items = structured_data.get(data_type, [])
-                        if not items:
-                            continue # Skip empty data types
-                        
-                        if asset.format == 'csv':
-                            csv_bytes = _generate_csv_bytes(items)
-                            zipf.writestr(f"data/{data_type}.csv", csv_bytes)
-                        elif asset.format == 'json':
-                            json_bytes = json.dumps(items, indent=2).encode('utf-8')
-                            zipf.writestr(f"data/{data_type}.json", json_bytes)
-                    logging.info(f"Job {job_id}: Added structured data (types: {asset.include}) as {asset.format} to export package.")
-
-
-
-            except Exception as e:
-                logging.error(f"Failed to generate asset '{asset.type}' in format '{asset.format}' for job {job_id}: {e}", exc_info=True)
-                # Add an error file to the zip to inform the user
-                zipf.writestr(f"ERROR_{asset.type}.txt", f"Failed to generate this asset. Error: {e}")
-
-    # Reset the buffer's pointer to the beginning before reading
-    in_memory_zip.seek(0)
-    
+    report_title = report_title_from_query(job.original_query)
+    user_name = current_user.name or current_user.email
+
+    # Once streaming has started the status code is sent; refuse up front if a PDF would have to wait for a full render service
+    wants_pdf = any(asset.type == 'report' and asset.format == 'pdf' for asset in request.assets)
+    if (wants_pdf and not _prerendered_pdf_ref(job.result, report_title, user_name)
+            and not get_pdf_render_service().has_capacity()):
+        raise _pdf_render_busy()
+
     # Set headers for file download
     file_name = f"Supervity_Export_{job_id[:8]}.zip"
     headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
-    
-    return StreamingResponse(in_memory_zip, media_type="application/zip", headers=headers)
+
+    archive = stream_zip(_export_entries(job, request.assets, report_title, user_name),
+                         chunk_size=constants.EXPORT_ZIP_CHUNK_BYTES)
+    return StreamingResponse(archive, media_type="application/zip", headers=headers)
 
 
@@ -0,0 +1,187 @@
+# benchmarks/bench_db_profiles.py
+"""
+Concurrent status polling + worker status writes under each database engine
+profile (DB_ENGINE_PROFILE in database/session.py).
+
+Reader threads do what GET /api/research/status does (job row + latest log
+lines); writer threads do what the worker's BufferedStatusWriter flush does
+(update stage/progress + append log rows). Each profile runs in its own
+process, because the engine is configured at import time.
+
+    python benchmarks/bench_db_profiles.py                          # temp SQLite: default vs tuned
+    python benchmarks/bench_db_profiles.py --readers 32 --writers 8 --duration 20
+    DATABASE_URL=postgresql://... python benchmarks/bench_db_profiles.py --use-env-db
+
+--use-env-db writes benchmark rows into the database from DATABASE_URL and
+deletes them afterwards; never point it at production.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BENCH_PREFIX = "bench-"
+PROFILES = ("default", "tuned")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--readers", type=int, default=16, help="concurrent status pollers")
+    parser.add_argument("--writers", type=int, default=4, help="concurrent worker status writers")
+    parser.add_argument("--jobs", type=int, default=200, help="jobs being polled/updated")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    parser.add_argument("--write-interval", type=float, default=0.02, help="pause between one writer's flushes (s)")
+    parser.add_argument("--use-env-db", action="store_true", help="use DATABASE_URL instead of a temp SQLite file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+def run_child(args) -> dict:
+    """One profile: seed, run readers + writers for `duration`, return stats."""
+    from database.session import SessionLocal, engine, init_db
+    from database.models import Job as DBJob, JobLog
+
+    init_db()
+    job_ids = [f"{BENCH_PREFIX}{uuid.uuid4()}" for _ in range(args.jobs)]
+    with SessionLocal() as s:
+        s.add_all(DBJob(id=j, status="running", original_query="bench", job_stage="searching", job_progress=10)
+                  for j in job_ids)
+        s.commit()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"read_ms": [], "write_ms": [], "read_errors": 0, "write_errors": 0, "errors": set()}
+
+    def reader():
+        rnd = random.Random()
+        while not stop.is_set():
+            job_id = rnd.choice(job_ids)
+            started = time.perf_counter()
+            try:
+                with SessionLocal() as s:
+                    job = s.query(DBJob).filter(DBJob.id == job_id).first()
+                    s.query(JobLog.message).filter(JobLog.job_id == job.id).order_by(JobLog.id.desc()).limit(10).all()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    stats["read_ms"].append(elapsed)
+            except Exception as e:
+                with lock:
+                    stats["read_errors"] += 1
+                    stats["errors"].add(type(e).__name__ + ": " + str(e).splitlines()[0][:80])
+
+    def writer():
+        rnd = random.Random()
+        while not stop.is_set():
+            job_id = rnd.choice(job_ids)
+            started = time.perf_counter()
+            try:
+                with SessionLocal() as s:
+                    s.query(DBJob).filter(DBJob.id == job_id).update(
+                        {DBJob.job_stage: "extracting", DBJob.job_progress: rnd.randint(10, 90)},
+                        synchronize_session=False,
+                    )
+                    s.add_all(JobLog(job_id=job_id, message=f"bench log {i}") for i in range(3))
+                    s.commit()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    stats["write_ms"].append(elapsed)
+            except Exception as e:
+                with lock:
+                    stats["write_errors"] += 1
+                    stats["errors"].add(type(e).__name__ + ": " + str(e).splitlines()[0][:80])
+            time.sleep(args.write_interval)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    if args.use_env_db:
+        with SessionLocal() as s:
+            s.query(JobLog).filter(JobLog.job_id.like(f"{BENCH_PREFIX}%")).delete(synchronize_session=False)
+            s.query(DBJob).filter(DBJob.id.like(f"{BENCH_PREFIX}%")).delete(synchronize_session=False)
+            s.commit()
+
+    reads, writes = stats["read_ms"], stats["write_ms"]
+    return {
+        "dialect": engine.dialect.name,
+        "reads_per_s": len(reads) / args.duration,
+        "read_p50_ms": statistics.median(reads) if reads else 0.0,
+        "read_p95_ms": _percentile(reads, 0.95),
+        "read_p99_ms": _percentile(reads, 0.99),
+        "writes_per_s": len(writes) / args.duration,
+        "write_p95_ms": _percentile(writes, 0.95),
+        "write_max_ms": max(writes) if writes else 0.0,
+        "read_errors": stats["read_errors"],
+        "write_errors": stats["write_errors"],
+        "errors": sorted(stats["errors"])[:5],
+    }
+
+
+def run_parent(args) -> None:
+    results = {}
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        env = dict(os.environ, DB_ENGINE_PROFILE=profile)
+        if not args.use_env_db:
+            env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_db_'), 'jobs.db')}"
+        print(f"Running profile '{profile}' for {args.duration:.0f}s "
+              f"({args.readers} readers, {args.writers} writers)...", flush=True)
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", *sys.argv[1:]],
+            env=env, capture_output=True, text=True,
+        )
+        if child.returncode != 0:
+            print(child.stderr[-2000:])
+            raise SystemExit(f"profile '{profile}' failed")
+        results[profile] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    rows = [
+        ("reads/s", "reads_per_s", "{:,.0f}"),
+        ("read p50 (ms)", "read_p50_ms", "{:.2f}"),
+        ("read p95 (ms)", "read_p95_ms", "{:.2f}"),
+        ("read p99 (ms)", "read_p99_ms", "{:.2f}"),
+        ("writes/s", "writes_per_s", "{:,.0f}"),
+        ("write p95 (ms)", "write_p95_ms", "{:.2f}"),
+        ("write max (ms)", "write_max_ms", "{:.2f}"),
+        ("read errors", "read_errors", "{}"),
+        ("write errors", "write_errors", "{}"),
+    ]
+    dialect = next(iter(results.values()))["dialect"]
+    print(f"\nDatabase: {dialect}")
+    print(f"{'':<16}" + "".join(f"{p:>14}" for p in results))
+    for label, key, fmt in rows:
+        print(f"{label:<16}" + "".join(f"{fmt.format(r[key]):>14}" for r in results.values()))
+    for profile, r in results.items():
+        for error in r["errors"]:
+            print(f"  [{profile}] {error}")
+
+
+if __name__ == "__main__":
+    arguments = _parse_args()
+    if arguments.child:
+        import logging
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(run_child(arguments)))
+    else:
+        run_parent(arguments)
@@ -0,0 +1,199 @@
+# benchmarks/bench_job_queries.py
+"""
+Seeds a jobs table with N rows and times the queries behind the hot job
+endpoints, to check that each lookup stays O(log n) as the table grows.
+
+    python benchmarks/bench_job_queries.py                       # temp SQLite, 1k / 10k / 100k jobs
+    python benchmarks/bench_job_queries.py --sizes 1000,50000 --users 200
+    DATABASE_URL=postgresql://... python benchmarks/bench_job_queries.py --use-env-db
+
+For every query it prints the median / p95 time per table size and the
+database's query plan at the largest size (an index search, not a scan,
+is what keeps the time flat). --use-env-db writes benchmark rows into the
+database from DATABASE_URL and deletes them afterwards; never point it at
+production.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BENCH_PREFIX = "bench-"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated job counts")
+    parser.add_argument("--users", type=int, default=100, help="users the jobs are spread over")
+    parser.add_argument("--repeat", type=int, default=300, help="timed executions per query and size")
+    parser.add_argument("--use-env-db", action="store_true", help="use DATABASE_URL instead of a temp SQLite file")
+    return parser.parse_args()
+
+
+args = _parse_args()
+if not args.use_env_db:
+    _tmp_dir = tempfile.mkdtemp(prefix="bench_jobs_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'jobs.db')}"
+
+from sqlalchemy import and_, desc, func, insert, or_  # noqa: E402
+
+from database.session import SessionLocal, engine, init_db  # noqa: E402
+from database.models import Job as DBJob, User as DBUser  # noqa: E402
+
+STATUSES = ["completed"] * 8 + ["failed", "running", "pending"]
+
+
+def seed(session, users: list[str], start: int, stop: int, t0: datetime) -> None:
+    """Inserts jobs [start, stop) in bulk; job i is created i seconds after t0."""
+    batch = []
+    for i in range(start, stop):
+        batch.append({
+            "id": f"{BENCH_PREFIX}{uuid.uuid4()}",
+            "status": random.choice(STATUSES),
+            "original_query": f"Benchmark query {i}",
+            "result": {"storage": "blob", "sections": {}, "summary": {}},
+            "created_at": t0 + timedelta(seconds=i),
+            "upload_to_rag": i % 3 == 0,
+            "rag_collection_name": f"{BENCH_PREFIX}collection-{i}" if i % 3 == 0 else None,
+            "job_stage": "finished",
+            "job_progress": 100,
+            "user_id": users[i % len(users)],
+        })
+        if len(batch) == 5000:
+            session.execute(insert(DBJob), batch)
+            batch = []
+    if batch:
+        session.execute(insert(DBJob), batch)
+    session.commit()
+
+
+def build_queries(session, user_id: str, job_id: str, collection: str, cursor_row) -> dict:
+    """The statements the endpoints run, keyed by a short label."""
+    return {
+        "status (GET /status)": session.query(DBJob).filter(DBJob.id == job_id),
+        "SSE snapshot": session.query(DBJob.status, DBJob.job_stage, DBJob.job_progress).filter(DBJob.id == job_id),
+        "export / pdf (id + user)": session.query(DBJob).filter(DBJob.id == job_id, DBJob.user_id == user_id),
+        "history, first page": (
+            session.query(DBJob.id, DBJob.original_query, DBJob.status, DBJob.created_at)
+            .filter(DBJob.user_id == user_id)
+            .order_by(desc(DBJob.created_at), desc(DBJob.id)).limit(51)
+        ),
+        "history, deep page": (
+            session.query(DBJob.id, DBJob.original_query, DBJob.status, DBJob.created_at)
+            .filter(DBJob.user_id == user_id)
+            .filter(or_(DBJob.created_at < cursor_row.created_at,
+                        and_(DBJob.created_at == cursor_row.created_at, DBJob.id < cursor_row.id)))
+            .order_by(desc(DBJob.created_at), desc(DBJob.id)).limit(51)
+        ),
+        "RAG query (by collection)": session.query(DBJob).filter(DBJob.rag_collection_name == collection),
+        "fair share in-flight count": (
+            session.query(func.count(DBJob.id))
+            .filter(DBJob.status.in_(("pending", "running")), DBJob.user_id == user_id)
+        ),
+    }
+
+
+def sample_keys(session, users: list[str]) -> tuple[str, str, str, object]:
+    user_id = random.choice(users)
+    job_id = session.query(DBJob.id).filter(DBJob.user_id == user_id).order_by(func.random()).limit(1).scalar()
+    collection = (
+        session.query(DBJob.rag_collection_name)
+        .filter(DBJob.rag_collection_name.isnot(None)).order_by(func.random()).limit(1).scalar()
+    )
+    user_jobs = session.query(DBJob.id).filter(DBJob.user_id == user_id).count()
+    cursor_row = (
+        session.query(DBJob.id, DBJob.created_at).filter(DBJob.user_id == user_id)
+        .order_by(desc(DBJob.created_at), desc(DBJob.id)).offset(user_jobs // 2).limit(1).first()
+    )
+    return user_id, job_id, collection, cursor_row
+
+
+def time_queries(session, users: list[str], repeat: int) -> dict[str, list[float]]:
+    # Pre-pick keys so the timed loop measures only the endpoint queries.
+    keys = [sample_keys(session, users) for _ in range(min(repeat, 50))]
+    timings: dict[str, list[float]] = {}
+    for i in range(repeat):
+        for label, query in build_queries(session, *keys[i % len(keys)]).items():
+            started = time.perf_counter()
+            query.all()
+            timings.setdefault(label, []).append((time.perf_counter() - started) * 1e6)
+        session.expunge_all()
+    return timings
+
+
+def query_plans(session, users: list[str]) -> dict[str, str]:
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    plans = {}
+    for label, query in build_queries(session, *sample_keys(session, users)).items():
+        sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        rows = session.connection().exec_driver_sql(explain + sql).fetchall()
+        plans[label] = "\n".join(f"      {row[-1]}" for row in rows)
+    return plans
+
+
+def cleanup(session) -> None:
+    session.query(DBJob).filter(DBJob.id.like(f"{BENCH_PREFIX}%")).delete(synchronize_session=False)
+    session.query(DBUser).filter(DBUser.id.like(f"{BENCH_PREFIX}%")).delete(synchronize_session=False)
+    session.commit()
+
+
+def main():
+    sizes = sorted(int(s) for s in args.sizes.split(",") if s.strip())
+    random.seed(42)
+    init_db()
+    print(f"Database: {engine.dialect.name} ({engine.url.render_as_string(hide_password=True)})")
+
+    session = SessionLocal()
+    users = [f"{BENCH_PREFIX}user-{i}" for i in range(args.users)]
+    session.execute(insert(DBUser), [
+        {"id": u, "email": f"{u}@bench.local", "hashed_password": "x"} for u in users
+    ])
+    session.commit()
+
+    results: dict[str, dict[int, list[float]]] = {}
+    seeded = 0
+    t0 = datetime.utcnow() - timedelta(days=365)
+    try:
+        for size in sizes:
+            started = time.perf_counter()
+            seed(session, users, seeded, size, t0)
+            seeded = size
+            if engine.dialect.name == "postgresql":
+                session.connection().exec_driver_sql("ANALYZE jobs")
+                session.commit()
+            print(f"Seeded {size:,} jobs ({time.perf_counter() - started:.1f}s); timing {args.repeat} runs per query...")
+            for label, samples in time_queries(session, users, args.repeat).items():
+                results.setdefault(label, {})[size] = samples
+
+        header = f"{'query':<28}" + "".join(f"{f'{s:,} jobs':>22}" for s in sizes) + f"{'growth':>9}"
+        print("\nmedian / p95 per query, µs")
+        print(header)
+        print("-" * len(header))
+        for label, by_size in results.items():
+            cells = ""
+            for size in sizes:
+                samples = sorted(by_size[size])
+                p95 = samples[max(0, int(0.95 * len(samples)) - 1)]
+                cells += f"{f'{statistics.median(samples):,.0f} / {p95:,.0f}':>22}"
+            growth = statistics.median(by_size[sizes[-1]]) / max(statistics.median(by_size[sizes[0]]), 1e-9)
+            print(f"{label:<28}{cells}{growth:>8.1f}x")
+        print(f"\n(table grew {sizes[-1] / sizes[0]:,.0f}x; an indexed lookup should stay within a small constant factor)")
+
+        print(f"\nQuery plans at {sizes[-1]:,} jobs:")
+        for label, plan in query_plans(session, users).items():
+            print(f"  {label}:\n{plan}")
+    finally:
+        if args.use_env_db:
+            cleanup(session)
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# benchmarks/load_test_sse.py
+"""
+Load test: many concurrent SSE streams plus status/history polling against a
+running API, reporting p50/p95/p99 latency.
+
+Holding hundreds of /api/research/stream connections open exercises the
+event loop; the probe requests show whether a blocked loop (sync DB calls in
+async handlers) delays everyone else.
+
+    # 1. start the API (uvicorn api.server:app), same DATABASE_URL / SECRET_KEY as here
+    # 2. seed a user + running jobs in that database and run 500 streams for 30s
+    python benchmarks/load_test_sse.py --seed --connections 500 --duration 30 --json-out after.json
+
+    # compare two runs (e.g. before/after a change, or two DB_ENGINE_PROFILEs)
+    python benchmarks/load_test_sse.py --compare before.json after.json
+
+--seed writes a benchmark user and jobs into the database from DATABASE_URL;
+never point it at production. Without --seed pass --token and --job-ids.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BENCH_PREFIX = "bench-"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--connections", type=int, default=500, help="concurrent SSE streams")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to hold the streams open")
+    parser.add_argument("--probe-rps", type=float, default=20.0, help="status/history requests per second")
+    parser.add_argument("--jobs", type=int, default=50, help="jobs to seed (streams are spread over them)")
+    parser.add_argument("--seed", action="store_true", help="create a benchmark user and running jobs in DATABASE_URL")
+    parser.add_argument("--token", help="bearer token (without --seed)")
+    parser.add_argument("--job-ids", help="comma-separated job ids owned by the token's user (without --seed)")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--json-out", help="write the summary to this file")
+    parser.add_argument("--compare", nargs="+", metavar="JSON", help="print saved summaries side by side and exit")
+    return parser.parse_args()
+
+
+def seed(job_count: int) -> tuple[str, list[str]]:
+    from api.auth import create_access_token
+    from database.session import SessionLocal, init_db
+    from database.models import Job as DBJob, User as DBUser
+
+    init_db()
+    user_id = f"{BENCH_PREFIX}{uuid.uuid4()}"
+    job_ids = [f"{BENCH_PREFIX}{uuid.uuid4()}" for _ in range(job_count)]
+    with SessionLocal() as s:
+        s.add(DBUser(id=user_id, email=f"{user_id}@bench.local", hashed_password="x"))
+        s.add_all(DBJob(id=j, user_id=user_id, status="running", original_query="load test",
+                        job_stage="searching", job_progress=20) for j in job_ids)
+        s.commit()
+    return create_access_token({"sub": user_id}), job_ids
+
+
+def cleanup(job_ids: list[str]) -> None:
+    from database.session import SessionLocal
+    from database.models import Job as DBJob, User as DBUser
+
+    with SessionLocal() as s:
+        s.query(DBJob).filter(DBJob.id.in_(job_ids)).delete(synchronize_session=False)
+        s.query(DBUser).filter(DBUser.id.like(f"{BENCH_PREFIX}%")).delete(synchronize_session=False)
+        s.commit()
+
+
+def _pct(samples: list[float], pct: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": statistics.median(samples) if samples else None,
+        "p95_ms": _pct(samples, 0.95),
+        "p99_ms": _pct(samples, 0.99),
+        "max_ms": max(samples) if samples else None,
+    }
+
+
+async def hold_stream(client: httpx.AsyncClient, job_id: str, token: str, stop: asyncio.Event,
+                      first_event_ms: list[float], errors: list[str]) -> None:
+    """Opens one SSE stream and reads it until `stop`; records time to the first event."""
+    started = time.perf_counter()
+    try:
+        async with client.stream("GET", f"/api/research/stream/{job_id}", params={"token": token}) as response:
+            if response.status_code != 200:
+                errors.append(f"stream HTTP {response.status_code}")
+                return
+            got_first = False
+            async for line in response.aiter_lines():
+                if not got_first and line.startswith("event:"):
+                    first_event_ms.append((time.perf_counter() - started) * 1000)
+                    got_first = True
+                if stop.is_set():
+                    return
+    except (httpx.HTTPError, asyncio.CancelledError) as e:
+        if not stop.is_set():
+            errors.append(f"stream {type(e).__name__}")
+
+
+async def probe(client: httpx.AsyncClient, job_ids: list[str], token: str, rps: float, stop: asyncio.Event,
+                latencies: dict[str, list[float]], errors: list[str]) -> None:
+    """Issues status/history requests at a fixed rate while the streams are open."""
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def one(name: str, url: str):
+        started = time.perf_counter()
+        try:
+            response = await client.get(url, headers=headers, timeout=30.0)
+            if response.status_code >= 400:
+                errors.append(f"{name} HTTP {response.status_code}")
+                return
+            latencies[name].append((time.perf_counter() - started) * 1000)
+        except httpx.HTTPError as e:
+            errors.append(f"{name} {type(e).__name__}")
+
+    pending = set()
+    while not stop.is_set():
+        job_id = random.choice(job_ids)
+        pending.add(asyncio.create_task(one("status", f"/api/research/status/{job_id}")))
+        if random.random() < 0.25:
+            pending.add(asyncio.create_task(one("history", "/api/research/history")))
+        pending = {t for t in pending if not t.done()}
+        await asyncio.sleep(1 / rps)
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def run(args, token: str, job_ids: list[str]) -> dict:
+    limits = httpx.Limits(max_connections=args.connections + 100, max_keepalive_connections=args.connections + 100)
+    timeout = httpx.Timeout(60.0, read=None)
+    stop = asyncio.Event()
+    first_event_ms: list[float] = []
+    latencies = {"status": [], "history": []}
+    errors: list[str] = []
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        streams = [
+            asyncio.create_task(hold_stream(client, job_ids[i % len(job_ids)], token, stop, first_event_ms, errors))
+            for i in range(args.connections)
+        ]
+        prober = asyncio.create_task(probe(client, job_ids, token, args.probe_rps, stop, latencies, errors))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await prober
+        for task in streams:
+            task.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+
+    error_counts: dict[str, int] = {}
+    for error in errors:
+        error_counts[error] = error_counts.get(error, 0) + 1
+    return {
+        "label": args.label,
+        "connections": args.connections,
+        "duration_s": args.duration,
+        "streams_opened": len(first_event_ms),
+        "sse_first_event": summarize(first_event_ms),
+        "status": summarize(latencies["status"]),
+        "history": summarize(latencies["history"]),
+        "errors": error_counts,
+    }
+
+
+def print_summaries(summaries: list[dict]) -> None:
+    def fmt(value):
+        return "-" if value is None else f"{value:,.1f}"
+
+    print(f"{'':<26}" + "".join(f"{s['label']:>16}" for s in summaries))
+    print(f"{'SSE streams opened':<26}" + "".join(f"{s['streams_opened']:>10,} / {s['connections']:<3}" for s in summaries))
+    for section in ("sse_first_event", "status", "history"):
+        for stat in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+            print(f"{f'{section} {stat}':<26}" + "".join(f"{fmt(s[section][stat]):>16}" for s in summaries))
+    for s in summaries:
+        for error, count in s["errors"].items():
+            print(f"  [{s['label']}] {error}: {count}")
+
+
+def main():
+    args = _parse_args()
+    if args.compare:
+        summaries = []
+        for path in args.compare:
+            with open(path) as f:
+                summaries.append(json.load(f))
+        print_summaries(summaries)
+        return
+
+    if args.seed:
+        token, job_ids = seed(args.jobs)
+    elif args.token and args.job_ids:
+        token, job_ids = args.token, [j.strip() for j in args.job_ids.split(",") if j.strip()]
+    else:
+        raise SystemExit("pass --seed, or --token and --job-ids")
+
+    print(f"Opening {args.connections} SSE streams to {args.base_url} for {args.duration:.0f}s "
+          f"with {args.probe_rps:.0f} probe req/s...")
+    try:
+        summary = asyncio.run(run(args, token, job_ids))
+    finally:
+        if args.seed:
+            cleanup(job_ids)
+
+    print_summaries([summary])
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Summary written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
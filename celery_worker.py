@@ -31,6 +31,38 @@ celery_app.conf.update(
     timezone='UTC',
     enable_utc=True,
     broker_connection_retry_on_startup=True,
+    # Research jobs ack only once they finish, so a worker killed mid-job (deploy, OOM)
+    # gets its task redelivered and resumed from checkpoints instead of losing it.
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Redis redelivers unacked tasks after this long; keep it above the longest job.
+    # priority_steps enables per-message priorities on Redis (0 = served first), used for
+    # interactive/normal/batch levels and per-tenant fair share (src/fair_share.py).
+    # queue_order_strategy stays at the default round_robin: with a fixed queue order a
+    # worker consuming several stage queues would always serve new jobs' early stages
+    # (same priority) before in-flight jobs' later ones.
+    broker_transport_options={
+        "visibility_timeout": int(os.getenv("CELERY_VISIBILITY_TIMEOUT", "14400")),
+        "priority_steps": list(range(10)),
+        "sep": ":",
+    },
+    task_default_priority=3,
+    # Canvas mode (PIPELINE_MODE=canvas): each stage has its own queue, so I/O-heavy
+    # (search, extraction) and LLM/PDF-heavy stages can get separately sized workers,
+    # e.g. `celery -A celery_worker.celery_app worker -Q extraction -c 50`.
+    task_routes={
+        "pipeline.plan": {"queue": "planning"},
+        "pipeline.search": {"queue": "search"},
+        "pipeline.extraction": {"queue": "extraction"},
+        "pipeline.synthesis": {"queue": "synthesis"},
+        "pipeline.final": {"queue": "final"},
+        "pipeline.visuals": {"queue": "visuals"},
+        "pipeline.strategy": {"queue": "strategy"},
+        "pipeline.pdf": {"queue": "final"},
+        "pipeline.persist": {"queue": "final"},
+        "pipeline.rag_upload": {"queue": "rag"},
+    },
 )
 
 # This is where we will tell Celery where to find our task function.
@@ -0,0 +1,65 @@
+# database/async_session.py
+"""
+Async engine/session for the read-heavy API endpoints (status, result,
+history, SSE stream, RAG info) and authentication.
+
+Same database and engine profile as database/session.py, through an async
+driver: postgresql -> asyncpg, sqlite -> aiosqlite. Queries run on the event
+loop without tying up a thread, so a slow query no longer stalls every other
+request and SSE stream on the uvicorn worker. The Celery worker and the
+write paths keep using the sync SessionLocal.
+
+Note: Job.result is deferred; with an AsyncSession it cannot be lazy-loaded
+by attribute access, so load it explicitly (`undefer(DBJob.result)` or
+`await db.refresh(job, ["result"])`).
+"""
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from database import session as sync_session
+from database.session import DATABASE_URL, DB_ENGINE_PROFILE
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a sync DATABASE_URL."""
+    scheme, sep, rest = url.partition("://")
+    driverless = scheme.split("+", 1)[0]
+    if driverless in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if driverless == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+def _async_engine_args() -> dict:
+    if DB_ENGINE_PROFILE != "tuned":
+        return {}
+    args = {}
+    if ":memory:" not in DATABASE_URL:
+        args.update(sync_session._pool_args())
+        if DATABASE_URL.startswith("sqlite"):
+            args["poolclass"] = AsyncAdaptedQueuePool  # aiosqlite defaults to NullPool (a new connection per session)
+    if DATABASE_URL.startswith("postgres") and sync_session.DB_STATEMENT_TIMEOUT_MS > 0:
+        # asyncpg takes server settings directly instead of libpq `options`
+        args["connect_args"] = {"server_settings": {"statement_timeout": str(sync_session.DB_STATEMENT_TIMEOUT_MS)}}
+    elif DATABASE_URL.startswith("sqlite"):
+        args["connect_args"] = {"timeout": sync_session.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return args
+
+
+async_engine = create_async_engine(async_database_url(DATABASE_URL), **_async_engine_args())
+if DATABASE_URL.startswith("sqlite") and DB_ENGINE_PROFILE == "tuned":
+    event.listen(async_engine.sync_engine, "connect", sync_session._apply_sqlite_pragmas)
+
+# expire_on_commit=False: returned ORM objects stay readable after commit without another round trip
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+logging.info(f"💽 Async database engine ready ({async_engine.dialect.driver}).")
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an AsyncSession."""
+    async with AsyncSessionLocal() as db:
+        yield db
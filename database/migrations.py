@@ -0,0 +1,70 @@
+# database/migrations.py
+"""
+Lightweight, idempotent schema migrations.
+
+`Base.metadata.create_all` creates missing tables but never touches tables that
+already exist, so columns and indexes added to database/models.py after a
+database was first created would never appear. `run_migrations` compares the
+live schema with the models and adds what is missing:
+  - columns: `ALTER TABLE ... ADD COLUMN` (always nullable, no server default;
+    the models' Python-side defaults apply to new rows, readers treat NULL as
+    the default for old ones)
+  - indexes: `CREATE INDEX` for every model index that does not exist yet
+
+It only ever adds; renames, type changes and drops need a hand-written
+migration. Works on SQLite and PostgreSQL and is safe to run on every start.
+"""
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+from database.session import Base
+
+
+def _add_missing_columns(connection: Connection, table, existing_columns: set[str]) -> list[str]:
+    added = []
+    preparer = connection.dialect.identifier_preparer
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        if column.primary_key:
+            logging.warning(f"Migrations: primary key column {table.name}.{column.name} is missing; skipping.")
+            continue
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.exec_driver_sql(
+            f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+        )
+        added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _add_missing_indexes(connection: Connection, table, existing_indexes: set[str]) -> list[str]:
+    added = []
+    for index in table.indexes:
+        if index.name in existing_indexes:
+            continue
+        connection.execute(CreateIndex(index))
+        added.append(index.name)
+    return added
+
+
+def run_migrations(connection: Connection) -> list[str]:
+    """Adds missing columns and indexes to existing tables. Returns what was added."""
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    applied = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue  # create_all creates it with everything
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        applied += _add_missing_columns(connection, table, columns)
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        applied += _add_missing_indexes(connection, table, indexes)
+
+    if applied:
+        logging.info(f"🛠️ Migrations applied: {', '.join(applied)}")
+    else:
+        logging.info("Migrations: schema is up to date.")
+    return applied
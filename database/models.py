@@ -1,6 +1,6 @@
 # database/models.py
-from sqlalchemy import Column, String, JSON, Boolean, Text, Integer, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, JSON, Boolean, Text, Integer, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from database.session import Base
 
@@ -22,18 +22,26 @@ class User(Base):
 # --- MODIFIED Job Model ---
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Per-user history listing (newest first, keyset-paginated on created_at, id)
+        Index("ix_jobs_user_id_created_at", "user_id", "created_at", "id"),
+        # Per-user in-flight counts (fair share)
+        Index("ix_jobs_user_id_status", "user_id", "status"),
+    )
 
     # Core job details
     id = Column(String, primary_key=True, index=True)
     status = Column(String, index=True, default="pending")
     original_query = Column(Text)
-    result = Column(JSON)
+    # Pointer + summary; the large sections live in the blob store (src/result_store.py).
+    # Deferred so status/history queries never load it (legacy rows still hold the full result).
+    result = deferred(Column(JSON))
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # RAG-specific details
     upload_to_rag = Column(Boolean, default=False)
     rag_status = Column(String, nullable=True)
-    rag_collection_name = Column(String, nullable=True)
+    rag_collection_name = Column(String, nullable=True, index=True)  # RAG queries look jobs up by collection
     rag_error = Column(String, nullable=True)
     
     # To store the conversational history for RAG
@@ -44,8 +52,40 @@ class Job(Base):
     job_progress = Column(Integer, nullable=True, default=0)
     
     # --- NEW: Add this column to store live logs ---
+    # Legacy: new jobs append to the job_logs table instead (see JobLog).
     logs = Column(JSON, default=[]) 
 
+    # +++ NEW: Single-flight coalescing of identical in-flight briefs +++
+    query_fingerprint = Column(String, index=True, nullable=True)
+    leader_job_id = Column(String, nullable=True)  # set on followers: the job whose stage outputs they reuse
+
+    # +++ NEW: Scheduling (priority level, broker priority it was queued with, first start time) +++
+    priority = Column(String, nullable=True, default="normal")
+    queue_priority = Column(Integer, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+
     # +++ NEW: Link to the User model +++
     user_id = Column(String, ForeignKey("users.id"))
-    owner = relationship("User", back_populates="jobs") 
\ No newline at end of file
+    owner = relationship("User", back_populates="jobs")
+
+
+# +++ NEW: Per-stage pipeline outputs, so a redelivered task can resume +++
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+    __table_args__ = (UniqueConstraint("job_id", "stage", name="uq_job_checkpoint_stage"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id"), index=True, nullable=False)
+    stage = Column(String, nullable=False)
+    data = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# +++ NEW: Append-only job log lines (replaces rewriting Job.logs on every message) +++
+class JobLog(Base):
+    __tablename__ = "job_logs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id"), index=True, nullable=False)
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,7 @@
 import os
 import logging
 import time  # <--- Add this
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import OperationalError  # <--- Add this
@@ -13,11 +13,72 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobs.db")
 log_db_url = DATABASE_URL.split('@')[-1] if "@" in DATABASE_URL else DATABASE_URL
 logging.info(f"💽 Connecting to database at: {log_db_url}")
 
+# --- Engine profile ---
+# "tuned" (default) applies the settings below; "default" keeps SQLAlchemy's
+# defaults (useful to compare, see benchmarks/bench_db_profiles.py).
+DB_ENGINE_PROFILE = os.getenv("DB_ENGINE_PROFILE", "tuned").lower()
+
+# SQLite: WAL lets API reads run while the worker writes status updates.
+SQLITE_JOURNAL_MODE = os.getenv("DB_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL")  # safe with WAL; FULL fsyncs every commit
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("DB_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Connection pool (both dialects) and, for PostgreSQL, a server-side statement timeout.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_S = int(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+
+def _pool_args() -> dict:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_S,
+        "pool_recycle": DB_POOL_RECYCLE_S,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _sqlite_engine_args() -> dict:
+    args = _pool_args() if ":memory:" not in DATABASE_URL else {}
+    # `timeout` is the driver's own busy wait; busy_timeout below covers the same for every statement.
+    args["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return args
+
+
+def _postgres_engine_args() -> dict:
+    args = _pool_args()
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        args["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return args
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        if ":memory:" not in DATABASE_URL:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    finally:
+        cursor.close()
+
+
 engine_args = {}
 if DATABASE_URL.startswith("sqlite"):
-    engine_args['connect_args'] = {"check_same_thread": False}
+    engine_args = _sqlite_engine_args() if DB_ENGINE_PROFILE == "tuned" else {"connect_args": {"check_same_thread": False}}
+elif DATABASE_URL.startswith("postgres") and DB_ENGINE_PROFILE == "tuned":
+    engine_args = _postgres_engine_args()
 
 engine = create_engine(DATABASE_URL, **engine_args)
+if DATABASE_URL.startswith("sqlite") and DB_ENGINE_PROFILE == "tuned":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+logging.info(f"💽 Database engine profile: {DB_ENGINE_PROFILE}")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -41,12 +102,17 @@ def init_db():
                     with connection.begin():
                         connection.execute(text("SELECT pg_advisory_xact_lock(12345)"))
                         logging.info("Acquired DB lock. Checking schema...")
-                        from database.models import User, Job
+                        from database.models import User, Job, JobCheckpoint, JobLog
+                        from database.migrations import run_migrations
                         Base.metadata.create_all(bind=engine, checkfirst=True)
+                        run_migrations(connection)  # columns/indexes added to existing tables
                         logging.info("Schema check/creation complete. Releasing lock.")
                 else: # For SQLite or other DBs
-                    from database.models import User, Job
+                    from database.models import User, Job, JobCheckpoint, JobLog
+                    from database.migrations import run_migrations
                     Base.metadata.create_all(bind=engine, checkfirst=True)
+                    with connection.begin():
+                        run_migrations(connection)
 
                 logging.info("Database initialization process finished successfully.")
                 return  # Exit the function on success
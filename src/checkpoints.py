@@ -0,0 +1,102 @@
+# src/checkpoints.py
+"""
+Per-job stage checkpoints.
+
+Each pipeline stage saves its output under the job id as soon as it finishes.
+When Celery redelivers a task (worker killed by a deploy, OOM, ...), the
+pipeline reads these back and resumes after the last completed stage instead
+of starting again from Phase 1. Once the job's result is stored they are
+deleted (see single_flight.release_checkpoints), so they never outlive it.
+
+Stages, in pipeline order:
+  search_plan -> tagged_urls -> intermediate_reports / extraction
+  -> final_report -> overview / strategy / report_pdf
+"""
+import logging
+from typing import Any
+
+from database.session import SessionLocal
+from database.models import JobCheckpoint
+
+STAGES = (
+    "search_plan",
+    "tagged_urls",
+    "intermediate_reports",
+    "extraction",
+    "final_report",
+    "overview",
+    "strategy",
+    "report_pdf",
+)
+
+
+class Checkpointer:
+    """Reads and writes the checkpoints of one job. Write failures are never fatal."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._data: dict[str, Any] | None = None
+
+    def _load(self) -> dict[str, Any]:
+        if self._data is None:
+            try:
+                with SessionLocal() as s:
+                    rows = s.query(JobCheckpoint).filter(JobCheckpoint.job_id == self.job_id).all()
+                    self._data = {row.stage: row.data for row in rows}
+            except Exception as e:
+                logging.warning(f"Checkpoints: could not load for job {self.job_id}, starting fresh. Error: {e}")
+                self._data = {}
+        return self._data
+
+    def completed(self) -> list[str]:
+        """Checkpointed stage names, in pipeline order."""
+        data = self._load()
+        return [stage for stage in STAGES if stage in data]
+
+    def has(self, stage: str) -> bool:
+        return stage in self._load()
+
+    def get(self, stage: str, default: Any = None) -> Any:
+        return self._load().get(stage, default)
+
+    def save(self, stage: str, data: Any) -> None:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        self._load()[stage] = data
+        try:
+            with SessionLocal() as s:
+                row = s.query(JobCheckpoint).filter(
+                    JobCheckpoint.job_id == self.job_id, JobCheckpoint.stage == stage
+                ).first()
+                if row:
+                    row.data = data
+                else:
+                    s.add(JobCheckpoint(job_id=self.job_id, stage=stage, data=data))
+                s.commit()
+            logging.info(f"💾 Job {self.job_id}: checkpoint saved for stage '{stage}'.")
+        except Exception as e:
+            logging.warning(f"Checkpoints: could not save '{stage}' for job {self.job_id}. Error: {e}")
+
+
+class NullCheckpointer(Checkpointer):
+    """Keeps nothing; used when the pipeline runs outside a job (CLI, tests)."""
+
+    def __init__(self):
+        super().__init__(job_id="")
+        self._data = {}
+
+    def save(self, stage: str, data: Any) -> None:
+        pass
+
+
+def delete_checkpoints(job_ids: list[str]) -> None:
+    """Deletes every checkpoint of these jobs. Never raises."""
+    if not job_ids:
+        return
+    try:
+        with SessionLocal() as s:
+            deleted = s.query(JobCheckpoint).filter(JobCheckpoint.job_id.in_(job_ids)).delete(synchronize_session=False)
+            s.commit()
+        logging.info(f"🧹 Checkpoints: deleted {deleted} row(s) for job(s) {', '.join(job_ids)}.")
+    except Exception as e:
+        logging.warning(f"Checkpoints: could not delete for job(s) {', '.join(job_ids)}. Error: {e}")
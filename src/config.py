@@ -17,6 +17,43 @@ RAG_API_TOKEN = os.getenv("RAG_API_TOKEN")
 RAG_API_ORG_ID = os.getenv("RAG_API_ORG_ID")
 RAG_API_USER_TYPE = os.getenv("RAG_API_USER_TYPE")
 
+# --- Infrastructure ---
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# --- Gemini quota: shared token buckets (redis | local | none) ---
+GEMINI_RATE_LIMIT_BACKEND = os.getenv("GEMINI_RATE_LIMIT_BACKEND", "redis")
+
+# --- Pipeline execution: one Celery task per job (graph) or a canvas of stage tasks (canvas) ---
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "graph").lower()
+
+# --- Render the report PDF in the worker while visuals/strategy run, so the first download is instant ---
+PRERENDER_PDF = os.getenv("PRERENDER_PDF", "true").lower() in ("1", "true", "yes")
+
+# --- Fair share: per-tenant weights, e.g. "acme=2,globex=0.5" (tenant = company name, case-insensitive) ---
+def _parse_weights(raw: str) -> dict[str, float]:
+    weights = {}
+    for pair in filter(None, (p.strip() for p in raw.split(","))):
+        name, _, value = pair.rpartition("=")
+        try:
+            weights[name.strip().lower()] = float(value)
+        except ValueError:
+            print(f"⚠️ Ignoring malformed TENANT_WEIGHTS entry: {pair!r}")
+    return weights
+
+TENANT_WEIGHTS = _parse_weights(os.getenv("TENANT_WEIGHTS", ""))
+
+# --- Result Caching ---
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "disk")  # disk | redis | none
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(__file__), '..', '.cache'))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(CACHE_DIR, "pdf"))  # rendered report PDFs
+
+# --- Job result storage: large result sections live in a blob store (local | s3) ---
+BLOB_BACKEND = os.getenv("BLOB_BACKEND", "local").lower()
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(os.path.dirname(__file__), '..', '.blobs'))
+BLOB_S3_BUCKET = os.getenv("BLOB_S3_BUCKET")
+BLOB_S3_PREFIX = os.getenv("BLOB_S3_PREFIX", "job-results")
+BLOB_S3_ENDPOINT_URL = os.getenv("BLOB_S3_ENDPOINT_URL")  # e.g. a MinIO URL; unset for AWS S3
+
 # --- Startup Banner ---
 def _mask_key(key_value: str | None) -> str:
     """Mask API key for display, showing only first 4 and last 4 characters."""
@@ -37,6 +74,10 @@ print("🔌 RAG Uploader Status")
 print(f"RAG_API_BASE_URL:    {RAG_API_BASE_URL or '❌ NOT SET'}")
 print(f"RAG_API_TOKEN: {_mask_key(RAG_API_TOKEN)}")
 print(f"RAG_API_ORG_ID:      {RAG_API_ORG_ID or '❌ NOT SET'}")
+print("-" * 60)
+print(f"CACHE_BACKEND:       {CACHE_BACKEND}")
+print(f"PIPELINE_MODE:       {PIPELINE_MODE}")
+print(f"BLOB_BACKEND:        {BLOB_BACKEND}")
 print("="*60 + "\n")
 
 # --- Validation ---
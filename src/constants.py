@@ -10,5 +10,87 @@ MAX_PER_BUCKET_EXTRACT = 9   # News / Patents / Conf / Legalnews
 EXTRACT_BATCH_SIZE     = 18  # 2 × batches → 18 URLs each
 MAX_GEMINI_PARALLEL    = 18  # concurrent Gemini requests in extractor
 
+STREAM_SEARCH_RESULTS  = True  # start Phase 3/4 while Phase 2 queries are still running
+
 # ---- NEW ----  Global “freshness” policy -------------------------
 RECENT_YEARS = 2             # only keep items from the last N calendar years
+
+# ---- Adaptive (AIMD) concurrency for CSE and Gemini call sites -----
+ADAPTIVE_CONCURRENCY = True   # False pins every limiter at its "initial" value
+ADAPTIVE_LIMITS = {   # "max" stays within GEMINI_MAX_CONCURRENCY for the model a site calls
+    "cse":        {"initial": MAX_SEARCH_WORKERS,  "min": 2, "max": 30, "latency_target_s": 5},
+    "extraction": {"initial": MAX_GEMINI_PARALLEL, "min": 4, "max": 24, "latency_target_s": 150},
+    "synthesis":  {"initial": 6,                   "min": 1, "max": 12, "latency_target_s": 300},
+}
+ADAPTIVE_DECREASE_FACTOR         = 0.5   # on 429 / 5xx
+ADAPTIVE_LATENCY_DECREASE_FACTOR = 0.8   # on p95 above target or high error rate
+ADAPTIVE_MAX_ERROR_RATE          = 0.1   # throttled share of the recent window
+ADAPTIVE_DECREASE_COOLDOWN_S     = 5     # at most one cut per cooldown
+
+# ---- Phase 6 visual dashboard ------------------------------------
+MAX_VISUAL_WORKERS            = 5    # concurrent widget generators (one per LLM widget)
+VISUAL_WIDGET_TIMEOUT_SECONDS = 180  # a slower widget is returned as null
+
+# ---- Gemini gateway (src/llm) --------------------------------------
+GEMINI_MAX_CONCURRENCY = {        # process-wide in-flight calls per model
+    "gemini-2.5-pro": 6,
+    "gemini-2.5-flash": 24,
+}
+GEMINI_DEFAULT_MAX_CONCURRENCY = 8   # any model not listed above
+GEMINI_RATE_LIMITS = {            # cluster-wide quota per model, shared via Redis
+    "gemini-2.5-pro":   {"rpm": 150,  "tpm": 2_000_000},
+    "gemini-2.5-flash": {"rpm": 1000, "tpm": 1_000_000},
+}
+GEMINI_DEFAULT_RATE_LIMIT = {"rpm": 150, "tpm": 1_000_000}
+GEMINI_RATE_LIMIT_REDIS_RETRY_S = 30  # after a Redis error, use local buckets this long before trying Redis again
+GEMINI_MAX_RETRIES       = 3         # retries on 429 / 5xx / transport errors
+GEMINI_RETRY_BASE_SECONDS = 2.0      # exponential backoff base (with jitter)
+
+# ---- Caching of external calls ------------------------------------
+CSE_CACHE_TTL_HOURS    = 24    # reuse identical CSE queries for a day
+CSE_CACHE_MAX_ENTRIES  = 5000  # LRU-evicted beyond this
+
+EXTRACTION_PROMPT_VERSION     = "v1"          # bump whenever the Phase 4 prompt/config changes
+EXTRACTION_CACHE_TTL_HOURS    = 72     # reuse a URL's extracted items for three days
+EXTRACTION_CACHE_MAX_ENTRIES  = 20000  # LRU-evicted beyond this
+
+SUBREPORT_PROMPT_VERSION      = "v1"   # bump whenever the Phase 3 prompt/config changes
+SUBREPORT_CACHE_TTL_HOURS     = 72     # reuse a batch's sub-report for three days
+SUBREPORT_CACHE_MAX_ENTRIES   = 2000   # LRU-evicted beyond this
+
+# ---- Single-flight: identical in-flight briefs share one pipeline -------
+SINGLE_FLIGHT                     = True  # False: every submission runs its own pipeline
+SINGLE_FLIGHT_MAX_LEADER_AGE_MIN  = 120   # only attach to leaders younger than this
+SINGLE_FLIGHT_RECHECK_S           = 30    # a waiting follower re-enqueues itself to check the leader again after this
+SINGLE_FLIGHT_WAIT_TIMEOUT_S      = 30 * 60  # about a leader's Phases 1-5; the follower then runs the pipeline itself
+SINGLE_FLIGHT_POLL_SECONDS        = 5     # how often a follower polls for the leader's overview (in its task)
+SINGLE_FLIGHT_OVERVIEW_WAIT_S     = 5 * 60  # the leader's overview is one LLM call; generate our own after this
+
+# ---- Worker status writes ----------------------------------------
+STATUS_FLUSH_INTERVAL_S = 3  # buffered log lines are written at least this often (stage changes flush at once)
+STATUS_BUFFER_MAX_LINES = 1000  # unwritten log lines kept for the next flush while the DB is failing; oldest dropped beyond this
+
+# ---- Job priority & per-tenant fair share -------------------------
+# Redis broker priorities: 0 is served first, 9 last.
+JOB_PRIORITY_LEVELS      = {"interactive": 0, "normal": 3, "batch": 6}
+FAIR_SHARE_JOBS_PER_STEP = 2   # every N in-flight jobs of a tenant (÷ its weight) push its new jobs one step back
+FAIR_SHARE_MAX_PENALTY   = 3   # at most this many steps
+FAIR_SHARE_METRICS_WINDOW_HOURS = 24  # wait-time stats cover jobs started in this window
+
+# --- Result storage (src/result_store.py) ---
+RESULT_SECTION_CACHE_SIZE = 32  # result sections kept decoded in memory per process (blobs are immutable)
+
+# --- Job history listing (GET /api/research/history) ---
+HISTORY_PAGE_SIZE     = 50   # jobs per page when `limit` is not given
+HISTORY_MAX_PAGE_SIZE = 200  # upper bound for `limit`
+
+# --- Report PDFs (src/utils/pdf_cache.py) ---
+PDF_RENDER_VERSION  = "v1"         # bump whenever pdf_generator.py changes how a report is rendered
+PDF_CACHE_MAX_BYTES = 512 * 2**20  # rendered PDFs kept on disk, LRU-evicted beyond this; 0 disables the cache
+PDF_RENDER_WORKERS       = 2   # WeasyPrint worker processes per API process (src/utils/pdf_render_service.py)
+PDF_RENDER_MAX_QUEUE     = 8   # renders allowed to wait for a worker; more get 429
+PDF_RENDER_RETRY_AFTER_S = 5   # Retry-After sent with that 429
+
+# --- Export Center (POST /api/research/{job_id}/export) ---
+EXPORT_MAX_PARALLEL_ASSETS = 4          # export files generated at the same time
+EXPORT_ZIP_CHUNK_BYTES     = 64 * 1024  # the archive is streamed in pieces of about this much input
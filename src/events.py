@@ -0,0 +1,103 @@
+# src/events.py
+"""
+Per-job event channel on Redis pub/sub.
+
+The Celery worker publishes every status change, log line and the final
+outcome of a job on `job_events:<job_id>`; the SSE endpoint subscribes to it
+instead of re-reading the job row every couple of seconds. Publishing is
+best-effort: the database stays the source of truth, so a lost event only
+delays the browser until its next reconnect / periodic re-check.
+
+Event payloads (JSON):
+  {"type": "status", "status": ..., "stage": ..., "progress": ...}  (fields optional)
+  {"type": "log", "message": ...}
+  {"type": "finished", "status": "completed" | "failed"}
+"""
+import json
+import logging
+import threading
+from typing import AsyncIterator
+
+import redis
+import redis.asyncio as aioredis
+
+from src import config
+
+_client: redis.Redis | None = None
+_client_lock = threading.Lock()
+
+
+def job_channel(job_id: str) -> str:
+    return f"job_events:{job_id}"
+
+
+def _get_client() -> redis.Redis:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = redis.Redis.from_url(config.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        return _client
+
+
+def publish_job_event(job_id: str, event: dict) -> None:
+    """
+    Publishes one event for a job. Never raises. Blocking (up to the socket timeout
+    when Redis is slow), so call it from async code through asyncio.to_thread.
+    """
+    try:
+        _get_client().publish(job_channel(job_id), json.dumps(event, default=str))
+    except Exception as e:
+        logging.warning(f"Events: could not publish {event.get('type')} for job {job_id}. Error: {e}")
+
+
+class JobEventSubscription:
+    """
+    Async subscription to one job's channel:
+
+        async with JobEventSubscription(job_id) as sub:
+            async for event in sub.events(timeout=15):
+                ...   # event is a dict, or None after `timeout` seconds of silence
+
+    Entering the context raises if Redis is unreachable, so callers can fall back to polling.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._redis = None
+        self._pubsub = None
+
+    async def open(self) -> "JobEventSubscription":
+        self._redis = aioredis.from_url(config.REDIS_URL, socket_connect_timeout=2)
+        try:
+            self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(job_channel(self.job_id))
+        except Exception:
+            await self._redis.aclose()
+            raise
+        return self
+
+    async def close(self) -> None:
+        try:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.aclose()
+        except Exception as e:
+            logging.warning(f"Events: error closing subscription for job {self.job_id}: {e}")
+        finally:
+            await self._redis.aclose()
+
+    async def __aenter__(self) -> "JobEventSubscription":
+        return await self.open()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def events(self, timeout: float) -> AsyncIterator[dict | None]:
+        while True:
+            message = await self._pubsub.get_message(timeout=timeout)
+            if message is None:
+                yield None
+                continue
+            try:
+                yield json.loads(message["data"])
+            except (TypeError, ValueError):
+                logging.warning(f"Events: dropping malformed message on {job_channel(self.job_id)}")
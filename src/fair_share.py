@@ -0,0 +1,130 @@
+# src/fair_share.py
+"""
+Priority levels and weighted fair share for research jobs.
+
+A job's broker priority is decided at dispatch time:
+
+    base level (interactive 0 / normal 3 / batch 6)
+  + one step for every FAIR_SHARE_JOBS_PER_STEP jobs the tenant already has
+    pending or running, divided by the tenant's weight (max FAIR_SHARE_MAX_PENALTY)
+
+so a tenant that floods the queue pushes *its own* new jobs back, while other
+tenants' interactive jobs keep being served first. Tenants are companies
+(users without a company are their own tenant); weights come from the
+TENANT_WEIGHTS env var.
+"""
+import logging
+import math
+from datetime import datetime, timedelta
+
+import redis
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import Job as DBJob, User as DBUser
+from src import config, constants
+
+MAX_BROKER_PRIORITY = 9
+BROKER_PRIORITY_SEP = ":"  # must match broker_transport_options["sep"] in celery_worker.py
+# Every queue the workers consume (see task_routes in celery_worker.py)
+CELERY_QUEUES = ("celery", "planning", "search", "extraction", "synthesis", "final", "visuals", "strategy", "rag")
+
+
+def tenant_key(user: DBUser | None, user_id: str | None = None) -> str:
+    if user is not None and user.company_name:
+        return user.company_name.strip().lower()
+    return f"user:{user.id if user is not None else user_id}"
+
+
+def tenant_weight(tenant: str) -> float:
+    return max(config.TENANT_WEIGHTS.get(tenant, 1.0), 0.01)
+
+
+def _inflight_jobs(db: Session, user: DBUser) -> int:
+    query = db.query(func.count(DBJob.id)).filter(DBJob.status.in_(("pending", "running")))
+    if user.company_name:
+        query = query.join(DBUser, DBJob.user_id == DBUser.id).filter(
+            func.lower(func.trim(DBUser.company_name)) == tenant_key(user)
+        )
+    else:
+        query = query.filter(DBJob.user_id == user.id)
+    return query.scalar() or 0
+
+
+def compute_priority(db: Session, user: DBUser, level: str) -> int:
+    """Broker priority (0 = first) for a new job of `user` at priority `level`."""
+    base = constants.JOB_PRIORITY_LEVELS.get(level, constants.JOB_PRIORITY_LEVELS["normal"])
+    tenant = tenant_key(user)
+    inflight = _inflight_jobs(db, user)
+    penalty = min(constants.FAIR_SHARE_MAX_PENALTY,
+                  int(inflight / tenant_weight(tenant) / constants.FAIR_SHARE_JOBS_PER_STEP))
+    priority = min(MAX_BROKER_PRIORITY, base + penalty)
+    logging.info(f"Fair share: tenant '{tenant}' has {inflight} in-flight job(s); "
+                 f"'{level}' job queued at priority {priority}.")
+    return priority
+
+
+def broker_queue_depth(queues: list[str]) -> dict[str, int] | None:
+    """Messages waiting per Celery queue (all priority sub-queues summed), or None if Redis is unreachable."""
+    try:
+        client = redis.Redis.from_url(config.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        depth = {}
+        for queue in queues:
+            names = [queue] + [f"{queue}{BROKER_PRIORITY_SEP}{step}" for step in range(1, MAX_BROKER_PRIORITY + 1)]
+            with client.pipeline() as pipe:
+                for name in names:
+                    pipe.llen(name)
+                depth[queue] = sum(pipe.execute())
+        return depth
+    except Exception as e:
+        logging.warning(f"Fair share: could not read broker queue depth. Error: {e}")
+        return None
+
+
+def _p95(values: list[float]) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def queue_metrics(db: Session, window_hours: int = constants.FAIR_SHARE_METRICS_WINDOW_HOURS) -> list[dict]:
+    """Per-tenant queue depth and wait time (created -> first started) statistics."""
+    now = datetime.utcnow()
+    since = now - timedelta(hours=window_hours)
+    rows = (
+        db.query(DBJob.status, DBJob.priority, DBJob.created_at, DBJob.started_at,
+                 DBJob.user_id, DBUser.company_name)
+        .outerjoin(DBUser, DBJob.user_id == DBUser.id)
+        .filter((DBJob.status.in_(("pending", "running"))) | (DBJob.started_at >= since))
+        .all()
+    )
+
+    tenants: dict[str, dict] = {}
+    waits: dict[str, list[float]] = {}
+    for row in rows:
+        tenant = row.company_name.strip().lower() if row.company_name else f"user:{row.user_id}"
+        m = tenants.setdefault(tenant, {
+            "tenant": tenant, "weight": tenant_weight(tenant), "pending": 0, "running": 0,
+            "pending_by_priority": {}, "oldest_pending_seconds": None, "started_in_window": 0,
+        })
+        if row.status == "pending":
+            m["pending"] += 1
+            level = row.priority or "normal"
+            m["pending_by_priority"][level] = m["pending_by_priority"].get(level, 0) + 1
+            if row.created_at:
+                age = (now - row.created_at).total_seconds()
+                m["oldest_pending_seconds"] = max(m["oldest_pending_seconds"] or 0.0, round(age, 1))
+        elif row.status == "running":
+            m["running"] += 1
+        if row.started_at and row.created_at and row.started_at >= since:
+            m["started_in_window"] += 1
+            waits.setdefault(tenant, []).append((row.started_at - row.created_at).total_seconds())
+
+    for tenant, m in tenants.items():
+        w = waits.get(tenant, [])
+        m["avg_wait_seconds"] = round(sum(w) / len(w), 1) if w else None
+        m["p95_wait_seconds"] = round(_p95(w), 1) if w else None
+        m["max_wait_seconds"] = round(max(w), 1) if w else None
+
+    return sorted(tenants.values(), key=lambda m: (-m["pending"], m["tenant"]))
@@ -0,0 +1,5 @@
+# src/llm package: shared Gemini gateway used by every pipeline phase
+from src.llm.gateway import LLMGateway, LLMMetrics, get_gateway, is_retryable_error
+from src.llm.rate_limiter import get_rate_limiter
+
+__all__ = ["LLMGateway", "LLMMetrics", "get_gateway", "is_retryable_error", "get_rate_limiter"]
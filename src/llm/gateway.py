@@ -0,0 +1,188 @@
+# src/llm/gateway.py
+"""
+Process-wide gateway for every Gemini call made by the pipeline.
+
+- One long-lived genai.Client per process (re-created after a fork), so the
+  underlying HTTP connections are pooled and reused across phases and jobs.
+- A concurrency cap per model (gemini-2.5-pro vs gemini-2.5-flash) shared by
+  every thread and event loop in the process.
+- A cluster-wide RPM/TPM token bucket per model (see rate_limiter.py).
+- Retries with exponential backoff on 429 / 5xx and transport errors.
+- Per-call latency, token counts and retry counts, aggregated per model.
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from src import config, constants
+from src.llm.rate_limiter import estimate_tokens, get_rate_limiter
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMMetrics:
+    """Thread-safe per-model call statistics."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._window = window
+        self._models: dict[str, dict] = {}
+
+    def record(self, model: str, latency: float, usage, retries: int, ok: bool) -> None:
+        with self._lock:
+            m = self._models.setdefault(model, {
+                "calls": 0, "errors": 0, "retries": 0,
+                "prompt_tokens": 0, "output_tokens": 0, "thinking_tokens": 0,
+                "latencies": deque(maxlen=self._window),
+            })
+            m["calls"] += 1
+            m["retries"] += retries
+            if not ok:
+                m["errors"] += 1
+            m["latencies"].append(latency)
+            if usage is not None:
+                m["prompt_tokens"] += usage.prompt_token_count or 0
+                m["output_tokens"] += usage.candidates_token_count or 0
+                m["thinking_tokens"] += usage.thoughts_token_count or 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for model, m in self._models.items():
+                latencies = sorted(m["latencies"])
+                out[model] = {
+                    **{k: v for k, v in m.items() if k != "latencies"},
+                    "latency_avg_s": round(sum(latencies) / len(latencies), 2) if latencies else None,
+                    "latency_p95_s": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None,
+                }
+            return out
+
+
+def is_retryable_error(e: Exception) -> bool:
+    """True for quota/overload/transport failures worth retrying."""
+    if isinstance(e, genai_errors.APIError):
+        return e.code in RETRYABLE_STATUS_CODES
+    return isinstance(e, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+class LLMGateway:
+    def __init__(self, api_key: str | None):
+        self._api_key = api_key
+        self._client: genai.Client | None = None
+        self._client_pid: int | None = None
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self.metrics = LLMMetrics()
+
+    # --- plumbing ---------------------------------------------------
+    @property
+    def client(self) -> genai.Client:
+        with self._lock:
+            if self._client is None or self._client_pid != os.getpid():
+                pool_size = sum(constants.GEMINI_MAX_CONCURRENCY.values())
+                self._client = genai.Client(
+                    api_key=self._api_key,
+                    http_options=types.HttpOptions(client_args={
+                        "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                    }),
+                )
+                self._client_pid = os.getpid()
+            return self._client
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(model)
+            if sem is None:
+                limit = constants.GEMINI_MAX_CONCURRENCY.get(model, constants.GEMINI_DEFAULT_MAX_CONCURRENCY)
+                sem = self._semaphores[model] = threading.BoundedSemaphore(limit)
+            return sem
+
+    def _timed(self, model: str, contents, attempt_fn):
+        """
+        Runs attempt_fn() -> (result, usage) under the model's concurrency limit and
+        the cluster-wide rate limit, with retries and metrics.
+        """
+        retries = 0
+        t0 = time.perf_counter()
+        limiter = get_rate_limiter()
+        estimated_tokens = estimate_tokens(contents)
+        while True:
+            try:
+                waited = limiter.acquire(model, estimated_tokens)
+                if waited > 1:
+                    logging.info(f"LLM {model}: waited {waited:0.1f}s for rate-limit budget")
+                with self._semaphore(model):
+                    result, usage = attempt_fn()
+                break
+            except Exception as e:
+                if retries >= constants.GEMINI_MAX_RETRIES or not is_retryable_error(e):
+                    self.metrics.record(model, time.perf_counter() - t0, None, retries, ok=False)
+                    raise
+                retries += 1
+                delay = constants.GEMINI_RETRY_BASE_SECONDS * (2 ** (retries - 1)) * (1 + random.random())
+                logging.warning(f"LLM {model}: retryable error ({e}); retry {retries}/{constants.GEMINI_MAX_RETRIES} in {delay:.1f}s")
+                time.sleep(delay)
+
+        latency = time.perf_counter() - t0
+        # URL context and output tokens are unknown up front; charge the difference now.
+        actual_tokens = getattr(usage, "total_token_count", None) or 0
+        limiter.debit(model, actual_tokens - estimated_tokens)
+        self.metrics.record(model, latency, usage, retries, ok=True)
+        logging.info(
+            f"LLM {model}: {latency:0.1f}s, "
+            f"{getattr(usage, 'prompt_token_count', None) or 0} prompt / "
+            f"{getattr(usage, 'candidates_token_count', None) or 0} output tokens, {retries} retries"
+        )
+        return result
+
+    # --- sync entry points -------------------------------------------
+    def generate(self, model: str, contents, config: types.GenerateContentConfig):
+        """Non-streaming call; returns the raw GenerateContentResponse."""
+        def attempt():
+            response = self.client.models.generate_content(model=model, contents=contents, config=config)
+            return response, response.usage_metadata
+        return self._timed(model, contents, attempt)
+
+    def generate_text(self, model: str, contents, config: types.GenerateContentConfig, stream: bool = True) -> str:
+        """Returns the concatenated response text, streaming by default."""
+        def attempt():
+            if not stream:
+                response = self.client.models.generate_content(model=model, contents=contents, config=config)
+                return response.text or "", response.usage_metadata
+            fragments, usage = [], None
+            for chunk in self.client.models.generate_content_stream(model=model, contents=contents, config=config):
+                fragments.append(chunk.text or "")
+                usage = chunk.usage_metadata or usage
+            return "".join(fragments), usage
+        return self._timed(model, contents, attempt)
+
+    # --- async entry points ------------------------------------------
+    async def agenerate(self, model: str, contents, config: types.GenerateContentConfig):
+        """Async wrapper around generate(); the blocking call runs in a worker thread."""
+        return await asyncio.to_thread(self.generate, model, contents, config)
+
+    async def agenerate_text(self, model: str, contents, config: types.GenerateContentConfig, stream: bool = True) -> str:
+        """Async wrapper around generate_text()."""
+        return await asyncio.to_thread(self.generate_text, model, contents, config, stream)
+
+
+_gateway: LLMGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Returns the process-wide gateway, creating it on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(config.GEMINI_API_KEY)
+        return _gateway
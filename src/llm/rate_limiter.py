@@ -0,0 +1,222 @@
+# src/llm/rate_limiter.py
+"""
+Cluster-wide Gemini rate limiting.
+
+Every model gets two token buckets: requests per minute and tokens per
+minute. With the Redis backend the buckets live in the Celery broker, so all
+worker processes on all hosts draw from the same quota; the local backend
+keeps them in memory (tests, single-process runs, or when Redis is down).
+After a Redis error the limiter stays on its local buckets for
+GEMINI_RATE_LIMIT_REDIS_RETRY_S instead of paying Redis' socket timeout on
+every call.
+"""
+import logging
+import threading
+import time
+
+from src import config, constants
+
+# Refills both buckets, then takes `cost` from each if possible.
+# Returns 0 on success or the number of milliseconds to wait before retrying.
+# ARGV: rpm, tpm, request_cost, token_cost, force (1 = always deduct, may go negative)
+_TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local caps = {tonumber(ARGV[1]), tonumber(ARGV[2])}
+local costs = {tonumber(ARGV[3]), tonumber(ARGV[4])}
+local force = tonumber(ARGV[5])
+local levels = {}
+local wait = 0
+for i = 1, 2 do
+  local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+  local level = tonumber(state[1]) or caps[i]
+  local ts = tonumber(state[2]) or now
+  local rate = caps[i] / 60000.0
+  level = math.min(caps[i], level + (now - ts) * rate)
+  levels[i] = level
+  local cost = math.min(costs[i], caps[i])
+  if level < cost then
+    wait = math.max(wait, math.ceil((cost - level) / rate))
+  end
+end
+if wait > 0 and force == 0 then
+  for i = 1, 2 do
+    redis.call('HSET', KEYS[i], 'level', levels[i], 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+  end
+  return wait
+end
+for i = 1, 2 do
+  redis.call('HSET', KEYS[i], 'level', levels[i] - costs[i], 'ts', now)
+  redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return 0
+"""
+
+
+def _limits_for(model: str) -> tuple[int, int]:
+    limits = constants.GEMINI_RATE_LIMITS.get(model, constants.GEMINI_DEFAULT_RATE_LIMIT)
+    return limits["rpm"], limits["tpm"]
+
+
+class LocalRateLimiter:
+    """In-process token buckets with the same semantics as the Redis script."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, list[float]] = {}  # model -> [req_level, tok_level, ts]
+
+    def _take(self, model: str, requests: int, tokens: int, force: bool) -> float:
+        rpm, tpm = _limits_for(model)
+        now = time.monotonic()
+        with self._lock:
+            req_level, tok_level, ts = self._buckets.get(model, [rpm, tpm, now])
+            elapsed = now - ts
+            req_level = min(rpm, req_level + elapsed * rpm / 60)
+            tok_level = min(tpm, tok_level + elapsed * tpm / 60)
+            wait = max(
+                (min(requests, rpm) - req_level) * 60 / rpm,
+                (min(tokens, tpm) - tok_level) * 60 / tpm,
+                0,
+            )
+            if wait > 0 and not force:
+                self._buckets[model] = [req_level, tok_level, now]
+                return wait
+            self._buckets[model] = [req_level - requests, tok_level - tokens, now]
+            return 0
+
+    def acquire(self, model: str, tokens: int) -> float:
+        """Blocks until one request and `tokens` tokens are available. Returns seconds waited."""
+        waited = 0.0
+        while (wait := self._take(model, 1, tokens, force=False)) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    def debit(self, model: str, tokens: int) -> None:
+        """Charges tokens without waiting (used to reconcile estimates with actual usage)."""
+        if tokens > 0:
+            self._take(model, 0, tokens, force=True)
+
+
+class RedisRateLimiter:
+    """Token buckets shared by every worker through Redis."""
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url, socket_timeout=5)
+        self._redis.ping()
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+
+    def _take(self, model: str, requests: int, tokens: int, force: bool) -> float:
+        rpm, tpm = _limits_for(model)
+        keys = [f"ratelimit:gemini:{model}:requests", f"ratelimit:gemini:{model}:tokens"]
+        wait_ms = self._script(keys=keys, args=[rpm, tpm, requests, tokens, 1 if force else 0])
+        return int(wait_ms) / 1000
+
+    def acquire(self, model: str, tokens: int) -> float:
+        waited = 0.0
+        while (wait := self._take(model, 1, tokens, force=False)) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    def debit(self, model: str, tokens: int) -> None:
+        if tokens > 0:
+            self._take(model, 0, tokens, force=True)
+
+
+class FailoverRateLimiter:
+    """Uses Redis while it is reachable and falls back to local buckets otherwise."""
+
+    def __init__(self, primary: RedisRateLimiter, fallback: LocalRateLimiter,
+                 retry_after_s: float = constants.GEMINI_RATE_LIMIT_REDIS_RETRY_S):
+        self._primary = primary
+        self._fallback = fallback
+        self._retry_after_s = retry_after_s
+        self._lock = threading.Lock()
+        self._down_until: float | None = None  # set while Redis is considered down
+
+    def _primary_available(self) -> bool:
+        with self._lock:
+            return self._down_until is None or time.monotonic() >= self._down_until
+
+    def _primary_failed(self, error: Exception) -> None:
+        with self._lock:
+            outage_started = self._down_until is None
+            self._down_until = time.monotonic() + self._retry_after_s
+        if outage_started:
+            logging.warning(f"Rate limiter: Redis unavailable, using local buckets "
+                            f"(retrying Redis every {self._retry_after_s:.0f}s). Error: {error}")
+
+    def _primary_ok(self) -> None:
+        if self._down_until is None:
+            return
+        with self._lock:
+            recovered, self._down_until = self._down_until is not None, None
+        if recovered:
+            logging.info("Rate limiter: Redis reachable again, back to shared buckets.")
+
+    def acquire(self, model: str, tokens: int) -> float:
+        if self._primary_available():
+            try:
+                waited = self._primary.acquire(model, tokens)
+                self._primary_ok()
+                return waited
+            except Exception as e:
+                self._primary_failed(e)
+        return self._fallback.acquire(model, tokens)
+
+    def debit(self, model: str, tokens: int) -> None:
+        if self._primary_available():
+            try:
+                self._primary.debit(model, tokens)
+                self._primary_ok()
+                return
+            except Exception as e:
+                self._primary_failed(e)
+        self._fallback.debit(model, tokens)
+
+
+class NullRateLimiter:
+    def acquire(self, model: str, tokens: int) -> float:
+        return 0.0
+
+    def debit(self, model: str, tokens: int) -> None:
+        return None
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Returns the process-wide limiter selected by GEMINI_RATE_LIMIT_BACKEND (redis | local | none)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is not None:
+            return _limiter
+        backend = (config.GEMINI_RATE_LIMIT_BACKEND or "redis").lower()
+        if backend == "none":
+            _limiter = NullRateLimiter()
+        elif backend == "local":
+            _limiter = LocalRateLimiter()
+        else:
+            try:
+                _limiter = FailoverRateLimiter(RedisRateLimiter(config.REDIS_URL), LocalRateLimiter())
+            except Exception as e:
+                logging.warning(f"Rate limiter: could not reach Redis, using local buckets. Error: {e}")
+                _limiter = LocalRateLimiter()
+        return _limiter
+
+
+def estimate_tokens(contents) -> int:
+    """Rough prompt size (~4 characters per token) used to reserve TPM before a call."""
+    chars = 0
+    for content in contents if isinstance(contents, list) else [contents]:
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in getattr(content, "parts", None) or []:
+            chars += len(getattr(part, "text", None) or "")
+    return max(1, chars // 4)
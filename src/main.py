@@ -9,61 +9,43 @@ from typing import Callable, Any, List, Dict  # <-- Add List and Dict
 
 # Keep all your existing phase imports
 from src.phase1_planner import generate_search_queries
-from src.phase2_searcher import execute_cse_searches
-from src.phase3_intermediate_synthesizer import synthesize_all_intermediate_reports
+from src.phase2_searcher import execute_cse_searches, stream_cse_searches
+from src.phase3_intermediate_synthesizer import synthesize_all_intermediate_reports, synthesize_intermediate_report
 from src.phase5_final_synthesizer import synthesize_final_report
-from src.phase4_extractor import run_structured_extraction
-from src.constants import MAX_SEARCH_WORKERS, MAX_GENERAL_FOR_REPORT, MAX_PER_BUCKET_EXTRACT
+from src.phase4_extractor import run_structured_extraction, run_streaming_extraction
+from src.constants import (
+    MAX_SEARCH_WORKERS, MAX_GENERAL_FOR_REPORT, MAX_PER_BUCKET_EXTRACT, STREAM_SEARCH_RESULTS,
+    ADAPTIVE_LIMITS
+)
 from src.config import assert_all_env
+from src.checkpoints import Checkpointer, NullCheckpointer
 
 # Configuration: adjust parallelism limits
-MAX_BATCH_WORKERS = 6
+# Thread ceiling for sub-report synthesis; the adaptive "synthesis" limiter sets the live concurrency.
+MAX_BATCH_WORKERS = ADAPTIVE_LIMITS["synthesis"]["max"]
 
-async def execute_research_pipeline(
-    user_query: str, 
-    update_status: Callable
-) -> dict:
+REPORT_BATCH_SIZE = 15  # URLs per intermediate sub-report
+EXTRACTION_BUCKETS = {"News", "Patents", "Conference", "Legalnews"}
+REPORT_BUCKETS = {"General", "News"}  # Let's use "News" for the main report as well.
+
+
+def _allocate_urls(tagged_urls: List[tuple]) -> tuple[List[str], List[str], Dict[str, str]]:
     """
-    OPTIMIZED: Pipeline with better parallelization.
+    Splits the tagged search results into the report pool (Phase 3/5) and the
+    extraction list (Phase 4). Returns (report_urls, extract_urls, url2tag).
     """
-    assert_all_env()
-    start_time = time.perf_counter()
-    logging.info(f"--- Starting Optimized Pipeline for query: '{user_query[:50]}...' ---")
-    
-    # Phase 1 & 2 unchanged...
-    await update_status(stage="planning", progress=10, message="Analyzing request and planning search strategies...")
-    search_queries = generate_search_queries(user_query)
-    if not search_queries:
-        raise ValueError("Pipeline Error: No search queries were generated.")
-    
-    total_queries = sum(len(queries) for queries in search_queries.values())
-    logging.info(f"-> Phase 1 Complete: {total_queries} queries generated.")
-    
-    await update_status(stage="searching", progress=25, message=f"Scouring {total_queries} web sources...")
-    tagged_urls = await execute_cse_searches(search_queries)
-    if not tagged_urls:
-        raise ValueError("Pipeline Error: No URLs were collected from search.")
-    
-    logging.info(f"-> Phase 2 Complete: {len(tagged_urls)} URLs collected.")
-    
-    # +++ START: REVISED URL DISTRIBUTION LOGIC +++
-    
     # 1. Create a dictionary to hold all URLs bucketed by their tag.
     bucketed: Dict[str, List[str]] = {}
     for url, bucket in tagged_urls:
         bucketed.setdefault(bucket, []).append(url)
 
-    # 2. Define which buckets are for specific data extraction vs. general reporting.
-    extraction_buckets = {"News", "Patents", "Conference", "Legalnews"}
-    report_buckets = {"General", "News"}  # Let's use "News" for the main report as well.
-
-    # 3. Create a pool of all unique URLs for potential use in the report.
+    # 2. Create a pool of all unique URLs for potential use in the report.
     # We prioritize URLs from report-oriented buckets, but include others to ensure we have content.
     report_url_pool = []
     seen_urls = set()
 
     # Add URLs from designated report buckets first
-    for bucket_name in report_buckets:
+    for bucket_name in REPORT_BUCKETS:
         for url in bucketed.get(bucket_name, []):
             if url not in seen_urls:
                 report_url_pool.append(url)
@@ -71,19 +53,19 @@ async def execute_research_pipeline(
     
     # Add URLs from other buckets if we need more content, avoiding duplicates
     for bucket_name, urls in bucketed.items():
-        if bucket_name not in report_buckets:
+        if bucket_name not in REPORT_BUCKETS:
             for url in urls:
                 if url not in seen_urls:
                     report_url_pool.append(url)
                     seen_urls.add(url)
 
-    # 4. Create the final lists for each pipeline path, applying limits.
+    # 3. Create the final lists for each pipeline path, applying limits.
     report_urls = report_url_pool[:MAX_GENERAL_FOR_REPORT]
     
     extract_urls: List[str] = []
     url2tag: Dict[str, str] = {}
     
-    for bucket_name in extraction_buckets:
+    for bucket_name in EXTRACTION_BUCKETS:
         # Get URLs for this extraction bucket, applying the per-bucket limit
         urls_for_bucket = bucketed.get(bucket_name, [])[:MAX_PER_BUCKET_EXTRACT]
         extract_urls.extend(urls_for_bucket)
@@ -92,51 +74,200 @@ async def execute_research_pipeline(
     
     # Ensure there are no duplicates in the final list
     extract_urls = list(dict.fromkeys(extract_urls))
+    return report_urls, extract_urls, url2tag
 
-    logging.info(f"-> URL Distribution: Report={len(report_urls)}, Extract={len(extract_urls)}")
-    
-    # +++ END: REVISED URL DISTRIBUTION LOGIC +++
 
-    # 🔥 CRITICAL CHANGE: Start extraction and synthesis in parallel
-    await update_status(stage="synthesizing", progress=50, message="Starting parallel analysis...")
-    
-    # Start extraction immediately
-    extraction_task = asyncio.create_task(
-        run_structured_extraction(extract_urls, user_query, url2tag)
-    )
-    
-    # Start intermediate synthesis in parallel (with safety check)
+async def run_planning(user_query: str, update_status: Callable, checkpointer: Checkpointer) -> dict:
+    """Phase 1: the search plan (queries per bucket)."""
+    search_queries = checkpointer.get("search_plan")
+    if search_queries:
+        logging.info("-> Phase 1 restored from checkpoint.")
+        return search_queries
+
+    await update_status(stage="planning", progress=10, message="Analyzing request and planning search strategies...")
+    search_queries = generate_search_queries(user_query)
+    if not search_queries:
+        raise ValueError("Pipeline Error: No search queries were generated.")
+
+    total_queries = sum(len(queries) for queries in search_queries.values())
+    logging.info(f"-> Phase 1 Complete: {total_queries} queries generated.")
+    await asyncio.to_thread(checkpointer.save, "search_plan", search_queries)
+    return search_queries
+
+
+async def run_search(user_query: str, search_queries: dict, update_status: Callable,
+                     checkpointer: Checkpointer) -> List[tuple]:
+    """Phase 2 (batch mode): every CSE query, as deduped (url, bucket) pairs."""
+    if checkpointer.has("tagged_urls"):
+        logging.info("-> Phase 2 restored from checkpoint.")
+        return [tuple(pair) for pair in checkpointer.get("tagged_urls")]
+
+    total_queries = sum(len(queries) for queries in search_queries.values())
+    await update_status(stage="searching", progress=25, message=f"Scouring {total_queries} web sources...")
+    tagged_urls = await execute_cse_searches(search_queries)
+    if not tagged_urls:
+        raise ValueError("Pipeline Error: No URLs were collected from search.")
+
+    logging.info(f"-> Phase 2 Complete: {len(tagged_urls)} URLs collected.")
+    await asyncio.to_thread(checkpointer.save, "tagged_urls", [list(pair) for pair in tagged_urls])
+    return tagged_urls
+
+
+async def run_extraction(user_query: str, tagged_urls: List[tuple], checkpointer: Checkpointer) -> dict:
+    """Phase 4 (batch mode): structured extraction over the allocated extraction URLs."""
+    if checkpointer.has("extraction"):
+        logging.info("-> Phase 4 restored from checkpoint.")
+        return checkpointer.get("extraction")
+    _, extract_urls, url2tag = _allocate_urls(tagged_urls)
+    payload = await run_structured_extraction(extract_urls, user_query, url2tag)
+    await asyncio.to_thread(checkpointer.save, "extraction", payload)
+    return payload
+
+
+async def run_synthesis(user_query: str, tagged_urls: List[tuple], checkpointer: Checkpointer) -> dict:
+    """
+    Phase 3 (batch mode): intermediate sub-reports over the allocated report URLs.
+    Returns {"report_urls": [...], "reports": [...]}.
+    """
+    if checkpointer.has("intermediate_reports"):
+        logging.info("-> Phase 3 restored from checkpoint.")
+        return checkpointer.get("intermediate_reports")
+    report_urls, _, _ = _allocate_urls(tagged_urls)
     if not report_urls:
         logging.warning("No URLs were allocated for the main report. The final report may be sparse.")
-        intermediate_reports = []
-        # Only wait for extraction task
-        logging.info("-> Running extraction only (no URLs for report synthesis)...")
-        _, extraction_payload = await asyncio.gather(
-            asyncio.sleep(0),  # Dummy task to keep gather structure
-            extraction_task
-        )
+        reports = []
     else:
-        url_batches = [report_urls[i:i+15] for i in range(0, len(report_urls), 15)]
-        intermediate_reports_task = asyncio.get_event_loop().run_in_executor(
+        url_batches = [report_urls[i:i+REPORT_BATCH_SIZE] for i in range(0, len(report_urls), REPORT_BATCH_SIZE)]
+        reports = await asyncio.get_event_loop().run_in_executor(
             ThreadPoolExecutor(1),
             synthesize_all_intermediate_reports,
             user_query,
             url_batches,
             "reports/intermediate_reports",
             True,
-            MAX_BATCH_WORKERS
+            None
         )
-        
-        # Wait for both to complete
-        logging.info("-> Running extraction and synthesis in parallel...")
-        intermediate_reports, extraction_payload = await asyncio.gather(
-            intermediate_reports_task,
-            extraction_task
-        )
-    
-    logging.info(f"-> Parallel processing complete.")
-    
-    # Final synthesis
+    checkpoint = {"report_urls": report_urls, "reports": reports}
+    await asyncio.to_thread(checkpointer.save, "intermediate_reports", checkpoint)
+    return checkpoint
+
+
+async def run_analysis(user_query: str, tagged_urls: List[tuple], update_status: Callable,
+                       checkpointer: Checkpointer):
+    """
+    Phase 3 + 4 (batch mode): allocate URLs, then run extraction and
+    intermediate synthesis in parallel. Either half that is already
+    checkpointed is restored instead of re-run.
+    Returns (report_urls, intermediate_reports, extraction_payload).
+    """
+    report_urls, extract_urls, _ = _allocate_urls(tagged_urls)
+    logging.info(f"-> URL Distribution: Report={len(report_urls)}, Extract={len(extract_urls)}")
+
+    # 🔥 CRITICAL CHANGE: Start extraction and synthesis in parallel
+    await update_status(stage="synthesizing", progress=50, message="Starting parallel analysis...")
+
+    # Wait for both to complete
+    logging.info("-> Running extraction and synthesis in parallel...")
+    synthesized, extraction_payload = await asyncio.gather(
+        run_synthesis(user_query, tagged_urls, checkpointer),
+        run_extraction(user_query, tagged_urls, checkpointer)
+    )
+    return synthesized["report_urls"], synthesized["reports"], extraction_payload
+
+
+async def _stream_search_and_analyze(user_query: str, search_queries: dict, update_status: Callable,
+                                     checkpointer: Checkpointer):
+    """
+    Streaming mode: consume Phase 2 results as each query finishes. Extraction
+    starts per URL while its bucket still has quota, and an intermediate
+    sub-report starts as soon as a 15-URL batch fills up.
+    """
+    total_queries = sum(len(queries) for queries in search_queries.values())
+    await update_status(stage="searching", progress=25, message=f"Scouring {total_queries} web sources (streaming analysis)...")
+
+    loop = asyncio.get_event_loop()
+    batch_pool = ThreadPoolExecutor(MAX_BATCH_WORKERS)
+    url_queue: asyncio.Queue = asyncio.Queue()
+    url2tag: Dict[str, str] = {}
+    extraction_task = asyncio.create_task(run_streaming_extraction(url_queue, user_query, url2tag))
+
+    bucket_counts: Dict[str, int] = {}
+    tagged_urls: List[list] = []
+    report_urls: List[str] = []
+    overflow_urls: List[str] = []  # non-report buckets, only used to top up the report pool
+    seen_report_urls: set = set()
+    pending_batch: List[str] = []
+    batch_futures: List[asyncio.Future] = []
+
+    def launch_batch():
+        batch, batch_index = list(pending_batch), len(batch_futures)
+        pending_batch.clear()
+        batch_futures.append(loop.run_in_executor(
+            batch_pool, synthesize_intermediate_report,
+            user_query, batch, batch_index, "reports/intermediate_reports"
+        ))
+
+    def add_report_url(url: str):
+        if url in seen_report_urls or len(report_urls) >= MAX_GENERAL_FOR_REPORT:
+            return
+        seen_report_urls.add(url)
+        report_urls.append(url)
+        pending_batch.append(url)
+        if len(pending_batch) == REPORT_BATCH_SIZE:
+            launch_batch()
+
+    try:
+        async for url, bucket in stream_cse_searches(search_queries):
+            tagged_urls.append([url, bucket])
+            if bucket in EXTRACTION_BUCKETS and url not in url2tag \
+                    and bucket_counts.get(bucket, 0) < MAX_PER_BUCKET_EXTRACT:
+                bucket_counts[bucket] = bucket_counts.get(bucket, 0) + 1
+                url2tag[url] = bucket
+                url_queue.put_nowait(url)
+            if bucket in REPORT_BUCKETS:
+                add_report_url(url)
+            else:
+                overflow_urls.append(url)
+
+        if not tagged_urls:
+            raise ValueError("Pipeline Error: No URLs were collected from search.")
+        logging.info(f"-> Phase 2 Complete: {len(tagged_urls)} URLs streamed.")
+        await asyncio.to_thread(checkpointer.save, "tagged_urls", tagged_urls)
+
+        # Search is done: top up the report pool and flush the last partial batch.
+        for url in overflow_urls:
+            add_report_url(url)
+        if pending_batch:
+            launch_batch()
+        url_queue.put_nowait(None)
+
+        logging.info(f"-> URL Distribution: Report={len(report_urls)}, Extract={len(url2tag)}")
+        if not report_urls:
+            logging.warning("No URLs were allocated for the main report. The final report may be sparse.")
+
+        await update_status(stage="synthesizing", progress=50, message="Finishing parallel analysis...")
+        intermediate_reports = list(await asyncio.gather(*batch_futures))
+        await asyncio.to_thread(checkpointer.save, "intermediate_reports",
+                                {"report_urls": report_urls, "reports": intermediate_reports})
+        extraction_payload = await extraction_task
+        await asyncio.to_thread(checkpointer.save, "extraction", extraction_payload)
+    except BaseException:
+        extraction_task.cancel()
+        raise
+    finally:
+        batch_pool.shutdown(wait=False)
+
+    return report_urls, intermediate_reports, extraction_payload
+
+
+async def run_final_synthesis(user_query: str, intermediate_reports: List[str], report_urls: List[str],
+                              update_status: Callable, checkpointer: Checkpointer) -> str:
+    """Phase 5: the final report as Markdown."""
+    checkpoint = checkpointer.get("final_report")
+    if checkpoint:
+        logging.info("-> Phase 5 restored from checkpoint.")
+        return checkpoint["markdown"]
+
     await update_status(stage="compiling", progress=85, message="Generating final report...")
     final_report_path = await asyncio.get_event_loop().run_in_executor(
         ThreadPoolExecutor(1),
@@ -145,17 +276,21 @@ async def execute_research_pipeline(
         intermediate_reports,
         report_urls
     )
-    
+
     # Read final report
     try:
         with open(final_report_path, 'r', encoding='utf-8') as f:
             final_report_content = f.read()
     except FileNotFoundError:
-        final_report_content = "Error: Final report could not be generated or found."
+        return "Error: Final report could not be generated or found."
+
+    await asyncio.to_thread(checkpointer.save, "final_report", {"markdown": final_report_content})
+    return final_report_content
 
-    elapsed = time.perf_counter() - start_time
-    logging.info(f"--- Optimized Pipeline complete in {elapsed:.2f} seconds ---")
 
+def build_research_result(user_query: str, final_report_content: str,
+                          intermediate_reports: List[str], extraction_payload: dict) -> dict:
+    """The research result dict stored on the job (before visuals/strategy are added)."""
     return {
         "original_query": user_query,
         "final_report_markdown": final_report_content,
@@ -165,6 +300,52 @@ async def execute_research_pipeline(
     }
 
 
+async def execute_research_pipeline(
+    user_query: str, 
+    update_status: Callable,
+    streaming: bool = STREAM_SEARCH_RESULTS,
+    checkpointer: Checkpointer | None = None
+) -> dict:
+    """
+    OPTIMIZED: Pipeline with better parallelization.
+    With `streaming=True`, Phase 3/4 work starts while Phase 2 is still running.
+    With a `checkpointer`, every stage output is saved as it completes and a
+    re-run resumes after the last completed stage; once the search results are
+    checkpointed the remaining analysis always uses the batch path.
+    """
+    assert_all_env()
+    checkpointer = checkpointer or NullCheckpointer()
+    start_time = time.perf_counter()
+    logging.info(f"--- Starting Optimized Pipeline for query: '{user_query[:50]}...' ---")
+    
+    search_queries = await run_planning(user_query, update_status, checkpointer)
+
+    if streaming and not checkpointer.has("tagged_urls"):
+        report_urls, intermediate_reports, extraction_payload = await _stream_search_and_analyze(
+            user_query, search_queries, update_status, checkpointer
+        )
+    else:
+        tagged_urls = await run_search(user_query, search_queries, update_status, checkpointer)
+        report_urls, intermediate_reports, extraction_payload = await run_analysis(
+            user_query, tagged_urls, update_status, checkpointer
+        )
+    
+    logging.info(f"-> Parallel processing complete.")
+    failed = extraction_payload["metadata"].get("urls_failed", 0)
+    if failed:
+        await update_status(message=f"⚠️ {failed} source(s) could not be extracted (API quota or fetch errors).")
+    
+    # Final synthesis
+    final_report_content = await run_final_synthesis(
+        user_query, intermediate_reports, report_urls, update_status, checkpointer
+    )
+
+    elapsed = time.perf_counter() - start_time
+    logging.info(f"--- Optimized Pipeline complete in {elapsed:.2f} seconds ---")
+
+    return build_research_result(user_query, final_report_content, intermediate_reports, extraction_payload)
+
+
 # This block is for standalone testing if you ever need it
 if __name__ == "__main__":
     USER_QUERY = """Show me the latest innovations in Weatherability of Decorative Coatings.
@@ -3,11 +3,10 @@ import base64
 import os
 import logging
 from datetime import datetime
-from google import genai
 from google.genai import types
 import json
-from src import config # Our configuration loader
 from src import constants
+from src.llm import get_gateway
 
 def generate_search_queries(user_input: str) -> dict[str, list[str]]:
     """
@@ -25,9 +24,6 @@ def generate_search_queries(user_input: str) -> dict[str, list[str]]:
     logging.info("Phase 1: Generating search queries with Gemini...")
 
     try:
-        # 1. Instantiate the client using the API key from our config
-        client = genai.Client(api_key=config.GEMINI_API_KEY)
-
         # Get current date for recency context
         current_date = datetime.now()
         current_year = current_date.year
@@ -109,9 +105,9 @@ Generate a JSON dictionary of Google Custom Search Engine (CSE) queries. Aim to
             response_mime_type="application/json",
         )
 
-        # 5. Make the API call using the CORRECT method: client.models.generate_content
+        # 5. Make the API call through the shared gateway
         model = "gemini-2.5-pro"
-        response = client.models.generate_content(
+        response = get_gateway().generate(
             model=model,
             contents=contents,
             config=generate_content_config,
@@ -3,73 +3,118 @@
 import asyncio, re, time, logging
 import httpx
 from datetime import date
+from typing import AsyncIterator
 from src import config, constants
+from src.utils.cache import get_cache, make_key, normalize_query
+from src.utils.adaptive_limiter import get_limiter
 
 CSE_ENDPOINT = "https://customsearch.googleapis.com/customsearch/v1"
 
+def _cse_cache():
+    return get_cache("cse", constants.CSE_CACHE_TTL_HOURS * 3600, constants.CSE_CACHE_MAX_ENTRIES)
+
 async def _single_cse(client: httpx.AsyncClient, query: str, bucket: str,
-                      num_results: int, idx: int) -> list[tuple[str, str]]:
-    """Fire one CSE request, return (url, bucket) pairs."""
+                      num_results: int, idx: int, stats: dict | None = None) -> list[tuple[str, str]]:
+    """Fire one CSE request (or serve it from cache), return (url, bucket) pairs."""
     year_from = date.today().year - constants.RECENT_YEARS
+    sort_window = f"date:r:{year_from}0101:{date.today():%Y%m%d}"
     params = {
         "q": query,
         "cx": config.GOOGLE_CSE_ID,
         "key": config.GOOGLE_API_KEY,
         "num": num_results,
-        "sort": f"date:r:{year_from}0101:{date.today():%Y%m%d}",
+        "sort": sort_window,
     }
-    try:
-        r = await client.get(CSE_ENDPOINT, params=params, timeout=20)
-        r.raise_for_status()
-        items = r.json().get("items", [])
-        return [(it["link"], bucket) for it in items]
-    except httpx.HTTPStatusError as e:
-        # retry once without the sort parameter on 400
-        if e.response.status_code == 400 and "sort" in params:
-            params.pop("sort", None)
+
+    cache = _cse_cache()
+    cache_key = make_key("cse", normalize_query(query), num_results, sort_window)
+    cached_links = await asyncio.to_thread(cache.get_json, cache_key)
+    if stats is not None:
+        stats["hits" if cached_links is not None else "misses"] += 1
+    if cached_links is not None:
+        return [(link, bucket) for link in cached_links]
+
+    # Only real API calls go through the adaptive limiter; cache hits above don't need a slot.
+    async with get_limiter("cse").aslot() as slot:
+        try:
             r = await client.get(CSE_ENDPOINT, params=params, timeout=20)
             r.raise_for_status()
             items = r.json().get("items", [])
-            return [(it["link"], bucket) for it in items]
-        logging.warning(f"CSE error {e.response.status_code} for query #{idx}: {query[:60]}")
-    except Exception as e:
-        logging.warning(f"{e} on query #{idx}")
+            links = [it["link"] for it in items]
+            await asyncio.to_thread(cache.set_json, cache_key, links)
+            return [(link, bucket) for link in links]
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429 or e.response.status_code >= 500:
+                slot.throttled()
+            # retry once without the sort parameter on 400
+            if e.response.status_code == 400 and "sort" in params:
+                params.pop("sort", None)
+                r = await client.get(CSE_ENDPOINT, params=params, timeout=20)
+                r.raise_for_status()
+                items = r.json().get("items", [])
+                links = [it["link"] for it in items]
+                await asyncio.to_thread(cache.set_json, cache_key, links)
+                return [(link, bucket) for link in links]
+            logging.warning(f"CSE error {e.response.status_code} for query #{idx}: {query[:60]}")
+        except httpx.TransportError as e:
+            slot.throttled()
+            logging.warning(f"{e!r} on query #{idx}")
+        except Exception as e:
+            logging.warning(f"{e} on query #{idx}")
     return []
 
-async def execute_cse_searches(queries_by_type: dict[str, list[str]],
-                               num_results: int = constants.MAX_SEARCH_RESULTS,
-                               max_concurrency: int = constants.MAX_SEARCH_WORKERS
-                               ) -> list[tuple[str, str]]:
+async def stream_cse_searches(queries_by_type: dict[str, list[str]],
+                              num_results: int = constants.MAX_SEARCH_RESULTS,
+                              max_concurrency: int | None = None
+                              ) -> AsyncIterator[tuple[str, str]]:
     """
-    Fully asynchronous Google CSE runner.  No thread pools, HTTP/2, 1-RTT.
-    Returns deduped (url, bucket) list.
+    Streaming variant of the CSE runner: yields each new, deduped (url, bucket)
+    pair as soon as the query that found it finishes, so downstream phases can
+    start before the slowest query returns.
+
+    Concurrency is set by the adaptive "cse" limiter; `max_concurrency` only
+    sizes the HTTP connection pool (defaults to the limiter's ceiling).
     """
     flat: list[tuple[str, str]] = [
         (bucket, q) for bucket, lst in queries_by_type.items() for q in lst
     ]
     if not flat:
-        return []
+        return
 
     t0 = time.perf_counter()
     tagset: set[tuple[str, str]] = set()
+    cache_stats = {"hits": 0, "misses": 0}
 
+    limiter = get_limiter("cse")
+    max_concurrency = max_concurrency or limiter.max_limit
     limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
     async with httpx.AsyncClient(http2=True, limits=limits) as client:
-        sem = asyncio.Semaphore(max_concurrency)
-
-        async def _wrapped(i, bucket, query):
-            async with sem:
-                return await _single_cse(client, query, bucket, num_results, i)
-
         tasks = [
-            asyncio.create_task(_wrapped(i, bucket, query))
+            asyncio.create_task(_single_cse(client, query, bucket, num_results, i, cache_stats))
             for i, (bucket, query) in enumerate(flat)
         ]
-        for coro in asyncio.as_completed(tasks):
-            for link, bucket in await coro:
-                tagset.add((link, bucket))
+        try:
+            for coro in asyncio.as_completed(tasks):
+                for link, bucket in await coro:
+                    if (link, bucket) not in tagset:
+                        tagset.add((link, bucket))
+                        yield link, bucket
+        finally:
+            # the consumer may stop early; never leave queries running behind it
+            for task in tasks:
+                task.cancel()
 
     elapsed = time.perf_counter() - t0
     logging.info(f"Phase 2 – {len(tagset)} unique URLs in {elapsed:0.1f}s "
-          f"({len(flat)} queries, {max_concurrency} concurrency)")
-    return list(tagset)
\ No newline at end of file
+          f"({len(flat)} queries, adaptive concurrency now {limiter.limit}, "
+          f"cache {cache_stats['hits']} hits / {cache_stats['misses']} misses)")
+
+async def execute_cse_searches(queries_by_type: dict[str, list[str]],
+                               num_results: int = constants.MAX_SEARCH_RESULTS,
+                               max_concurrency: int | None = None
+                               ) -> list[tuple[str, str]]:
+    """
+    Fully asynchronous Google CSE runner.  No thread pools, HTTP/2, 1-RTT.
+    Returns deduped (url, bucket) list.
+    """
+    return [pair async for pair in stream_cse_searches(queries_by_type, num_results, max_concurrency)]
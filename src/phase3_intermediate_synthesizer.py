@@ -7,12 +7,34 @@ import logging
 from datetime import date
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Tuple
-from google import genai
 from google.genai import types
-from src import config
 from src import constants
+from src.llm import get_gateway, is_retryable_error
+from src.utils.adaptive_limiter import get_limiter
+from src.utils.cache import get_cache, make_key, normalize_query, canonical_url
 import hashlib
 
+def _subreport_cache():
+    return get_cache("subreports", constants.SUBREPORT_CACHE_TTL_HOURS * 3600,
+                     constants.SUBREPORT_CACHE_MAX_ENTRIES)
+
+def _subreport_cache_key(original_user_query: str, urls_batch: list[str]) -> str:
+    """Normalized query + sorted canonical URL batch + prompt version + recency window."""
+    current_year = date.today().year
+    window = f"{current_year - constants.RECENT_YEARS + 1}-{current_year}"
+    return make_key("subreport", constants.SUBREPORT_PROMPT_VERSION, normalize_query(original_user_query),
+                    sorted(canonical_url(u) for u in urls_batch), window)
+
+def _save_subreport(intermediate_md: str, original_user_query: str, batch_index: int, output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_name = hashlib.sha1(original_user_query.encode()).hexdigest()[:16]
+    path = os.path.join(output_dir, f"{ts}_batch{batch_index}_{safe_name}.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"## Batch {batch_index} Intermediate Report\n\n")
+        f.write(intermediate_md)
+    return path
+
 def synthesize_intermediate_report(
     original_user_query: str,
     urls_batch: list[str],
@@ -21,14 +43,21 @@ def synthesize_intermediate_report(
 ) -> str:
     """
     Generates a focused Markdown sub-report for a given URL batch using Gemini's UrlContext.
+    A batch already synthesized for the same query is served from the sub-report cache.
     """
     if not urls_batch:
         logging.info(f"    - Batch {batch_index}: No URLs provided — skipping.")
         return ""
 
-    logging.info(f"    - Batch {batch_index}: Synthesizing {len(urls_batch)} URLs...")
+    cache = _subreport_cache()
+    cache_key = _subreport_cache_key(original_user_query, urls_batch)
+    cached_md = cache.get_json(cache_key)
+    if cached_md is not None:
+        path = _save_subreport(cached_md, original_user_query, batch_index, output_dir)
+        logging.info(f"    - Batch {batch_index}: sub-report served from cache → {path}")
+        return cached_md
 
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
+    logging.info(f"    - Batch {batch_index}: Synthesizing {len(urls_batch)} URLs...")
 
     # Get current date for context
     current_date = date.today()
@@ -97,25 +126,24 @@ You MUST follow this structure. For each point, focus on its significance.
         response_modalities=["TEXT"],
     )
 
-    report_fragments = []
     try:
-        stream = client.models.generate_content_stream(
-            model="gemini-2.5-flash",
-            contents=contents,
-            config=config_obj,
-        )
-        for chunk in stream:
-            report_fragments.append(chunk.text)
-        intermediate_md = "".join(report_fragments).strip()
+        with get_limiter("synthesis").slot() as slot:
+            try:
+                intermediate_md = get_gateway().generate_text(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config=config_obj,
+                ).strip()
+            except Exception as e:
+                if is_retryable_error(e):
+                    slot.throttled()
+                raise
+
+        if intermediate_md:
+            cache.set_json(cache_key, intermediate_md)
 
         # Save sub-report
-        os.makedirs(output_dir, exist_ok=True)
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_name = hashlib.sha1(original_user_query.encode()).hexdigest()[:16]
-        path = os.path.join(output_dir, f"{ts}_batch{batch_index}_{safe_name}.md")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(f"## Batch {batch_index} Intermediate Report\n\n")
-            f.write(intermediate_md)
+        path = _save_subreport(intermediate_md, original_user_query, batch_index, output_dir)
         logging.info(f"    - Batch {batch_index}: sub-report saved → {path}")
         return intermediate_md
 
@@ -138,7 +166,8 @@ def synthesize_intermediate_reports_parallel(
         original_user_query: The original research query
         url_batches: List of URL batches to process in parallel
         output_dir: Directory to save intermediate reports
-        max_workers: Maximum number of parallel workers (defaults to min(len(batches), 8))
+        max_workers: Maximum number of worker threads (defaults to min(len(batches), synthesis limiter ceiling));
+            the adaptive "synthesis" limiter decides how many of them call Gemini at once
     
     Returns:
         List of tuples containing (batch_index, report_content)
@@ -149,9 +178,10 @@ def synthesize_intermediate_reports_parallel(
 
     # Calculate optimal number of workers
     if max_workers is None:
-        max_workers = min(len(url_batches), 8)  # Cap at 8 to avoid overwhelming the API
+        max_workers = min(len(url_batches), get_limiter("synthesis").max_limit)
     
-    logging.info(f"Starting parallel synthesis of {len(url_batches)} batches with {max_workers} workers...")
+    logging.info(f"Starting parallel synthesis of {len(url_batches)} batches with {max_workers} workers "
+                 f"(adaptive concurrency now {get_limiter('synthesis').limit})...")
     
     results = []
     
@@ -13,9 +13,11 @@ from datetime import date
 import re
 import time
 import logging
-from google import genai
 from google.genai import types
-from src import config
+from src.llm import get_gateway, is_retryable_error
+from src.utils.adaptive_limiter import get_limiter
+from src.utils.cache import get_cache, make_key, canonical_url
+from concurrent.futures import ThreadPoolExecutor
 from src.constants import MAX_GEMINI_PARALLEL, EXTRACT_BATCH_SIZE
 from src import constants
 from dateutil import parser as dtparse
@@ -41,13 +43,22 @@ def _pad_categories(cat_dict: dict) -> dict:
     return {k: list(cat_dict.get(k, [])) for k in EXPECTED_CATEGORIES}
 # ----------------------------------------------------------------
 
-def extract_data_from_single_url_sync(
-    url: str,
-    client: genai.Client
-) -> list[dict]:
+def _extraction_cache():
+    return get_cache("extractions", constants.EXTRACTION_CACHE_TTL_HOURS * 3600,
+                     constants.EXTRACTION_CACHE_MAX_ENTRIES)
+
+def _extraction_cache_key(url: str) -> str:
+    """Same canonical URL + prompt version + recency window ⇒ same extraction result."""
+    current_year = date.today().year
+    window = f"{current_year - constants.RECENT_YEARS + 1}-{current_year}"
+    return make_key("extraction", constants.EXTRACTION_PROMPT_VERSION, canonical_url(url), window)
+
+def extract_data_from_single_url_sync(url: str, raise_errors: bool = False) -> list[dict]:
     """
     Uses Gemini to extract structured items (news, Patents, conferences, Legalnews) from a URL.
-    Returns parsed list of item dicts.
+    Returns parsed list of item dicts. With `raise_errors=True`, API failures (e.g. exhausted
+    429 retries) are re-raised instead of being reported as an empty list.
+    Successfully parsed responses (including an empty array) are written to the extraction cache.
     """
     logging.info(f"    - Extracting from: {url}")
     try:
@@ -109,7 +120,7 @@ Return a valid JSON array of objects. Return an empty array `[]` if no qualifyin
             ],
             response_mime_type="text/plain",
         )
-        response = client.models.generate_content(
+        response = get_gateway().generate(
             model="gemini-2.5-flash",
             contents=contents,
             config=config_obj,
@@ -127,15 +138,58 @@ Return a valid JSON array of objects. Return an empty array `[]` if no qualifyin
             return []
             
         items = json.loads(match.group(0))
-        return items if isinstance(items, list) else []
+        items = items if isinstance(items, list) else []
+        _extraction_cache().set_json(_extraction_cache_key(url), items)
+        return items
 
     except json.JSONDecodeError as e:
         logging.error(f"      → JSONDecodeError for URL {url}: {e}")
         return []
     except Exception as e:
         logging.error(f"      → Error processing {url}: {e}", exc_info=True)
+        if raise_errors:
+            raise
         return []
 
+# Sized to the limiter's ceiling so the default executor never caps the adaptive limit.
+_extraction_pool = ThreadPoolExecutor(max_workers=constants.ADAPTIVE_LIMITS["extraction"]["max"],
+                                      thread_name_prefix="extract")
+
+def _make_url_extractor(failed_urls: list[str], cache_stats: dict):
+    """
+    Returns an async `one(url)` coroutine function that serves a URL from the
+    extraction cache or runs the synchronous extractor in a thread.
+    URLs whose extraction failed outright are appended to `failed_urls`;
+    cache hits/misses are counted in `cache_stats`.
+    Concurrency is governed by the adaptive "extraction" limiter.
+    """
+    limiter = get_limiter("extraction")
+    cache = _extraction_cache()
+
+    async def one(url):
+        # cache hits never take a Gemini slot
+        cached = await asyncio.to_thread(cache.get_json, _extraction_cache_key(url))
+        cache_stats["hits" if cached is not None else "misses"] += 1
+        if cached is not None:
+            # hand out copies: _build_extraction_output mutates the items
+            return [dict(item) for item in cached if isinstance(item, dict)]
+
+        async with limiter.aslot() as slot:
+            # Run the synchronous extraction in a thread executor
+            loop = asyncio.get_event_loop()
+            try:
+                return await loop.run_in_executor(
+                    _extraction_pool,
+                    lambda: extract_data_from_single_url_sync(url, raise_errors=True)
+                )
+            except Exception as e:
+                if is_retryable_error(e):
+                    slot.throttled()
+                failed_urls.append(url)
+                return []
+
+    return one
+
 async def run_structured_extraction(
     urls: list[str],
     original_user_query: str,
@@ -158,24 +212,67 @@ async def run_structured_extraction(
     os.makedirs(output_dir, exist_ok=True)
     
     # ————— fast concurrent extraction —————
-    sem = asyncio.Semaphore(constants.MAX_GEMINI_PARALLEL)
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-
-    async def one(url):
-        async with sem:
-            # Run the synchronous extraction in a thread executor
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                None, 
-                lambda: extract_data_from_single_url_sync(url, client)
-            )
+    failed_urls: list[str] = []
+    cache_stats = {"hits": 0, "misses": 0}
+    one = _make_url_extractor(failed_urls, cache_stats)
 
     t0 = time.perf_counter()
     out_lists = await asyncio.gather(*(one(u) for u in urls))
     elapsed = time.perf_counter() - t0
     logging.info(f"✓ Phase 4 – extracted {len(urls)} URLs in {elapsed:0.1f}s "
-          f"({constants.MAX_GEMINI_PARALLEL} Gemini workers)")
-    
+          f"(adaptive Gemini concurrency now {get_limiter('extraction').limit}, "
+          f"cache {cache_stats['hits']} hits / {cache_stats['misses']} misses)")
+
+    return _build_extraction_output(urls, out_lists, original_user_query, url2tag, output_dir,
+                                    failed_urls, cache_stats)
+
+
+async def run_streaming_extraction(
+    url_queue: asyncio.Queue,
+    original_user_query: str,
+    url2tag: dict[str, str],
+    output_dir: str = "extractions"
+) -> dict:
+    """
+    Streaming variant of run_structured_extraction: consumes URLs from
+    `url_queue` and starts extracting each one as soon as it arrives.
+    The producer puts `None` on the queue once no more URLs will follow.
+    `url2tag` may keep growing while this runs; it is only read at the end.
+    """
+    logging.info("\nPhase 4: Streaming structured extraction started...")
+    os.makedirs(output_dir, exist_ok=True)
+
+    failed_urls: list[str] = []
+    cache_stats = {"hits": 0, "misses": 0}
+    one = _make_url_extractor(failed_urls, cache_stats)
+
+    t0 = time.perf_counter()
+    urls: list[str] = []
+    tasks: list[asyncio.Task] = []
+    while (url := await url_queue.get()) is not None:
+        urls.append(url)
+        tasks.append(asyncio.create_task(one(url)))
+
+    out_lists = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    logging.info(f"✓ Phase 4 – extracted {len(urls)} streamed URLs in {elapsed:0.1f}s "
+          f"(adaptive Gemini concurrency now {get_limiter('extraction').limit}, "
+          f"cache {cache_stats['hits']} hits / {cache_stats['misses']} misses)")
+
+    return _build_extraction_output(urls, out_lists, original_user_query, url2tag, output_dir,
+                                    failed_urls, cache_stats)
+
+
+def _build_extraction_output(
+    urls: list[str],
+    out_lists: list[list[dict]],
+    original_user_query: str,
+    url2tag: dict[str, str],
+    output_dir: str,
+    failed_urls: list[str] | None = None,
+    cache_stats: dict | None = None
+) -> dict:
+    """Filters, categorises and date-sorts raw extraction results, then saves them as JSON."""
     categorized = {k: [] for k in EXPECTED_CATEGORIES}
     total_items = 0
     
@@ -225,11 +322,20 @@ async def run_structured_extraction(
     categorized = _pad_categories(categorized)
 
     urls_processed = len(urls)
+    cache_stats = cache_stats or {"hits": 0, "misses": 0}
+    lookups = cache_stats["hits"] + cache_stats["misses"]
     metadata = {
         "timestamp": timestamp,
         "original_query": original_user_query,
         "urls_processed": urls_processed,
         "total_items_extracted": total_items,
+        "urls_failed": len(failed_urls or []),
+        "failed_urls": list(failed_urls or []),
+        "extraction_cache": {
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "hit_rate": round(cache_stats["hits"] / lookups, 3) if lookups else 0.0,
+        },
         "extraction_summary": {cat: len(lst) for cat, lst in categorized.items()}
     }
     output = {"metadata": metadata, "extracted_data": categorized, "processed_urls": urls}
@@ -5,10 +5,9 @@ import re
 import datetime
 import logging
 from datetime import date
-from google import genai
 from google.genai import types
-from src import config
 from src import constants
+from src.llm import get_gateway
 import hashlib
 
 def synthesize_final_report(
@@ -35,8 +34,6 @@ def synthesize_final_report(
         logging.warning(f"    - Warning: content truncated from {len(formatted_content)} to {max_chars} chars for context limit")
         formatted_content = formatted_content[:max_chars]
 
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-
     # Get current date for context
     current_date = date.today()
     current_year = current_date.year
@@ -109,12 +106,11 @@ Your value is in finding the "golden threads" that connect the provided reports.
 
     try:
         logging.info("    - Calling Gemini for final synthesis...")
-        stream = client.models.generate_content_stream(
+        final_text = get_gateway().generate_text(
             model="gemini-2.5-pro", # Use the pro model for this high-level synthesis
             contents=contents,
             config=config_obj,
-        )
-        final_text = "".join(chunk.text for chunk in stream).strip()
+        ).strip()
 
         final_with_refs = _add_references_section(final_text, all_original_urls)
         filepath = _save_final_report(final_with_refs, original_user_query, output_dir)
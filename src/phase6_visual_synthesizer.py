@@ -3,11 +3,13 @@
 import logging
 import json
 import re
+import time
 from collections import Counter
-from google import genai
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from google.genai import types
 
-from src import config
+from src import constants
+from src.llm import get_gateway
 
 # A basic list of stop words for the word cloud. Can be expanded.
 STOP_WORDS = set([
@@ -24,7 +26,7 @@ STOP_WORDS = set([
     'coatings', 'industry', 'analysis', 'research', 'data', 'information', 'global', 'company', 'companies'
 ])
 
-def _call_gemini(prompt: str, client: genai.Client, response_type: str = "application/json") -> dict | list | str | None:
+def _call_gemini(prompt: str, response_type: str = "application/json") -> dict | list | str | None:
     """Generic helper to call Gemini and parse JSON/text, with error handling."""
     try:
         contents = [
@@ -61,13 +63,11 @@ def _call_gemini(prompt: str, client: genai.Client, response_type: str = "applic
         )
 
         # Collect the streamed response
-        response_text = ""
-        for chunk in client.models.generate_content_stream(
+        response_text = get_gateway().generate_text(
             model="gemini-2.5-flash",
             contents=contents,
             config=generate_content_config,
-        ):
-            response_text += chunk.text
+        )
         
         if response_type == "application/json":
             return json.loads(response_text)
@@ -77,7 +77,7 @@ def _call_gemini(prompt: str, client: genai.Client, response_type: str = "applic
         logging.warning(f"Visualizer: A sub-task with prompt starting '{prompt[:50]}...' failed. Error: {e}")
         return None
 
-def _generate_short_summary(final_report: str, client: genai.Client) -> str | None:
+def _generate_short_summary(final_report: str) -> str | None:
     """Generates a concise executive paragraph and bullet points."""
     logging.info("  -> Visualizer: Generating short summary...")
     prompt = f"""
@@ -94,7 +94,7 @@ TASK:
 
 Your entire response must be a single block of Markdown text. Do not add titles or headers.
 """
-    return _call_gemini(prompt, client, response_type="text/plain")
+    return _call_gemini(prompt, response_type="text/plain")
 
 def _generate_word_cloud_data(final_report: str, extracted_data: dict) -> list[dict]:
     """Generates word frequency data for a word cloud, excluding stop words."""
@@ -112,7 +112,7 @@ def _generate_word_cloud_data(final_report: str, extracted_data: dict) -> list[d
     # The react-tagcloud library expects keys 'value' (for the word) and 'count' (for the frequency).
     return [{"value": word, "count": count} for word, count in word_counts.most_common(75)]
 
-def _generate_swot_data(full_text_context: str, client: genai.Client) -> dict | None:
+def _generate_swot_data(full_text_context: str) -> dict | None:
     """Generates a SWOT analysis from the report."""
     logging.info("  -> Visualizer: Generating SWOT data...")
     prompt = f"""
@@ -142,9 +142,9 @@ Generate a concise SWOT analysis. For each quadrant, identify the top 3-4 most c
   "threats": ["New EU regulations on specific isocyanates", "Aggressive pricing from APAC competitors"]
 }}
 """
-    return _call_gemini(prompt, client)
+    return _call_gemini(prompt)
 
-def _generate_map_data(full_text_context: str, client: genai.Client) -> dict | None:
+def _generate_map_data(full_text_context: str) -> dict | None:
     """Generates geographic insights for a world map visual."""
     logging.info("  -> Visualizer: Generating geographic map data...")
     prompt = f"""
@@ -163,9 +163,9 @@ Return a single, valid JSON object where the key is the country/region name (in
 **EXAMPLE OF PERFECT JSON:**
 {{"Germany": "Hosting a key conference on new polymer technologies.", "China": "Announced new environmental regulations impacting solvent-based coatings."}}
 """
-    return _call_gemini(prompt, client)
+    return _call_gemini(prompt)
 
-def _generate_radar_chart_data(full_text_context: str, client: genai.Client) -> dict | None:
+def _generate_radar_chart_data(full_text_context: str) -> dict | None:
     """Generates competitive analysis data for a radar chart."""
     logging.info("  -> Visualizer: Generating competitive radar chart data...")
     prompt = f"""
@@ -192,9 +192,9 @@ Return a single, valid JSON object with two keys: "labels" and "competitors".
   ]
 }}
 """
-    return _call_gemini(prompt, client)
+    return _call_gemini(prompt)
 
-def _generate_hype_cycle_data(full_text_context: str, client: genai.Client) -> list | None:
+def _generate_hype_cycle_data(full_text_context: str) -> list | None:
     """Generates technology maturity data for a hype cycle visual."""
     logging.info("  -> Visualizer: Generating technology hype cycle data...")
     prompt = f"""
@@ -216,28 +216,92 @@ Return a single, valid JSON array of technology objects. Each object must have t
   {{"name": "Graphene Additives", "stage": "Trough of Disillusionment", "summary": "Early hype has faded as challenges in cost and dispersion have slowed adoption outside of niche applications."}}
 ]
 """
-    return _call_gemini(prompt, client)
-
-def generate_overview_data(final_report: str, extracted_data: dict) -> dict:
+    return _call_gemini(prompt)
+
+def generate_overview_data(
+    final_report: str,
+    extracted_data: dict,
+    concurrent: bool = True,
+    max_workers: int = constants.MAX_VISUAL_WORKERS,
+    widget_timeout: float = constants.VISUAL_WIDGET_TIMEOUT_SECONDS
+) -> dict:
     """
     Orchestrates the generation of all data needed for the visual overview dashboard.
+
+    With `concurrent=True` the LLM-backed widgets run in a thread pool of up to
+    `max_workers`; a widget that fails or exceeds `widget_timeout` seconds comes
+    back as None without holding up the others.
     """
     logging.info("--- Starting Phase 6: Visual Synthesizer ---")
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-
     full_text_context = final_report
     for category in extracted_data.values():
         for item in category:
             full_text_context += f"\n\nItem: {item.get('title', '')}\nSummary: {item.get('summary', '')}"
 
+    llm_widgets = {
+        "short_summary": (_generate_short_summary, final_report),
+        "swot_analysis": (_generate_swot_data, full_text_context),
+        "geographic_insights": (_generate_map_data, full_text_context),
+        "competitive_radar": (_generate_radar_chart_data, full_text_context),
+        "tech_hype_cycle": (_generate_hype_cycle_data, full_text_context),
+    }
+
+    if concurrent:
+        widget_results = _run_widgets_concurrently(llm_widgets, max_workers, widget_timeout)
+    else:
+        widget_results = {name: func(text) for name, (func, text) in llm_widgets.items()}
+
     overview_payload = {
-        "short_summary": _generate_short_summary(final_report, client),
+        "short_summary": widget_results["short_summary"],
         "word_cloud": _generate_word_cloud_data(final_report, extracted_data),
-        "swot_analysis": _generate_swot_data(full_text_context, client),
-        "geographic_insights": _generate_map_data(full_text_context, client),
-        "competitive_radar": _generate_radar_chart_data(full_text_context, client),
-        "tech_hype_cycle": _generate_hype_cycle_data(full_text_context, client),
+        "swot_analysis": widget_results["swot_analysis"],
+        "geographic_insights": widget_results["geographic_insights"],
+        "competitive_radar": widget_results["competitive_radar"],
+        "tech_hype_cycle": widget_results["tech_hype_cycle"],
     }
 
     logging.info("--- Finished Phase 6: Visual Synthesizer ---")
-    return overview_payload 
\ No newline at end of file
+    return overview_payload
+
+def _run_widgets_concurrently(widgets: dict, max_workers: int, widget_timeout: float) -> dict:
+    """Runs each widget generator in a thread; failures and timeouts become None."""
+    results = {name: None for name in widgets}
+    started: dict[str, float] = {}  # a widget's timeout counts from when a worker picks it up
+
+    def timed(name, func, text):
+        started[name] = time.perf_counter()
+        return func(text)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(widgets))))
+    try:
+        t0 = time.perf_counter()
+        future_to_name = {
+            executor.submit(timed, name, func, text): name
+            for name, (func, text) in widgets.items()
+        }
+        pending = set(future_to_name)
+        while pending:
+            now = time.perf_counter()
+            for future in list(pending):
+                name = future_to_name[future]
+                if name in started and now - started[name] >= widget_timeout:
+                    pending.discard(future)
+                    future.cancel()
+                    logging.warning(f"Visualizer: widget '{name}' timed out after {widget_timeout:.0f}s.")
+            if not pending:
+                break
+            deadlines = [started[future_to_name[f]] + widget_timeout for f in pending if future_to_name[f] in started]
+            wait_for = max(0.05, min(deadlines) - now) if deadlines else 0.5
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = future_to_name[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logging.warning(f"Visualizer: widget '{name}' failed. Error: {e}")
+        finished = sum(1 for value in results.values() if value is not None)
+        logging.info(f"Visualizer: {finished}/{len(widgets)} widgets returned data in {time.perf_counter() - t0:0.1f}s")
+    finally:
+        # don't block on stragglers; their results are simply discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
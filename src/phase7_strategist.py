@@ -3,10 +3,9 @@
 import logging
 import json
 import os
-from google import genai
 from google.genai import types
 
-from src import config
+from src.llm import get_gateway
 
 def generate_strategic_insights(
     final_report_md: str,
@@ -19,8 +18,6 @@ def generate_strategic_insights(
     Generates high-level strategic insights tailored to Wacker.
     """
     logging.info(f"--- Starting Phase 7: Strategic Synthesis for {company_name} ---")
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-
     # Combine all available information into a comprehensive context blob
     full_context = f"""
 ## Original Research Objective
@@ -122,14 +119,11 @@ Generate a JSON object that serves as a strategic brief for {company_name}'s lea
         )
 
         # Collect the full response from streaming
-        full_response = ""
-        for chunk in client.models.generate_content_stream(
+        full_response = get_gateway().generate_text(
             model=model,
             contents=contents,
             config=generate_content_config,
-        ):
-            if chunk.text:
-                full_response += chunk.text
+        )
 
         insights = json.loads(full_response)
         logging.info(f"--- Finished Phase 7: Strategic Synthesis generated successfully. ---")
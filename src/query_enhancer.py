@@ -2,10 +2,9 @@
 
 import logging
 import json
-from google import genai
 from google.genai import types
 
-from src import config
+from src.llm import get_gateway
 
 def generate_tags_from_topic(topic: str) -> dict:
     """
@@ -20,8 +19,6 @@ def generate_tags_from_topic(topic: str) -> dict:
     """
     logging.info(f"Query Enhancer: Generating conceptual tags for topic: '{topic[:100]}...'")
 
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-
     prompt = f"""
 You are an expert semantic analysis engine for the chemical and coatings industry. Your task is to analyze a user's research objective, identify the core concepts within it, and then generate a list of related, high-value keywords and topics that would be relevant to a business or R&D professional.
 
@@ -117,7 +114,7 @@ Now, generate the JSON for the user's research objective provided at the top.
     )
 
     try:
-        response = client.models.generate_content(
+        response = get_gateway().generate(
             model=model,
             contents=contents,
             config=generate_content_config,
@@ -0,0 +1,128 @@
+# src/result_store.py
+"""
+Job results, stored out of the `jobs` row.
+
+The large sections of a result (report markdown, intermediate reports,
+extracted items, overview, strategy) are written to the blob store
+(src/utils/blob_store.py); `Job.result` keeps only a small pointer:
+
+    {
+      "storage": "blob", "format_version": 1,
+      "original_query": ..., "metadata": {...},          # small, kept inline
+      "sections": {"final_report_markdown": {"key": ..., "stored_size": ...}, ...},
+      "summary": {"report_chars": ..., "extracted_items": {...}, ...},
+      "report_pdf": {"key": ..., "stored_size": ..., "cache_key": ..., ...}  # optional, PRERENDER_PDF
+    }
+
+Readers fetch only the sections they need. Results written before this
+change (everything inline) and error results ({"error": ...}) are read as-is.
+"""
+import logging
+from functools import lru_cache
+
+from src import constants
+from src.utils.blob_store import get_blob_store
+
+BLOB_SECTIONS = (
+    "final_report_markdown",
+    "intermediate_reports",
+    "extracted_data",
+    "overview_data",
+    "strategic_insights",
+)
+FORMAT_VERSION = 1
+
+
+def is_blob_result(result: dict | None) -> bool:
+    return bool(result) and result.get("storage") == "blob"
+
+
+def _summary(result_data: dict) -> dict:
+    extracted = result_data.get("extracted_data") or {}
+    return {
+        "report_chars": len(result_data.get("final_report_markdown") or ""),
+        "intermediate_reports": len(result_data.get("intermediate_reports") or []),
+        "extracted_items": {k: len(v) for k, v in extracted.items() if isinstance(v, list)},
+        "has_overview": bool(result_data.get("overview_data")),
+        "has_strategy": bool(result_data.get("strategic_insights"))
+                        and "error" not in (result_data.get("strategic_insights") or {}),
+    }
+
+
+def pack_result(job_id: str, result_data: dict, report_pdf: dict | None = None) -> dict:
+    """
+    Writes the large sections to the blob store and returns the pointer to keep
+    on the job row. If the blob store is unavailable the result is kept inline.
+    `report_pdf` is a reference from store_report_pdf, kept on the pointer.
+    """
+    try:
+        store = get_blob_store()
+        sections = {}
+        for name in BLOB_SECTIONS:
+            if name not in result_data:
+                continue
+            key, stored_size = store.put_json(result_data[name])
+            sections[name] = {"key": key, "stored_size": stored_size}
+    except Exception as e:
+        logging.warning(f"Result store: could not write blobs for job {job_id}, storing result inline. Error: {e}")
+        return result_data
+
+    pointer = {k: v for k, v in result_data.items() if k not in BLOB_SECTIONS}
+    pointer.update({
+        "storage": "blob",
+        "format_version": FORMAT_VERSION,
+        "sections": sections,
+        "summary": _summary(result_data),
+    })
+    if report_pdf:
+        pointer["report_pdf"] = report_pdf
+    logging.info(f"🗄️ Job {job_id}: result stored as {len(sections)} blob section(s).")
+    return pointer
+
+
+@lru_cache(maxsize=constants.RESULT_SECTION_CACHE_SIZE)
+def _load_blob(key: str):
+    # Blobs are content-addressed and never change, so caching by key is always safe.
+    # Callers must treat the returned object as read-only.
+    return get_blob_store().get_json(key)
+
+
+def load_section(result: dict | None, name: str, default=None):
+    """One section of a stored result, fetched from the blob store if needed."""
+    if not result:
+        return default
+    if not is_blob_result(result):
+        return result.get(name, default)
+    ref = result.get("sections", {}).get(name)
+    if ref is None:
+        return result.get(name, default)
+    value = _load_blob(ref["key"])
+    return default if value is None else value
+
+
+def load_sections(result: dict | None, names) -> dict:
+    return {name: load_section(result, name) for name in names}
+
+
+def load_result(result: dict | None) -> dict:
+    """The full result dict, as the pipeline produced it."""
+    if not is_blob_result(result):
+        return result or {}
+    full = {k: v for k, v in result.items() if k not in ("storage", "format_version", "sections", "summary", "report_pdf")}
+    full.update(load_sections(result, result.get("sections", {}).keys()))
+    return full
+
+
+def store_report_pdf(pdf_bytes: bytes, **inputs) -> dict:
+    """Writes a rendered report PDF to the blob store; returns its reference (plus `inputs`) for pack_result."""
+    key, stored_size = get_blob_store().put(pdf_bytes)
+    return {"key": key, "stored_size": stored_size, **inputs}
+
+
+def load_report_pdf(ref: dict) -> bytes | None:
+    """The PDF bytes behind a store_report_pdf reference, or None if they cannot be read."""
+    try:
+        return get_blob_store().get(ref["key"])
+    except Exception as e:
+        logging.warning(f"Result store: could not read pre-rendered PDF {ref.get('key')}. Error: {e}")
+        return None
@@ -0,0 +1,102 @@
+# src/scheduler.py
+"""
+A small declarative stage graph for the tail of a research job.
+
+Each Stage names the stages it depends on; run_stage_graph starts every
+stage as soon as all of its dependencies have finished, so independent
+stages (e.g. visuals, strategy and RAG upload) overlap instead of running
+back to back. Synchronous stage functions run in a worker thread.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[dict], Any]  # receives {dep_name: dep_result}
+    deps: tuple[str, ...] = field(default_factory=tuple)
+
+
+class StageSkipped(Exception):
+    """Raised for a stage whose dependency failed."""
+
+
+async def run_stage_graph(stages: list[Stage], timings: dict | None = None) -> tuple[dict, dict]:
+    """
+    Runs a list of stages respecting their dependencies.
+
+    Returns (results, timings): stage name -> return value (or the exception
+    it raised) and stage name -> wall time in seconds. Pass your own `timings`
+    dict to read the timings of already finished stages from inside a stage.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {missing}")
+
+    results: dict[str, Any] = {}
+    timings = timings if timings is not None else {}
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def run(stage: Stage):
+        dep_results = {}
+        for dep in stage.deps:
+            try:
+                dep_results[dep] = await tasks[dep]
+            except Exception as e:
+                raise StageSkipped(f"dependency '{dep}' failed: {e}") from e
+
+        t0 = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(stage.func):
+                return await stage.func(dep_results)
+            return await asyncio.to_thread(stage.func, dep_results)
+        finally:
+            timings[stage.name] = time.perf_counter() - t0
+            logging.info(f"Stage '{stage.name}' finished in {timings[stage.name]:.1f}s")
+
+    async def start_all():
+        # tasks must all exist before any stage awaits its dependencies
+        for stage in stages:
+            tasks[stage.name] = asyncio.create_task(run(stage))
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    _check_acyclic(by_name)
+    await start_all()
+
+    for name, task in tasks.items():
+        exc = task.exception()
+        if isinstance(exc, StageSkipped):
+            logging.warning(f"Stage '{name}' skipped: {exc}")
+        elif exc is not None:
+            logging.error(f"Stage '{name}' failed: {exc}", exc_info=exc)
+        results[name] = exc if exc is not None else task.result()
+
+    summary = ", ".join(f"{name}={secs:.1f}s" for name, secs in timings.items())
+    logging.info(f"Stage timings: {summary}")
+    return results, timings
+
+
+def _check_acyclic(by_name: dict[str, Stage]) -> None:
+    """Rejects graphs with cycles, which would otherwise deadlock."""
+    visiting, done = set(), set()
+
+    def visit(name: str):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Stage graph has a cycle through '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in by_name:
+        visit(name)
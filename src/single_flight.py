@@ -0,0 +1,139 @@
+# src/single_flight.py
+"""
+Single-flight coalescing of identical research briefs.
+
+When a brief is submitted while an identical one (same company, same
+normalized query) is still running, the new job becomes a *follower* of the
+running *leader*: it keeps its own job record, but instead of running
+Phases 1-5 again it waits for the leader's checkpoints and copies them. Each
+follower still runs its own Phase 7, so the strategy stays personalised.
+If the leader fails or takes too long, the follower runs the pipeline itself.
+
+A follower does not wait inside its Celery task, which would hold a worker
+slot for as long as the leader runs: while `follower_should_wait` is true,
+the task re-enqueues itself with a SINGLE_FLIGHT_RECHECK_S countdown.
+
+A finished leader's checkpoints are therefore kept until its last in-flight
+follower has finished too (`release_checkpoints`).
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from database.session import SessionLocal
+from database.models import Job as DBJob
+from src import constants
+from src.checkpoints import Checkpointer, delete_checkpoints
+from src.utils.cache import make_key, normalize_query
+
+# Stage outputs a follower copies from its leader before running the pipeline.
+RESEARCH_STAGES = ("search_plan", "tagged_urls", "intermediate_reports", "extraction", "final_report")
+
+
+def query_fingerprint(company_name: str | None, query: str) -> str:
+    """Identical briefs from the same company share a fingerprint."""
+    return make_key("job", normalize_query(company_name or ""), normalize_query(query))
+
+
+def find_leader(db: Session, fingerprint: str) -> DBJob | None:
+    """The oldest recent in-flight leader job with this fingerprint, if any."""
+    if not constants.SINGLE_FLIGHT:
+        return None
+    since = datetime.utcnow() - timedelta(minutes=constants.SINGLE_FLIGHT_MAX_LEADER_AGE_MIN)
+    return (
+        db.query(DBJob)
+        .filter(
+            DBJob.query_fingerprint == fingerprint,
+            DBJob.leader_job_id.is_(None),
+            DBJob.status.in_(("pending", "running")),
+            DBJob.created_at >= since,
+        )
+        .order_by(DBJob.created_at)
+        .first()
+    )
+
+
+def leader_state(leader_job_id: str, stages: tuple[str, ...]) -> tuple[str, Checkpointer | None]:
+    """
+    ("ready", leader's Checkpointer) once the leader has checkpointed every stage in
+    `stages`; ("waiting", None) while it is still in flight without them; ("gone", None)
+    if it failed, finished without those stages or disappeared.
+    """
+    # status first: a leader seen as finished has saved all its checkpoints already
+    status = _job_status(leader_job_id)
+    leader = Checkpointer(leader_job_id)
+    if all(stage in leader.completed() for stage in stages):
+        return "ready", leader
+    if status in ("pending", "running"):
+        return "waiting", None
+    logging.info(f"Single-flight: leader {leader_job_id} is '{status}' without {stages}; not following.")
+    return "gone", None
+
+
+def follower_should_wait(leader_job_id: str, submitted_at: datetime | None) -> bool:
+    """
+    True while the leader is still working towards the research stages and the follower,
+    submitted at `submitted_at`, has waited less than SINGLE_FLIGHT_WAIT_TIMEOUT_S.
+    """
+    state, _ = leader_state(leader_job_id, RESEARCH_STAGES)
+    if state != "waiting":
+        return False
+    waited_s = (datetime.utcnow() - (submitted_at or datetime.utcnow())).total_seconds()
+    if waited_s >= constants.SINGLE_FLIGHT_WAIT_TIMEOUT_S:
+        logging.warning(f"Single-flight: gave up waiting for leader {leader_job_id} after {waited_s:.0f}s.")
+        return False
+    return True
+
+
+async def wait_for_leader(leader_job_id: str, stages: tuple[str, ...],
+                          timeout_s: float = constants.SINGLE_FLIGHT_OVERVIEW_WAIT_S) -> Checkpointer | None:
+    """
+    Polls the leader, inside the calling task, until it has checkpointed every stage in
+    `stages`. For short waits only (the leader's overview). Returns the leader's
+    Checkpointer, or None if the leader is gone or did not get there within `timeout_s`.
+    """
+    deadline = time.monotonic() + timeout_s
+    while True:
+        state, leader = await asyncio.to_thread(leader_state, leader_job_id, stages)
+        if state != "waiting":
+            return leader
+        if time.monotonic() >= deadline:
+            logging.warning(f"Single-flight: gave up waiting for leader {leader_job_id} after {timeout_s:.0f}s.")
+            return None
+        await asyncio.sleep(constants.SINGLE_FLIGHT_POLL_SECONDS)
+
+
+def _job_status(job_id: str) -> str | None:
+    with SessionLocal() as s:
+        job = s.query(DBJob).filter(DBJob.id == job_id).first()
+        return job.status if job else None
+
+
+def _has_followers_in_flight(db: Session, leader_job_id: str) -> bool:
+    return db.query(DBJob.id).filter(
+        DBJob.leader_job_id == leader_job_id,
+        DBJob.status.in_(("pending", "running")),
+    ).first() is not None
+
+
+def release_checkpoints(job_id: str, leader_job_id: str | None) -> None:
+    """
+    Called once a job's result is stored: deletes its checkpoints unless followers may
+    still copy them, and its leader's if the leader is done and this was its last
+    in-flight follower. Never raises.
+    """
+    try:
+        with SessionLocal() as s:
+            releasable = [] if _has_followers_in_flight(s, job_id) else [job_id]
+            if leader_job_id:
+                leader = s.query(DBJob.status).filter(DBJob.id == leader_job_id).first()
+                leader_done = leader is None or leader.status not in ("pending", "running")
+                if leader_done and not _has_followers_in_flight(s, leader_job_id):
+                    releasable.append(leader_job_id)
+    except Exception as e:
+        logging.warning(f"Single-flight: could not check followers of job {job_id}; keeping checkpoints. Error: {e}")
+        return
+    delete_checkpoints(releasable)
@@ -0,0 +1,134 @@
+# src/status_writer.py
+"""
+Buffered job status writer for the Celery worker.
+
+Pipeline progress callbacks used to re-read the job row and rewrite the whole
+`logs` JSON array on every message (O(n²) in log volume, with a row lock held
+each time). This writer instead keeps the latest stage/progress and the new
+log lines in memory and flushes them in one short transaction:
+  - immediately when the stage changes (stage boundary), and
+  - otherwise at most every STATUS_FLUSH_INTERVAL_S seconds.
+Log lines go to the append-only `job_logs` table; only stage/progress touch
+the `jobs` row. Live dashboards still get every update at once through
+Redis pub/sub (src/events.py).
+
+Progress only ever moves forward: stages that run in parallel report in any
+order, so the writer keeps the highest value seen, and the row update keeps
+the higher of the stored and the new value (stage tasks in other processes
+write the same row).
+
+If a flush fails, its updates go back into the buffer and are retried with
+the next one; at most STATUS_BUFFER_MAX_LINES log lines are kept meanwhile.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import case, func
+
+from database.session import SessionLocal
+from database.models import Job as DBJob, JobLog
+from src import constants
+from src.events import publish_job_event
+
+
+class BufferedStatusWriter:
+    def __init__(self, job_id: str, flush_interval_s: float = constants.STATUS_FLUSH_INTERVAL_S,
+                 max_lines: int = constants.STATUS_BUFFER_MAX_LINES):
+        self.job_id = job_id
+        self.flush_interval_s = flush_interval_s
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # flushes commit in order, so an older stage never wins
+        self._stage: str | None = None
+        self._progress: int | None = None
+        self._max_progress = 0
+        self._messages: list[tuple[str, datetime]] = []
+        self._flushed_stage: str | None = None
+        self._last_flush = time.monotonic()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def record(self, stage: str = None, progress: int = None, message: str = None) -> bool:
+        """Buffers an update and publishes it live. Returns True if it should be flushed now."""
+        with self._lock:
+            if stage:
+                self._stage = stage
+            if progress:
+                progress = self._max_progress = max(self._max_progress, progress)
+                self._progress = progress
+            if message:
+                self._messages.append((message, datetime.utcnow()))
+                self._trim_locked()
+            boundary = bool(stage) and stage != self._flushed_stage
+            due = time.monotonic() - self._last_flush >= self.flush_interval_s
+
+        if stage or progress:
+            publish_job_event(self.job_id, {"type": "status", "status": "running", "stage": stage, "progress": progress})
+        if message:
+            publish_job_event(self.job_id, {"type": "log", "message": message})
+        return boundary or due
+
+    async def update(self, stage: str = None, progress: int = None, message: str = None) -> None:
+        """The pipeline's `update_status` callback."""
+        # record publishes to Redis synchronously; a slow Redis must not stall the pipeline's event loop
+        if await asyncio.to_thread(self.record, stage, progress, message):
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            await asyncio.to_thread(self.flush)
+        elif self._timer is None:
+            # make sure a lone message is written even if no further update arrives
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval_s, self._flush_later)
+        await asyncio.sleep(0.01)
+
+    def _flush_later(self) -> None:
+        self._timer = None
+        asyncio.get_running_loop().create_task(asyncio.to_thread(self.flush))
+
+    def flush(self) -> None:
+        """Writes the buffered stage/progress and log lines in one transaction. Never raises."""
+        with self._flush_lock:
+            self._flush_locked()
+
+    def _trim_locked(self) -> None:
+        dropped = len(self._messages) - self.max_lines
+        if dropped > 0:
+            del self._messages[:dropped]
+            logging.warning(f"Status writer: buffer full for job {self.job_id}, dropped {dropped} unwritten log line(s).")
+
+    def _flush_locked(self) -> None:
+        with self._lock:
+            stage, progress, messages = self._stage, self._progress, self._messages
+            self._stage, self._progress, self._messages = None, None, []
+            self._last_flush = time.monotonic()
+            flushed_stage = self._flushed_stage
+            if stage:
+                self._flushed_stage = stage
+        if not (stage or progress or messages):
+            return
+
+        try:
+            with SessionLocal() as s:
+                values = {}
+                if stage:
+                    values[DBJob.job_stage] = stage
+                if progress:
+                    values[DBJob.job_progress] = case(
+                        (func.coalesce(DBJob.job_progress, 0) < progress, progress), else_=DBJob.job_progress
+                    )
+                if values:
+                    s.query(DBJob).filter(DBJob.id == self.job_id).update(values, synchronize_session=False)
+                s.add_all(JobLog(job_id=self.job_id, message=m, created_at=ts) for m, ts in messages)
+                s.commit()
+        except Exception as e:
+            logging.warning(f"Status writer: could not flush updates for job {self.job_id}, will retry. Error: {e}")
+            with self._lock:
+                # updates recorded since take precedence; the log lines keep their order
+                self._stage = self._stage or stage
+                self._progress = self._progress or progress
+                self._messages = messages + self._messages
+                self._trim_locked()
+                if self._flushed_stage == stage:
+                    self._flushed_stage = flushed_stage
@@ -2,131 +2,593 @@
 import asyncio
 import logging
 import time
+from datetime import datetime
 from celery_worker import celery_app
 from api.sheets_logger import log_to_sheets
 
 from database.session import SessionLocal
 from database.models import Job as DBJob
-from src.main import execute_research_pipeline
+from celery import chain, chord
+from celery.exceptions import Retry
+from src import config, constants
+from src.main import (
+    execute_research_pipeline, run_planning, run_search, run_extraction, run_synthesis,
+    run_final_synthesis, build_research_result
+)
 from src.rag_uploader import upload_artifacts_to_rag
 from src.phase6_visual_synthesizer import generate_overview_data
 from src.phase7_strategist import generate_strategic_insights
+from src.scheduler import Stage, run_stage_graph
+from src.checkpoints import Checkpointer
+from src.single_flight import (
+    RESEARCH_STAGES, follower_should_wait, leader_state, release_checkpoints, wait_for_leader
+)
+from src.events import publish_job_event
+from src.status_writer import BufferedStatusWriter
+from src.result_store import pack_result, load_result, store_report_pdf
+from src.utils.pdf_generator import ProfessionalPDFGenerator, report_title_from_query
+from src.utils.pdf_cache import pdf_cache_key, template_version
 
-@celery_app.task(name="run_research_pipeline_task")
-def run_research_pipeline_task(job_id: str, query: str, should_upload_to_rag: bool):
+DEFAULT_COMPANY_PROFILE = "A company in the coatings industry."
+CLIENT_COMPANY_PROFILE = "A leading global chemical company seeking to enhance its market intelligence capabilities. Their business teams need a solution that enables them to efficiently gather, synthesize, and analyze up-to-date information on market trends, innovations, and competitive activity—specifically from trusted, industry-relevant sources. The solution must focus on topics critical to the decorative coatings sector, such as weatherability, scuff-resistance, hydrophobicity, and sustainability, and support the needs of global business and R&D teams."
+
+
+# --- Helpers shared by the single-task pipeline and the canvas stage tasks ---
+
+def _company_context(job: DBJob) -> tuple[str, str]:
+    """(company_name, company_profile) for Phase 7, from the job's owner."""
+    user = job.owner
+    if not user or not user.company_name:
+        logging.warning(f"Job {job.id} owner or company name not found. Using default profile.")
+        return "the client company", DEFAULT_COMPANY_PROFILE
+    # Using the exact profile provided in the prompt
+    return user.company_name, CLIENT_COMPANY_PROFILE
+
+
+def _owner_display_name(job: DBJob) -> str | None:
+    """The name printed on the job's PDF report, as the download endpoint picks it."""
+    user = job.owner
+    return (user.name or user.email) if user else None
+
+
+def _defer_while_leader_runs(task, job_id: str) -> None:
+    """
+    Single-flight follower whose leader is still on Phases 1-5: marks the job as waiting
+    and re-enqueues `task` to check again in SINGLE_FLIGHT_RECHECK_S, instead of holding
+    the worker while the leader runs. Returns if the job should go ahead now.
+    """
+    with SessionLocal() as s:
+        job = s.query(DBJob).filter(DBJob.id == job_id).first()
+        if not job or not job.leader_job_id or job.status not in ('pending', 'running'):
+            return
+        if Checkpointer(job_id).has("final_report") or not follower_should_wait(job.leader_job_id, job.created_at):
+            return
+        first_check = job.job_stage != 'waiting_for_leader'
+        if first_check:
+            job.status = 'running'
+            job.started_at = job.started_at or datetime.utcnow()
+            s.commit()
+    if first_check:
+        status_writer = BufferedStatusWriter(job_id)
+        status_writer.record(stage="waiting_for_leader", progress=10,
+                             message="An identical brief is already running; sharing its research...")
+        status_writer.flush()
+    raise task.retry(countdown=constants.SINGLE_FLIGHT_RECHECK_S)
+
+
+async def _follow_leader(job_id: str, leader_job_id: str, checkpointer: Checkpointer, update_status) -> Checkpointer | None:
+    """
+    Single-flight follower: copies the leader's Phase 1-5 checkpoints into this job's
+    checkpoints so the pipeline restores them instead of running again (the task has
+    already waited for them, see _defer_while_leader_runs).
+    Returns the leader's Checkpointer, or None if the follower has to run the pipeline itself.
+    """
+    _, leader_checkpoints = await asyncio.to_thread(leader_state, leader_job_id, RESEARCH_STAGES)
+    if not leader_checkpoints:
+        await update_status(message="Shared research unavailable; running the full pipeline...")
+        return None
+    for stage_name in RESEARCH_STAGES:
+        await asyncio.to_thread(checkpointer.save, stage_name, leader_checkpoints.get(stage_name))
+    logging.info(f"Job {job_id}: research copied from leader job {leader_job_id}.")
+    return leader_checkpoints
+
+
+def _generate_overview(job_id: str, result_data: dict, checkpointer: Checkpointer) -> dict | None:
+    try:
+        overview_data = generate_overview_data(
+            result_data.get('final_report_markdown', ''),
+            result_data.get('extracted_data', {})
+        )
+        logging.info(f"Job {job_id}: Successfully generated overview data.")
+        if overview_data is not None:
+            checkpointer.save("overview", overview_data)
+        return overview_data
+    except Exception as e:
+        logging.error(f"Job {job_id}: Failed to generate overview data. Error: {e}", exc_info=True)
+        return None
+
+
+def _generate_strategy(job_id: str, result_data: dict, query: str, company_name: str,
+                       company_profile: str, checkpointer: Checkpointer) -> dict:
+    try:
+        strategic_data = generate_strategic_insights(
+            final_report_md=result_data.get('final_report_markdown', ''),
+            structured_data=result_data.get('extracted_data', {}),
+            original_query=query,
+            company_name=company_name,
+            company_profile=company_profile
+        )
+        logging.info(f"Job {job_id}: Successfully generated strategic insights.")
+        if strategic_data and "error" not in strategic_data:
+            checkpointer.save("strategy", strategic_data)
+        return strategic_data
+    except Exception as e:
+        logging.error(f"Job {job_id}: Failed to generate strategic insights. Error: {e}", exc_info=True)
+        return {"error": "Strategy generation failed."}
+
+
+def _prerender_report_pdf(job_id: str, report_md: str, query: str, user_name: str | None,
+                          checkpointer: Checkpointer) -> dict | None:
+    """
+    Renders the report PDF (PRERENDER_PDF), stores it in the blob store and checkpoints
+    the reference, so the download right after completion does not have to render it.
+    Returns the reference for pack_result, or None; never raises, the download renders on demand.
+    """
+    if not user_name or not report_md:
+        return None
+    try:
+        started = time.perf_counter()
+        report_title = report_title_from_query(query)
+        pdf_bytes = ProfessionalPDFGenerator().generate_pdf_from_markdown(report_md, report_title, user_name)
+        ref = store_report_pdf(
+            pdf_bytes,
+            cache_key=pdf_cache_key(report_md, report_title, user_name),
+            title=report_title,
+            user_name=user_name,
+            template_version=template_version(),
+        )
+        logging.info(f"Job {job_id}: PDF report pre-rendered in {time.perf_counter() - started:.1f}s ({len(pdf_bytes):,} bytes).")
+    except Exception as e:
+        logging.warning(f"Job {job_id}: could not pre-render the PDF report; it will be rendered on download. Error: {e}")
+        return None
+    try:
+        checkpointer.save("report_pdf", ref)
+    except Exception as e:
+        logging.warning(f"Job {job_id}: could not checkpoint the pre-rendered PDF. Error: {e}")
+    return ref
+
+
+def _persist_result(job_id: str, result_data: dict, should_upload_to_rag: bool, report_pdf: dict | None = None) -> None:
+    """Stores the result and marks the job completed (RAG may still be uploading)."""
+    stored_result = pack_result(job_id, result_data, report_pdf)
+    with SessionLocal() as s:
+        job_to_update = s.query(DBJob).filter(DBJob.id == job_id).first()
+        job_to_update.result = stored_result
+        job_to_update.status = 'completed'
+        job_to_update.job_stage = 'finished'
+        job_to_update.job_progress = 100
+        if not should_upload_to_rag:
+            job_to_update.rag_status = 'not_requested'
+        leader_job_id = job_to_update.leader_job_id
+        s.commit()
+    publish_job_event(job_id, {"type": "finished", "status": "completed"})
+    release_checkpoints(job_id, leader_job_id)  # the stored result replaces them
+
+
+def _upload_to_rag(job_id: str, result_data: dict) -> None:
+    with SessionLocal() as s:
+        job_to_update = s.query(DBJob).filter(DBJob.id == job_id).first()
+        job_to_update.rag_status = 'uploading'
+        s.commit()
+
+    logging.info(f"Job {job_id}: Starting RAG upload process...")
+    collection_name = upload_artifacts_to_rag(job_id, result_data)
+
+    with SessionLocal() as s:
+        job_to_update = s.query(DBJob).filter(DBJob.id == job_id).first()
+        if collection_name:
+            job_to_update.rag_status = 'uploaded'
+            job_to_update.rag_collection_name = collection_name
+            job_to_update.rag_error = None
+            logging.info(f"Job {job_id}: RAG upload successful. Status updated to 'uploaded'.")
+        else:
+            job_to_update.rag_status = 'failed'
+            job_to_update.rag_error = "RAG upload process failed. Check worker logs."
+            logging.error(f"Job {job_id}: RAG upload failed. Status updated to 'failed'.")
+        s.commit()
+
+
+def _mark_rag_failed(job_id: str, error: Exception) -> None:
+    with SessionLocal() as s:
+        job_to_update = s.query(DBJob).filter(DBJob.id == job_id).first()
+        job_to_update.rag_status = 'failed'
+        job_to_update.rag_error = f"RAG upload process failed: {error}"
+        s.commit()
+
+
+def _mark_failed(job_id: str, error) -> None:
+    with SessionLocal() as s:
+        job_to_update = s.query(DBJob).filter(DBJob.id == job_id).first()
+        if not job_to_update or job_to_update.status == 'failed':
+            return
+        job_to_update.status = 'failed'
+        job_to_update.job_stage = 'error'
+        job_to_update.job_progress = 0
+        job_to_update.result = {"error": str(error)}
+        s.commit()
+    publish_job_event(job_id, {"type": "finished", "status": "failed"})
+
+
+# acks_late + reject_on_worker_lost: if the worker dies mid-job the broker redelivers
+# the task, and the checkpoints below let it pick up after the last completed stage.
+# bind/max_retries=None: a single-flight follower re-enqueues itself until its leader is done.
+@celery_app.task(name="run_research_pipeline_task", bind=True, max_retries=None, acks_late=True, reject_on_worker_lost=True)
+def run_research_pipeline_task(self, job_id: str, query: str, should_upload_to_rag: bool):
     """
     Celery task that executes the full research, visualization, and strategy pipeline.
     This version correctly handles RAG uploads synchronously and uses asyncio.run().
+    Stage outputs are checkpointed, so a redelivered task resumes instead of restarting.
     """
     logging.info(f"Celery task started for job_id: {job_id}")
     db = SessionLocal()
     job = None  # Initialize job to None
+    status_writer = None
     try:
         job = db.query(DBJob).filter(DBJob.id == job_id).first()
         if not job:
             logging.error(f"Job {job_id} not found in DB. Aborting.")
             return
+        if job.status == 'completed':
+            # Redelivered after the job already finished (e.g. worker died before the ack).
+            logging.info(f"Job {job_id} is already completed. Nothing to do.")
+            return
+        _defer_while_leader_runs(self, job_id)
+
+        checkpointer = Checkpointer(job_id)
+        resumed_stages = checkpointer.completed()
 
         # +++ GET COMPANY INFO FROM THE JOB'S USER +++
-        user = job.owner
-        if not user or not user.company_name:
-            logging.warning(f"Job {job_id} owner or company name not found. Using default profile.")
-            company_name = "the client company"
-            company_profile = "A company in the coatings industry."
-        else:
-            # Using the exact profile provided in the prompt
-            company_name = user.company_name
-            company_profile = "A leading global chemical company seeking to enhance its market intelligence capabilities. Their business teams need a solution that enables them to efficiently gather, synthesize, and analyze up-to-date information on market trends, innovations, and competitive activity—specifically from trusted, industry-relevant sources. The solution must focus on topics critical to the decorative coatings sector, such as weatherability, scuff-resistance, hydrophobicity, and sustainability, and support the needs of global business and R&D teams."
+        company_name, company_profile = _company_context(job)
+        user_name = _owner_display_name(job)
 
         job.status = 'running'
         job.job_stage = 'initializing'
         job.job_progress = 5
+        job.started_at = job.started_at or datetime.utcnow()  # first start only; feeds queue wait metrics
         db.commit()
+        publish_job_event(job_id, {"type": "status", "status": "running", "stage": "initializing", "progress": 5})
 
-        # This async helper function will be passed to the pipeline
-        async def update_status_in_db(stage: str = None, progress: int = None, message: str = None):
-            with SessionLocal() as s:
-                job_to_update = s.query(DBJob).filter(DBJob.id == job_id).first()
-                if job_to_update:
-                    if stage: job_to_update.job_stage = stage
-                    if progress: job_to_update.job_progress = progress
-                    if message:
-                        job_to_update.logs = (job_to_update.logs or []) + [message]
-                    s.commit()
-            await asyncio.sleep(0.01)
-
-        # Replace the manual loop management with a single call to asyncio.run()
-        result_data = asyncio.run(
-            execute_research_pipeline(query, update_status_in_db)
-        )
-        
-        # Run Visual Synthesizer
-        asyncio.run(update_status_in_db(stage="generating_visuals", progress=85, message="Creating visual dashboard data..."))
-        try:
-            overview_data = generate_overview_data(
-                result_data.get('final_report_markdown', ''),
-                result_data.get('extracted_data', {})
-            )
-            result_data['overview_data'] = overview_data
-            logging.info(f"Job {job_id}: Successfully generated overview data.")
-        except Exception as e:
-            logging.error(f"Job {job_id}: Failed to generate overview data. Error: {e}", exc_info=True)
-            result_data['overview_data'] = None
+        # Coalesces stage/progress/log updates into few short writes; the pipeline gets its `update` callback.
+        status_writer = BufferedStatusWriter(job_id)
+        update_status_in_db = status_writer.update
+        if resumed_stages:
+            logging.info(f"Job {job_id}: resuming from checkpoints {resumed_stages}")
+            status_writer.record(message=f"Resuming after interruption ({len(resumed_stages)} stage(s) already done)...")
+
+        leader_job_id = job.leader_job_id
+        leader_checkpoints = None
+
+        # --- Stage functions for the job graph ---
+        async def research_stage(_):
+            nonlocal leader_checkpoints
+            if leader_job_id and not checkpointer.has("final_report"):
+                # Single-flight follower: reuse the leader's Phases 1-5 instead of running them again.
+                leader_checkpoints = await _follow_leader(job_id, leader_job_id, checkpointer, update_status_in_db)
+            return await execute_research_pipeline(query, update_status_in_db, checkpointer=checkpointer)
+
+        async def visuals_stage(deps):
+            result_data = deps["research"]
+            if checkpointer.has("overview"):
+                return checkpointer.get("overview")
+            if leader_checkpoints:
+                # The dashboard is not personalised, so a follower takes the leader's if it produces one.
+                leader_overview = await wait_for_leader(leader_job_id, ("overview",))
+                if leader_overview:
+                    overview_data = leader_overview.get("overview")
+                    await asyncio.to_thread(checkpointer.save, "overview", overview_data)
+                    return overview_data
+            # visuals and strategy run side by side, so they report the same progress
+            await update_status_in_db(stage="generating_visuals", progress=85, message="Creating visual dashboard data...")
+            return await asyncio.to_thread(_generate_overview, job_id, result_data, checkpointer)
 
         # +++ RUN STRATEGIC SYNTHESIZER +++
-        asyncio.run(update_status_in_db(stage="generating_strategy", progress=95, message=f"Generating personalized strategy for {company_name}..."))
-        try:
-            strategic_data = generate_strategic_insights(
-                final_report_md=result_data.get('final_report_markdown', ''),
-                structured_data=result_data.get('extracted_data', {}),
-                original_query=query,
-                company_name=company_name,
-                company_profile=company_profile
+        async def strategy_stage(deps):
+            result_data = deps["research"]
+            if checkpointer.has("strategy"):
+                return checkpointer.get("strategy")
+            await update_status_in_db(stage="generating_strategy", progress=85, message=f"Generating personalized strategy for {company_name}...")
+            return await asyncio.to_thread(
+                _generate_strategy, job_id, result_data, query, company_name, company_profile, checkpointer
             )
-            result_data['strategic_insights'] = strategic_data
-            logging.info(f"Job {job_id}: Successfully generated strategic insights.")
-        except Exception as e:
-            logging.error(f"Job {job_id}: Failed to generate strategic insights. Error: {e}", exc_info=True)
-            result_data['strategic_insights'] = {"error": "Strategy generation failed."}
-
-        # Update job as completed BEFORE potential RAG upload
-        job = db.query(DBJob).filter(DBJob.id == job_id).first() # Re-fetch job to be safe
-        job.result = result_data
-        job.status = 'completed'
-        job.job_stage = 'finished'
-        job.job_progress = 100
-        if should_upload_to_rag:
-            job.rag_status = 'uploading'
-        else:
-            job.rag_status = 'not_requested'
-        db.commit()
-        
-        # Handle RAG Upload Sequentially
+
+        # Render the PDF while visuals and strategy run; never fails the job
+        def pdf_stage(deps):
+            if checkpointer.has("report_pdf"):
+                return checkpointer.get("report_pdf")
+            return _prerender_report_pdf(job_id, deps["research"].get("final_report_markdown"), query, user_name,
+                                         checkpointer)
+
+        def persist_stage(deps):
+            # Mark the job completed as soon as the dashboard data exists; RAG may still be uploading.
+            result_data = deps["research"]
+            result_data['overview_data'] = deps["visuals"]
+            result_data['strategic_insights'] = deps["strategy"]
+            result_data.setdefault('metadata', {})['stage_timings'] = {
+                name: round(secs, 1) for name, secs in stage_timings.items()
+            }
+            status_writer.flush()  # buffered log lines land before the job reads as completed
+            _persist_result(job_id, result_data, should_upload_to_rag, deps.get("pdf"))
+
+        # Handle RAG upload as soon as the report exists, alongside visuals and strategy
+        def rag_upload_stage(deps):
+            _upload_to_rag(job_id, deps["research"])
+
+        stages = [
+            Stage("research", research_stage),
+            Stage("visuals", visuals_stage, deps=("research",)),
+            Stage("strategy", strategy_stage, deps=("research",)),
+        ]
+        persist_deps = ("research", "visuals", "strategy")
+        if config.PRERENDER_PDF:
+            stages.append(Stage("pdf", pdf_stage, deps=("research",)))
+            persist_deps += ("pdf",)
+        stages.append(Stage("persist", persist_stage, deps=persist_deps))
         if should_upload_to_rag:
-            logging.info(f"Job {job_id}: Starting RAG upload process...")
-            collection_name = upload_artifacts_to_rag(job_id, result_data)
-            
-            job = db.query(DBJob).filter(DBJob.id == job_id).first() # Re-fetch again
-            if collection_name:
-                job.rag_status = 'uploaded'
-                job.rag_collection_name = collection_name
-                job.rag_error = None
-                logging.info(f"Job {job_id}: RAG upload successful. Status updated to 'uploaded'.")
-            else:
-                job.rag_status = 'failed'
-                job.rag_error = "RAG upload process failed. Check worker logs."
-                logging.error(f"Job {job_id}: RAG upload failed. Status updated to 'failed'.")
-            
-            db.commit()
+            stages.append(Stage("rag_upload", rag_upload_stage, deps=("research",)))
 
+        # A single event loop for the whole job; stages overlap wherever the graph allows.
+        stage_timings: dict = {}
+        results, timings = asyncio.run(run_stage_graph(stages, timings=stage_timings))
+        status_writer.flush()
+
+        # The pipeline itself failing is fatal; everything else already degrades gracefully.
+        for stage_name in ("research", "persist"):
+            if isinstance(results.get(stage_name), Exception):
+                raise results[stage_name]
+        if should_upload_to_rag and isinstance(results.get("rag_upload"), Exception):
+            _mark_rag_failed(job_id, results["rag_upload"])
+
+    except Retry:
+        raise  # single-flight follower re-enqueued itself; not a failure
     except Exception as e:
         logging.error(f"Job {job_id}: Celery task failed.", exc_info=True)
         # Ensure job is not None before trying to update it
+        if status_writer:
+            status_writer.flush()
         if job:
-            job.status = 'failed'
-            job.job_stage = 'error'
-            job.job_progress = 0
-            job.result = {"error": str(e)}
-            db.commit()
+            _mark_failed(job_id, e)
+    finally:
+        db.close()
+
+
+# =============================================================================
+# Canvas mode (PIPELINE_MODE=canvas): one Celery task per stage, each on its own
+# queue (see task_routes in celery_worker.py), wired as
+#   plan -> search -> chord(extraction, synthesis) -> final
+#        -> chord(visuals, strategy[, pdf]) -> persist -> RAG upload
+# Stages hand data to each other through job checkpoints, not task results, so
+# every stage task is idempotent and a redelivered one resumes where it left off.
+# =============================================================================
+
+def _run_stage_task(job_id: str, stage: str, work) -> None:
+    """
+    Common wrapper for the stage tasks: loads the job, runs `work(ctx)` (a coroutine
+    function) in a fresh event loop and flushes buffered status writes.
+    Exceptions propagate so the chain stops and the errback marks the job failed.
+    """
+    with SessionLocal() as s:
+        job = s.query(DBJob).filter(DBJob.id == job_id).first()
+        if not job:
+            logging.error(f"Job {job_id} not found in DB. Skipping stage '{stage}'.")
+            return
+        if job.status == 'completed':
+            logging.info(f"Job {job_id} is already completed. Skipping stage '{stage}'.")
+            return
+        company_name, company_profile = _company_context(job)
+        ctx = {
+            "job_id": job_id,
+            "query": job.original_query,
+            "should_upload_to_rag": bool(job.upload_to_rag),
+            "leader_job_id": job.leader_job_id,
+            "company_name": company_name,
+            "company_profile": company_profile,
+            "user_name": _owner_display_name(job),
+            "checkpointer": Checkpointer(job_id),
+        }
+        if job.status == 'pending':
+            job.status = 'running'
+            job.started_at = job.started_at or datetime.utcnow()
+            s.commit()
+
+    logging.info(f"Job {job_id}: stage task '{stage}' started.")
+    status_writer = BufferedStatusWriter(job_id)
+    ctx["update_status"] = status_writer.update
+    try:
+        asyncio.run(work(ctx))
     finally:
-        db.close() 
\ No newline at end of file
+        status_writer.flush()
+
+
+def _require_checkpoint(ctx: dict, stage: str):
+    if not ctx["checkpointer"].has(stage):
+        raise RuntimeError(f"Pipeline Error: checkpoint '{stage}' is missing for job {ctx['job_id']}.")
+    return ctx["checkpointer"].get(stage)
+
+
+def _research_result(ctx: dict) -> dict:
+    """Rebuilds the research result dict from the Phase 3-5 checkpoints."""
+    synthesized = _require_checkpoint(ctx, "intermediate_reports")
+    return build_research_result(
+        ctx["query"],
+        _require_checkpoint(ctx, "final_report")["markdown"],
+        synthesized["reports"],
+        _require_checkpoint(ctx, "extraction"),
+    )
+
+
+@celery_app.task(name="pipeline.plan", bind=True, max_retries=None, acks_late=True, reject_on_worker_lost=True)
+def plan_stage_task(self, job_id: str):
+    try:
+        _defer_while_leader_runs(self, job_id)  # the retry keeps the rest of the chain
+    except Retry:
+        raise
+    except Exception as e:
+        logging.error(f"Job {job_id}: could not check the single-flight leader.", exc_info=True)
+        _mark_failed(job_id, e)
+        raise
+
+    async def work(ctx):
+        if ctx["leader_job_id"] and not ctx["checkpointer"].has("final_report"):
+            await _follow_leader(job_id, ctx["leader_job_id"], ctx["checkpointer"], ctx["update_status"])
+        await run_planning(ctx["query"], ctx["update_status"], ctx["checkpointer"])
+    _run_stage_task(job_id, "plan", work)
+
+
+@celery_app.task(name="pipeline.search", acks_late=True, reject_on_worker_lost=True)
+def search_stage_task(job_id: str):
+    async def work(ctx):
+        search_queries = _require_checkpoint(ctx, "search_plan")
+        await run_search(ctx["query"], search_queries, ctx["update_status"], ctx["checkpointer"])
+        await ctx["update_status"](stage="synthesizing", progress=50, message="Starting parallel analysis...")
+    _run_stage_task(job_id, "search", work)
+
+
+@celery_app.task(name="pipeline.extraction", acks_late=True, reject_on_worker_lost=True)
+def extraction_stage_task(job_id: str):
+    async def work(ctx):
+        tagged_urls = [tuple(pair) for pair in _require_checkpoint(ctx, "tagged_urls")]
+        payload = await run_extraction(ctx["query"], tagged_urls, ctx["checkpointer"])
+        failed = payload["metadata"].get("urls_failed", 0)
+        if failed:
+            await ctx["update_status"](message=f"⚠️ {failed} source(s) could not be extracted (API quota or fetch errors).")
+    _run_stage_task(job_id, "extraction", work)
+
+
+@celery_app.task(name="pipeline.synthesis", acks_late=True, reject_on_worker_lost=True)
+def synthesis_stage_task(job_id: str):
+    async def work(ctx):
+        tagged_urls = [tuple(pair) for pair in _require_checkpoint(ctx, "tagged_urls")]
+        await run_synthesis(ctx["query"], tagged_urls, ctx["checkpointer"])
+    _run_stage_task(job_id, "synthesis", work)
+
+
+@celery_app.task(name="pipeline.final", acks_late=True, reject_on_worker_lost=True)
+def final_stage_task(job_id: str):
+    async def work(ctx):
+        synthesized = _require_checkpoint(ctx, "intermediate_reports")
+        _require_checkpoint(ctx, "extraction")
+        await run_final_synthesis(ctx["query"], synthesized["reports"], synthesized["report_urls"],
+                                  ctx["update_status"], ctx["checkpointer"])
+    _run_stage_task(job_id, "final", work)
+
+
+@celery_app.task(name="pipeline.visuals", acks_late=True, reject_on_worker_lost=True)
+def visuals_stage_task(job_id: str):
+    async def work(ctx):
+        if ctx["checkpointer"].has("overview"):
+            return
+        if ctx["leader_job_id"]:
+            # The dashboard is not personalised, so a follower takes the leader's if it produces one.
+            leader_overview = await wait_for_leader(ctx["leader_job_id"], ("overview",))
+            if leader_overview:
+                await asyncio.to_thread(ctx["checkpointer"].save, "overview", leader_overview.get("overview"))
+                return
+        await ctx["update_status"](stage="generating_visuals", progress=85, message="Creating visual dashboard data...")
+        await asyncio.to_thread(_generate_overview, job_id, _research_result(ctx), ctx["checkpointer"])
+    _run_stage_task(job_id, "visuals", work)
+
+
+@celery_app.task(name="pipeline.strategy", acks_late=True, reject_on_worker_lost=True)
+def strategy_stage_task(job_id: str):
+    async def work(ctx):
+        if ctx["checkpointer"].has("strategy"):
+            return
+        await ctx["update_status"](stage="generating_strategy", progress=85,
+                                   message=f"Generating personalized strategy for {ctx['company_name']}...")
+        await asyncio.to_thread(_generate_strategy, job_id, _research_result(ctx), ctx["query"],
+                                ctx["company_name"], ctx["company_profile"], ctx["checkpointer"])
+    _run_stage_task(job_id, "strategy", work)
+
+
+@celery_app.task(name="pipeline.pdf", acks_late=True, reject_on_worker_lost=True)
+def pdf_stage_task(job_id: str):
+    async def work(ctx):
+        if ctx["checkpointer"].has("report_pdf"):
+            return
+        report_md = _require_checkpoint(ctx, "final_report")["markdown"]
+        await asyncio.to_thread(_prerender_report_pdf, job_id, report_md, ctx["query"], ctx["user_name"],
+                                ctx["checkpointer"])
+    _run_stage_task(job_id, "pdf", work)
+
+
+@celery_app.task(name="pipeline.persist", acks_late=True, reject_on_worker_lost=True)
+def persist_stage_task(job_id: str):
+    async def work(ctx):
+        checkpointer = ctx["checkpointer"]
+        result_data = _research_result(ctx)
+        result_data['overview_data'] = checkpointer.get("overview")
+        result_data['strategic_insights'] = checkpointer.get("strategy") or {"error": "Strategy generation failed."}
+        result_data.setdefault('metadata', {})['pipeline_mode'] = "canvas"
+        await asyncio.to_thread(_persist_result, job_id, result_data, ctx["should_upload_to_rag"],
+                                checkpointer.get("report_pdf"))
+    _run_stage_task(job_id, "persist", work)
+
+
+@celery_app.task(name="pipeline.rag_upload", acks_late=True, reject_on_worker_lost=True)
+def rag_upload_stage_task(job_id: str):
+    # Runs after persist, so the job already reads as completed; only RAG fields change here.
+    with SessionLocal() as s:
+        job = s.query(DBJob).filter(DBJob.id == job_id).first()
+        stored_result = job.result if job else None
+    result_data = load_result(stored_result) if stored_result else None
+    if not result_data:
+        logging.error(f"Job {job_id}: no stored result to upload to RAG.")
+        return
+    try:
+        _upload_to_rag(job_id, result_data)
+    except Exception as e:
+        logging.error(f"Job {job_id}: RAG upload stage failed.", exc_info=True)
+        _mark_rag_failed(job_id, e)
+
+
+@celery_app.task(name="pipeline.failed")
+def pipeline_failed_task(request, exc, traceback, job_id: str = None):
+    """Errback for the canvas: any stage task raising marks the job failed."""
+    logging.error(f"Job {job_id}: stage task {getattr(request, 'task', '?')} failed: {exc}")
+    _mark_failed(job_id, exc)
+
+
+def build_research_canvas(job_id: str, should_upload_to_rag: bool, priority: int | None = None):
+    """The Celery canvas for one research job (stage tasks pass data via checkpoints)."""
+    def stage(task):
+        sig = task.si(job_id)
+        return sig.set(priority=priority) if priority is not None else sig
+
+    tail = [stage(visuals_stage_task), stage(strategy_stage_task)]
+    if config.PRERENDER_PDF:
+        tail.append(stage(pdf_stage_task))
+    steps = [
+        stage(plan_stage_task),
+        stage(search_stage_task),
+        chord([stage(extraction_stage_task), stage(synthesis_stage_task)], stage(final_stage_task)),
+        chord(tail, stage(persist_stage_task)),
+    ]
+    if should_upload_to_rag:
+        steps.append(stage(rag_upload_stage_task))
+    workflow = chain(*steps)
+    workflow.link_error(pipeline_failed_task.s(job_id=job_id))
+    return workflow
+
+
+def dispatch_research_job(job_id: str, query: str, should_upload_to_rag: bool, priority: int | None = None) -> None:
+    """
+    Sends a research job to the workers, as one task or as a stage canvas (PIPELINE_MODE).
+    `priority` is the broker priority (0 = first), see src/fair_share.py.
+    """
+    if config.PIPELINE_MODE == "canvas":
+        build_research_canvas(job_id, should_upload_to_rag, priority).apply_async()
+    else:
+        run_research_pipeline_task.apply_async(
+            kwargs={"job_id": job_id, "query": query, "should_upload_to_rag": should_upload_to_rag},
+            priority=priority
+        )
@@ -0,0 +1,221 @@
+# src/utils/adaptive_limiter.py
+"""
+AIMD (additive-increase / multiplicative-decrease) concurrency limiter.
+
+The limit grows by roughly one slot per `limit` healthy completions and is cut
+multiplicatively when a call is throttled (429 / 5xx), when the error rate in
+the recent window is too high, or when the recent p95 latency exceeds the
+target. It works from threads (`with limiter.slot()`) and from asyncio
+(`async with limiter.aslot()`), sharing one budget per process.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+from src import constants
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+
+
+class Slot:
+    """Handed to the caller while it holds capacity; mark the outcome before exiting."""
+
+    def __init__(self, limiter: "AdaptiveLimiter"):
+        self._limiter = limiter
+        self._start = time.perf_counter()
+        self.is_throttled = False
+
+    def throttled(self) -> None:
+        """The call hit a quota / overload error (429, 5xx)."""
+        self.is_throttled = True
+
+    def _finish(self) -> None:
+        self._limiter._release(self, time.perf_counter() - self._start)
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 latency_target_s: float, window: int = 50):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_s = latency_target_s
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters: deque[_Waiter] = deque()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = throttled
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # --- acquisition -------------------------------------------------
+    def slot(self) -> "_SyncSlotContext":
+        return _SyncSlotContext(self)
+
+    def aslot(self) -> "_AsyncSlotContext":
+        return _AsyncSlotContext(self)
+
+    def _try_take(self) -> bool:
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> Slot:
+        with self._lock:
+            if self._try_take():
+                return Slot(self)
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        waiter.event.wait()
+        return Slot(self)
+
+    async def aacquire(self) -> Slot:
+        with self._lock:
+            if self._try_take():
+                return Slot(self)
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # capacity was handed over just as we were cancelled; give it back
+                    self._in_flight -= 1
+                    self._wake_locked()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+        return Slot(self)
+
+    def _wake_locked(self) -> None:
+        """Hands free capacity to queued waiters, oldest first. Caller holds the lock."""
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self._in_flight += 1
+            if waiter.event is not None:
+                waiter.event.set()
+            else:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    # --- feedback ----------------------------------------------------
+    def _release(self, slot: Slot, latency: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._learn(latency, slot.is_throttled)
+            self._wake_locked()
+
+    def _learn(self, latency: float, throttled: bool) -> None:
+        self._outcomes.append(throttled)
+        if not throttled:
+            self._latencies.append(latency)
+
+        now = time.monotonic()
+        error_rate = sum(self._outcomes) / len(self._outcomes)
+        p95 = _p95(self._latencies)
+        unhealthy = (
+            throttled
+            or error_rate > constants.ADAPTIVE_MAX_ERROR_RATE
+            or (p95 is not None and len(self._latencies) >= 5 and p95 > self.latency_target_s)
+        )
+        if unhealthy:
+            # one cut per cooldown, so a burst of failures from one overload counts once
+            if now - self._last_decrease >= constants.ADAPTIVE_DECREASE_COOLDOWN_S:
+                factor = constants.ADAPTIVE_DECREASE_FACTOR if throttled else constants.ADAPTIVE_LATENCY_DECREASE_FACTOR
+                self._limit = max(self.min_limit, self._limit * factor)
+                self._last_decrease = now
+                # forget the window that led here so the next decision uses fresh data
+                self._outcomes.clear()
+                self._latencies.clear()
+        else:
+            self._limit = min(self.max_limit, self._limit + 1 / max(1.0, self._limit))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            p95 = _p95(self._latencies)
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "p95_latency_s": round(p95, 2) if p95 is not None else None,
+            }
+
+
+class _SyncSlotContext:
+    def __init__(self, limiter: AdaptiveLimiter):
+        self._limiter = limiter
+
+    def __enter__(self) -> Slot:
+        self._slot = self._limiter.acquire()
+        return self._slot
+
+    def __exit__(self, *exc) -> None:
+        self._slot._finish()
+
+
+class _AsyncSlotContext:
+    def __init__(self, limiter: AdaptiveLimiter):
+        self._limiter = limiter
+
+    async def __aenter__(self) -> Slot:
+        self._slot = await self._limiter.aacquire()
+        return self._slot
+
+    async def __aexit__(self, *exc) -> None:
+        self._slot._finish()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _p95(values) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> AdaptiveLimiter:
+    """
+    Process-wide limiter for one call site (see ADAPTIVE_LIMITS). With
+    ADAPTIVE_CONCURRENCY off, the limit is pinned to its initial value.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            cfg = constants.ADAPTIVE_LIMITS[name]
+            if constants.ADAPTIVE_CONCURRENCY:
+                lo, hi = cfg["min"], cfg["max"]
+            else:
+                lo = hi = cfg["initial"]
+            limiter = _limiters[name] = AdaptiveLimiter(
+                name, cfg["initial"], lo, hi, cfg["latency_target_s"]
+            )
+        return limiter
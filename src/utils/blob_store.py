@@ -0,0 +1,151 @@
+# src/utils/blob_store.py
+"""
+Content-addressed, compressed blob storage for large job artefacts.
+
+A blob's key is the sha256 of its uncompressed bytes, so identical content is
+stored once and a stored blob never changes. Blobs are gzip-compressed at rest.
+
+Backends (selected with the BLOB_BACKEND env var):
+  - "local" : files under BLOB_DIR, sharded by key prefix (default; the
+              api and worker containers share it through the /app mount)
+  - "s3"    : an S3-compatible bucket (AWS S3, MinIO, ...), needs `boto3`
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from src import config
+
+
+def blob_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobNotFound(KeyError):
+    pass
+
+
+class BlobStore:
+    """Common interface. Backends implement _exists/_write/_read on compressed bytes."""
+
+    name = "base"
+
+    def _exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def _write(self, key: str, compressed: bytes) -> None:
+        raise NotImplementedError
+
+    def _read(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def put(self, data: bytes) -> tuple[str, int]:
+        """Stores `data` (once). Returns (key, compressed size)."""
+        key = blob_key(data)
+        compressed = gzip.compress(data, compresslevel=6)
+        if not self._exists(key):
+            self._write(key, compressed)
+        return key, len(compressed)
+
+    def get(self, key: str) -> bytes:
+        return gzip.decompress(self._read(key))
+
+    def put_json(self, value) -> tuple[str, int]:
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+        return self.put(raw.encode("utf-8"))
+
+    def get_json(self, key: str):
+        return json.loads(self.get(key).decode("utf-8"))
+
+
+class LocalBlobStore(BlobStore):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.gz")
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _write(self, key: str, compressed: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write-then-rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _read(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFound(key) from None
+
+
+class S3BlobStore(BlobStore):
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None):
+        import boto3  # imported lazily so the local backend has no AWS dependency
+        from botocore.exceptions import ClientError
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}.gz" if self.prefix else f"{key}.gz"
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self._client_error:
+            return False
+
+    def _write(self, key: str, compressed: bytes) -> None:
+        self._client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=compressed,
+                                ContentType="application/gzip")
+
+    def _read(self, key: str) -> bytes:
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"].read()
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise BlobNotFound(key) from None
+            raise
+
+
+_store: BlobStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Returns the process-wide blob store, creating it on first use. Raises if it cannot be created."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = (config.BLOB_BACKEND or "local").lower()
+            if backend == "s3":
+                if not config.BLOB_S3_BUCKET:
+                    raise ValueError("BLOB_BACKEND=s3 needs BLOB_S3_BUCKET")
+                _store = S3BlobStore(config.BLOB_S3_BUCKET, config.BLOB_S3_PREFIX, config.BLOB_S3_ENDPOINT_URL)
+            else:
+                _store = LocalBlobStore(config.BLOB_DIR)
+            logging.info(f"🗄️ Blob store: using '{_store.name}' backend.")
+        return _store
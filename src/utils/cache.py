@@ -0,0 +1,248 @@
+# src/utils/cache.py
+"""
+Small pluggable key/value cache used to avoid repeating expensive external
+calls (Google CSE, Gemini) across jobs.
+
+Backends (selected with the CACHE_BACKEND env var):
+  - "disk"  : a single SQLite file under CACHE_DIR, TTL + LRU eviction (default)
+  - "redis" : the Redis instance from REDIS_URL, TTL + LRU eviction
+  - "none"  : caching disabled
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src import config
+
+
+def make_key(*parts) -> str:
+    """Content-addressed key: sha256 over the JSON encoding of all parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used for cache keys."""
+    return re.sub(r"\s+", " ", query or "").strip().lower()
+
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "_ga")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalises a URL for use in cache keys: lower-cased scheme/host, no
+    fragment, no tracking parameters, sorted query, no trailing slash.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+class BaseCache:
+    """Common interface. Backends only implement _get/_set; failures are never fatal."""
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            value = self._get(key)
+        except Exception as e:
+            logging.warning(f"Cache[{self.namespace}]: read failed, treating as miss. Error: {e}")
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: int | None = None) -> None:
+        try:
+            self._set(key, value, ttl_seconds or self.ttl_seconds)
+        except Exception as e:
+            logging.warning(f"Cache[{self.namespace}]: write failed. Error: {e}")
+
+    def get_json(self, key: str):
+        raw = self.get(key)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+
+    def set_json(self, key: str, value, ttl_seconds: int | None = None) -> None:
+        self.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"), ttl_seconds)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class NullCache(BaseCache):
+    """Used when CACHE_BACKEND=none. Always misses."""
+
+    def _get(self, key: str) -> bytes | None:
+        return None
+
+    def _set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        return None
+
+
+class DiskCache(BaseCache):
+    """SQLite-backed cache. One file is shared by every namespace."""
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int, path: str):
+        super().__init__(namespace, ttl_seconds, max_entries)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_lru ON cache_entries (namespace, last_access)"
+            )
+
+    def _get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            return bytes(row[0])
+
+    def _set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, sqlite3.Binary(value), now + ttl_seconds, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used rows above max_entries."""
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?", (self.namespace, now)
+        )
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE rowid IN ("
+                " SELECT rowid FROM cache_entries WHERE namespace = ?"
+                " ORDER BY last_access ASC LIMIT ?)",
+                (self.namespace, overflow),
+            )
+
+
+class RedisCache(BaseCache):
+    """Redis-backed cache. Native key expiry for TTL, a sorted set per namespace for LRU."""
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int, url: str):
+        super().__init__(namespace, ttl_seconds, max_entries)
+        import redis  # imported lazily so the disk backend has no Redis dependency
+        self._redis = redis.Redis.from_url(url)
+        self._lru_key = f"cache:{namespace}:__lru__"
+
+    def _data_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _get(self, key: str) -> bytes | None:
+        value = self._redis.get(self._data_key(key))
+        if value is None:
+            self._redis.zrem(self._lru_key, key)
+            return None
+        self._redis.zadd(self._lru_key, {key: time.time()})
+        return value
+
+    def _set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        pipe = self._redis.pipeline()
+        pipe.set(self._data_key(key), value, ex=ttl_seconds)
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.zcard(self._lru_key)
+        count = pipe.execute()[-1]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            evicted = [k.decode() for k, _ in self._redis.zpopmin(self._lru_key, overflow)]
+            if evicted:
+                self._redis.delete(*(self._data_key(k) for k in evicted))
+
+
+_caches: dict[str, BaseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl_seconds: int, max_entries: int) -> BaseCache:
+    """Returns the process-wide cache for a namespace, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is not None:
+            return cache
+
+        backend = (config.CACHE_BACKEND or "disk").lower()
+        try:
+            if backend == "redis":
+                cache = RedisCache(namespace, ttl_seconds, max_entries, config.REDIS_URL)
+            elif backend == "disk":
+                cache = DiskCache(namespace, ttl_seconds, max_entries,
+                                  os.path.join(config.CACHE_DIR, "cache.db"))
+            else:
+                cache = NullCache(namespace, ttl_seconds, max_entries)
+        except Exception as e:
+            logging.warning(f"Cache[{namespace}]: could not initialise '{backend}' backend, caching disabled. Error: {e}")
+            cache = NullCache(namespace, ttl_seconds, max_entries)
+
+        _caches[namespace] = cache
+        return cache
@@ -0,0 +1,144 @@
+# src/utils/pdf_cache.py
+"""
+Disk cache for rendered report PDFs.
+
+A PDF is fully determined by its inputs, so it is stored under a content
+hash of (report markdown, title, user name, template version); the same key
+doubles as the download's ETag. Files live in PDF_CACHE_DIR, one per key,
+and the total size is kept under PDF_CACHE_MAX_BYTES by evicting the least
+recently used files (a hit refreshes the file's mtime).
+
+The template version covers PDF_RENDER_VERSION and the bytes of the
+template, stylesheet, logo and fonts, so editing any of them invalidates
+every cached PDF without a manual flush.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from functools import lru_cache
+
+from src import config, constants
+from src.utils.cache import make_key
+from src.utils.pdf_generator import TEMPLATE_DIR
+
+
+@lru_cache(maxsize=1)
+def template_version() -> str:
+    """Hash of PDF_RENDER_VERSION and every file under the templates the renderer reads."""
+    digest = hashlib.sha256(constants.PDF_RENDER_VERSION.encode("utf-8"))
+    paths = [TEMPLATE_DIR / "report_template.html", TEMPLATE_DIR / "report.css", TEMPLATE_DIR / "supervity-logo.png"]
+    fonts_dir = TEMPLATE_DIR / "fonts"
+    if fonts_dir.is_dir():
+        paths += sorted(p for p in fonts_dir.iterdir() if p.is_file())
+    for path in paths:
+        digest.update(path.name.encode("utf-8"))
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def pdf_cache_key(markdown_content: str, report_title: str, user_name: str) -> str:
+    """Content hash identifying one rendered PDF; also used as its ETag."""
+    return make_key("report-pdf", template_version(), markdown_content, report_title, user_name)
+
+
+class PDFCache:
+    """Size-bounded LRU of PDF files in one directory. Failures are never fatal."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            data = None
+        except OSError as e:
+            logging.warning(f"PDF cache: read failed, treating as miss. Error: {e}")
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key: str, pdf_bytes: bytes) -> None:
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        try:
+            # write-then-rename, so readers never see a partial PDF
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(pdf_bytes)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            with self._lock:
+                self._evict()
+        except OSError as e:
+            logging.warning(f"PDF cache: write failed. Error: {e}")
+
+    def _evict(self) -> None:
+        """Deletes the least recently used PDFs until the directory fits in max_bytes."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue  # evicted by another process
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_cache: PDFCache | None = None
+_cache_disabled = False
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> PDFCache | None:
+    """Returns the process-wide PDF cache, or None when it is disabled or cannot be created."""
+    global _cache, _cache_disabled
+    with _cache_lock:
+        if _cache is None and not _cache_disabled and constants.PDF_CACHE_MAX_BYTES > 0:
+            try:
+                _cache = PDFCache(config.PDF_CACHE_DIR, constants.PDF_CACHE_MAX_BYTES)
+                logging.info(f"📄 PDF cache: {config.PDF_CACHE_DIR} (max {constants.PDF_CACHE_MAX_BYTES // 2**20} MB).")
+            except OSError as e:
+                logging.warning(f"PDF cache: could not create {config.PDF_CACHE_DIR}, caching disabled. Error: {e}")
+                _cache_disabled = True
+        return _cache
@@ -0,0 +1,182 @@
+# src/utils/pdf_render_service.py
+"""
+Runs WeasyPrint PDF renders in a pool of worker processes, off the API's
+event loop.
+
+A render is seconds of CPU while holding the GIL, so doing it in an async
+handler (or in a thread of the API process) stalls every other request and
+SSE stream on that uvicorn worker. The service:
+  - renders in PDF_RENDER_WORKERS spawned processes, each of which loads the
+    template, stylesheet and fonts once when it starts (`prewarm` starts
+    them all up front instead of on the first download);
+  - admits at most PDF_RENDER_WORKERS + PDF_RENDER_MAX_QUEUE renders at a
+    time; beyond that `render` raises RenderQueueFull at once (the API turns
+    it into 429 + Retry-After) instead of letting work pile up;
+  - keeps counters and queue-wait / render-time percentiles for
+    GET /api/admin/pdf-render.
+
+One service per API process; it is started and stopped with the app.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src import constants
+
+_TIMING_WINDOW = 500  # most recent renders the percentiles are computed over
+
+
+class RenderQueueFull(Exception):
+    """Raised when PDF_RENDER_WORKERS + PDF_RENDER_MAX_QUEUE renders are already admitted."""
+
+
+def _init_worker() -> None:
+    """Worker process initializer: load the template, logo, stylesheet and fonts before the first render."""
+    from src.utils.pdf_generator import get_pdf_renderer
+    get_pdf_renderer()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _render_in_worker(markdown_content: str, report_title: str, user_name: str) -> tuple[bytes, float]:
+    from src.utils.pdf_generator import get_pdf_renderer
+    started = time.perf_counter()
+    pdf_bytes = get_pdf_renderer().render(markdown_content, report_title, user_name)
+    return pdf_bytes, time.perf_counter() - started
+
+
+def _percentile(samples, pct: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(pct * len(ordered)))], 3)
+
+
+class PDFRenderService:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue_wait_s = deque(maxlen=_TIMING_WINDOW)
+        self._render_s = deque(maxlen=_TIMING_WINDOW)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the API process has threads (DB pools, aiosqlite, Redis) that must not be copied mid-flight
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def has_capacity(self) -> bool:
+        """Whether a render submitted now would be admitted (a hint; another request may take the slot first)."""
+        with self._lock:
+            return self._in_flight < self.capacity
+
+    def prewarm(self) -> None:
+        """Starts every worker process (each loads the renderer in its initializer). Blocking."""
+        started = time.perf_counter()
+        futures = [self._executor.submit(_warm_up) for _ in range(self.workers)]
+        pids = {f.result() for f in futures}
+        logging.info(f"🖨️ PDF render service: {len(pids)} worker process(es) warm in {time.perf_counter() - started:.1f}s.")
+
+    async def render(self, markdown_content: str, report_title: str, user_name: str) -> bytes:
+        """Renders in a worker process. Raises RenderQueueFull when the service is saturated."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise RenderQueueFull(f"{self._in_flight} PDF renders in flight (limit {self.capacity})")
+            self._in_flight += 1
+            executor = self._executor
+
+        submitted = time.perf_counter()
+        try:
+            future = executor.submit(_render_in_worker, markdown_content, report_title, user_name)
+        except BaseException as e:
+            self._finished(executor, submitted, None, e)
+            raise
+        # The slot is released when the worker is done, not when the caller stops waiting:
+        # a render already running cannot be cancelled, so a client that went away still holds it.
+        future.add_done_callback(lambda f: self._finished(executor, submitted, f, None))
+        pdf_bytes, _ = await asyncio.wrap_future(future)
+        return pdf_bytes
+
+    def _finished(self, executor: ProcessPoolExecutor, submitted: float, future, submit_error) -> None:
+        """Releases a render's slot and records its outcome; runs in whichever thread completes the future."""
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None and future.cancelled():
+                return  # cancelled while still queued; it never ran
+            error = submit_error if future is None else future.exception()
+            if error is not None:
+                self.failed += 1
+                if isinstance(error, BrokenProcessPool) and self._executor is executor:
+                    # a worker died (e.g. OOM-killed); replace the pool so later renders work again
+                    logging.error("PDF render service: worker pool broke, starting a new one.")
+                    self._executor = self._new_executor()
+                return
+            _, render_s = future.result()
+            queue_wait_s = max(0.0, time.perf_counter() - submitted - render_s)
+            self.completed += 1
+            self._render_s.append(render_s)
+            self._queue_wait_s.append(queue_wait_s)
+        logging.info(f"PDF rendered in {render_s:.2f}s (waited {queue_wait_s:.2f}s for a worker).")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            render_s, queue_wait_s = list(self._render_s), list(self._queue_wait_s)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "render_seconds_p50": round(statistics.median(render_s), 3) if render_s else None,
+                "render_seconds_p95": _percentile(render_s, 0.95),
+                "queue_wait_seconds_p50": round(statistics.median(queue_wait_s), 3) if queue_wait_s else None,
+                "queue_wait_seconds_p95": _percentile(queue_wait_s, 0.95),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_service: PDFRenderService | None = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_render_service() -> PDFRenderService:
+    """Returns this process's render service, creating it (without warming it) on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PDFRenderService(constants.PDF_RENDER_WORKERS, constants.PDF_RENDER_MAX_QUEUE)
+        return _service
+
+
+def shutdown_pdf_render_service() -> None:
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
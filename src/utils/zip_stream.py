@@ -0,0 +1,82 @@
+# src/utils/zip_stream.py
+"""
+Streams a .zip archive as it is written, instead of building it in memory.
+
+zipfile can write to an unseekable file: it then puts each entry's CRC and
+sizes in a data descriptor after the entry, so nothing has to be patched
+afterwards. `stream_zip` writes entries through such a sink and yields the
+bytes as soon as they exist. An entry's data is either bytes or an iterable
+of byte chunks produced lazily while it is written, so a large file never
+has to exist in memory as a whole, and neither does the archive.
+"""
+import asyncio
+import io
+import zipfile
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file that collects what zipfile writes until `drain` is called."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _pieces(data: bytes | Iterable[bytes], chunk_size: int) -> Iterable[bytes]:
+    if isinstance(data, (bytes, bytearray)):
+        view = memoryview(data)
+        return (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+    return data
+
+
+def _write_entry(zipf: zipfile.ZipFile, arcname: str, data: bytes | Iterable[bytes], chunk_size: int, sink: _ChunkSink):
+    """Writes one entry, yielding the archive bytes produced after each piece of input."""
+    # zip64 is decided up front; lazily produced data may turn out large, so always allow it for those
+    force_zip64 = not isinstance(data, (bytes, bytearray)) or len(data) > 0x7FFFFFFF
+    with zipf.open(arcname, "w", force_zip64=force_zip64) as entry:
+        for piece in _pieces(data, chunk_size):
+            entry.write(piece)
+            yield sink.drain()
+    yield sink.drain()  # data descriptor written on close
+
+
+async def stream_zip(entries: AsyncIterable[tuple[str, bytes | Iterable[bytes]]], chunk_size: int = 64 * 1024,
+                     compression: int = zipfile.ZIP_DEFLATED) -> AsyncIterator[bytes]:
+    """
+    Yields a .zip archive of `entries` ((arcname, data) pairs, written in the order they
+    arrive) in chunks. Lazy data is iterated, and compressed, in a worker thread, off the
+    event loop; bytes data is fed in `chunk_size` pieces.
+    """
+    sink = _ChunkSink()
+    zipf = zipfile.ZipFile(sink, "w", compression)
+    seen: set[str] = set()
+    try:
+        async for arcname, data in entries:
+            if arcname in seen:
+                continue  # the same file requested twice
+            seen.add(arcname)
+            writer = _write_entry(zipf, arcname, data, chunk_size, sink)
+            while (chunk := await asyncio.to_thread(next, writer, None)) is not None:
+                if chunk:
+                    yield chunk
+            del data, writer
+        zipf.close()  # central directory
+        tail = sink.drain()
+        if tail:
+            yield tail
+    finally:
+        if zipf.fp is not None:
+            zipf.fp = None  # abandoned mid-archive (client went away); nothing left to flush